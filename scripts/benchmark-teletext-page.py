@@ -0,0 +1,65 @@
+"""
+Measures the decoding and rendering of teletext pages of a full channel snapshot, e.g.
+
+    python scripts/benchmark-teletext-page.py ../teletext-archive-unicode/docs/snapshots/ard.ndjson
+
+"""
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from src.teletext import Teletext, TeletextPage
+
+
+def _per_line_lines(page: TeletextPage):
+    # the former implementation of TeletextPage.lines
+    return [
+        [TeletextPage.Block.from_json(block) for block in json.loads(line)]
+        for line in page._lines_ndjson
+    ]
+
+
+def _fast_lines(page: TeletextPage):
+    page._lines = None
+    return page.lines
+
+
+def _render(page: TeletextPage):
+    page._render_cache.clear()
+    page.to_ansi(colors=False)
+    page.to_text()
+
+
+def _render_cached(page: TeletextPage):
+    page.to_ansi(colors=False)
+    page.to_text()
+
+
+def _measure(name: str, tt: Teletext, func: Callable, repeat: int):
+    pages = list(tt.pages.values())
+    start_time = time.time()
+    for i in range(repeat):
+        for page in pages:
+            func(page)
+    seconds = time.time() - start_time
+    num_pages = len(pages) * repeat
+    print(f"{name:20} {num_pages / seconds:10,.0f} pages/sec")
+
+
+def benchmark_teletext_page(
+        filename: str,
+        repeat: int = 3,
+):
+    tt = Teletext.from_ndjson(Path(filename).read_bytes())
+    print(f"{tt.channel} {tt.timestamp}: {len(tt.pages):,} pages")
+
+    _measure("lines (per line)", tt, _per_line_lines, repeat)
+    _measure("lines", tt, _fast_lines, repeat)
+    _measure("render", tt, _render, repeat)
+    _measure("render (cached)", tt, _render_cached, repeat)
+
+
+if __name__ == "__main__":
+    benchmark_teletext_page(*sys.argv[1:2])
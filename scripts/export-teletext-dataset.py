@@ -1,46 +1,38 @@
 """
 Export unqiue teletext pages
+
+Pages are only written when their content changed since the
+previous snapshot of the same channel.
 """
 import json
 import time
 import datetime
-import hashlib
 import gzip
 from pathlib import Path
 
 import dateutil.parser
 from tqdm import tqdm
 
-from src.teletext import TeletextIterator
+from src.teletext import TeletextIterator, TeletextPageDeduplicator
 
 
 def export_unique_teletext_pages(
         filename: str = "./data/teletext.ndjson.gz",
 ):
-    tt_iterator = TeletextIterator()
-    page_hashes = set()
+    dedup = TeletextPageDeduplicator()
 
-    num_duplicates = 0
-    num_pages = 0
     last_print_time = time.time()
 
-    with gzip.open(filename, "wt") as fp:
+    with TeletextIterator() as tt_iterator, gzip.open(filename, "wt") as fp:
         try:
             for tt in tt_iterator.iter_teletexts():
-                for page in tt.pages.values():
+                for page in dedup.iter_changed_pages(tt):
                     text = page.to_ansi(colors=False)
 
                     # cut status line
-                    if tt.channel in ("zdf", "zdf-info", "zdf-neo", "ntv", "sr"):
+                    if tt.channel in dedup.STATUS_LINE_CHANNELS:
                         text = text[text.find("\n") + 1:]
 
-                    page_hash = hashlib.md5(text.encode()).hexdigest()
-                    if page_hash in page_hashes:
-                        num_duplicates += 1
-
-                    num_pages += 1
-                    page_hashes.add(page_hash)
-
                     fp.write(json.dumps({
                         "channel": tt.channel,
                         "timestamp": tt.timestamp,
@@ -54,7 +46,7 @@ def export_unique_teletext_pages(
                 cur_time = time.time()
                 if cur_time - last_print_time >= 10:
                     last_print_time = cur_time
-                    print(f"\npages: {num_pages:,} exported, {num_duplicates:,} duplicates")
+                    print(f"\npages: {dedup.num_changed:,} exported, {dedup.num_unchanged:,} unchanged")
 
         except KeyboardInterrupt:
             pass
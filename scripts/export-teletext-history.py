@@ -0,0 +1,23 @@
+"""
+Export the teletext history as keyframes and line deltas per page
+"""
+from src.teletext import TeletextIterator, TeletextHistoryWriter
+
+
+def export_teletext_history(
+        filename: str = "./data/teletext-history.ndjson.gz",
+        num_workers: int = 4,
+):
+    with TeletextIterator() as tt_iterator, TeletextHistoryWriter(filename) as writer:
+        try:
+            for tt in tt_iterator.iter_teletexts(num_workers=num_workers):
+                writer.add(tt)
+
+        except KeyboardInterrupt:
+            pass
+
+    print(f"{writer.num_records:,} records written to {filename}")
+
+
+if __name__ == "__main__":
+    export_teletext_history()
@@ -0,0 +1,19 @@
+"""
+Appends all new commits of the
+
+    github.com/defgsus/frontpage-archive*
+
+repos to the local sqlite article index.
+
+"""
+from src.frontpage import FrontpageIndex
+
+
+def update_frontpage_index():
+    with FrontpageIndex() as index:
+        num_frontpages = index.update()
+        print(f"added {num_frontpages:,} frontpages, {index.num_articles():,} articles in {index.filename}")
+
+
+if __name__ == "__main__":
+    update_frontpage_index()
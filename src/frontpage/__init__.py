@@ -1 +1,2 @@
 from .iterator import FrontpageIterator
+from .index import FrontpageIndex
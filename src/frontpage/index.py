@@ -0,0 +1,219 @@
+import sqlite3
+from pathlib import Path
+from typing import Optional, List, Iterable, Union
+
+from .. import DATA_PATH
+from .iterator import Frontpage, FrontpageIterator
+
+
+class FrontpageIndex:
+    """
+    Local sqlite index of unique frontpage articles.
+
+    Each article is stored once per (channel, category, url, title)
+    together with the first and last time it was seen.
+    Title and teaser are full-text searchable through FTS5.
+    """
+
+    DEFAULT_FILENAME: Path = DATA_PATH / "frontpage-index.sqlite3"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS commits (
+            hash TEXT PRIMARY KEY,
+            timestamp TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY,
+            channel TEXT NOT NULL,
+            category TEXT NOT NULL,
+            url TEXT NOT NULL,
+            title TEXT NOT NULL,
+            teaser TEXT,
+            author TEXT,
+            topic TEXT,
+            image_url TEXT,
+            image_title TEXT,
+            commit_hash TEXT NOT NULL,
+            timestamp_min TEXT NOT NULL,
+            timestamp_max TEXT NOT NULL,
+            rank_min INTEGER NOT NULL,
+            rank_max INTEGER NOT NULL,
+            UNIQUE (channel, category, url, title)
+        );
+        CREATE INDEX IF NOT EXISTS articles_timestamp ON articles (timestamp_min, timestamp_max);
+        CREATE INDEX IF NOT EXISTS articles_channel ON articles (channel, timestamp_min);
+        CREATE INDEX IF NOT EXISTS articles_category ON articles (category, timestamp_min);
+        CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5 (
+            title, teaser, content='articles', content_rowid='id'
+        );
+        CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+            INSERT INTO articles_fts (rowid, title, teaser) VALUES (new.id, new.title, new.teaser);
+        END;
+    """
+
+    def __init__(self, filename: Union[str, Path, None] = None):
+        self.filename = Path(filename or self.DEFAULT_FILENAME)
+        self._db: Optional[sqlite3.Connection] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            if str(self.filename) != ":memory:":
+                self.filename.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.filename))
+            self._db.row_factory = sqlite3.Row
+            self._db.executescript(self.SCHEMA)
+        return self._db
+
+    def num_articles(self) -> int:
+        return self.db.execute("SELECT count(*) FROM articles").fetchone()[0]
+
+    def last_timestamp(self) -> Optional[str]:
+        return self.db.execute("SELECT max(timestamp) FROM commits").fetchone()[0]
+
+    def update(self, **kwargs) -> int:
+        """
+        Appends all commits newer than the last indexed one.
+
+        `kwargs` are passed to `FrontpageIterator`.
+        Returns the number of added frontpages.
+        """
+        since_date = self.last_timestamp()
+        if since_date:
+            # commits of the same day may be only partially indexed
+            since_date = since_date[:10]
+
+        iterator = FrontpageIterator(since_date=since_date, **kwargs)
+        return self.add_frontpages(iterator.iter_frontpages())
+
+    def add_frontpages(self, frontpages: Iterable[Frontpage]) -> int:
+        """
+        Adds the articles of each frontpage.
+
+        Frontpages of commits that are already indexed are skipped.
+        Each commit is written in a single transaction.
+        """
+        db = self.db
+        indexed_commits = {row[0] for row in db.execute("SELECT hash FROM commits")}
+
+        num_added = 0
+        cur_commit = None
+        try:
+            for fp in frontpages:
+                if fp.commit_hash in indexed_commits:
+                    continue
+
+                if fp.commit_hash != cur_commit:
+                    if cur_commit is not None:
+                        db.commit()
+                    cur_commit = fp.commit_hash
+                    db.execute(
+                        "INSERT OR REPLACE INTO commits (hash, timestamp) VALUES (?, ?)",
+                        (fp.commit_hash, fp.timestamp),
+                    )
+
+                db.executemany(
+                    """
+                    INSERT INTO articles (
+                        channel, category, url, title, teaser, author, topic, image_url, image_title,
+                        commit_hash, timestamp_min, timestamp_max, rank_min, rank_max
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (channel, category, url, title) DO UPDATE SET
+                        timestamp_min = min(timestamp_min, excluded.timestamp_min),
+                        timestamp_max = max(timestamp_max, excluded.timestamp_max),
+                        rank_min = min(rank_min, excluded.rank_min),
+                        rank_max = max(rank_max, excluded.rank_max)
+                    """,
+                    [
+                        (
+                            fp.channel, fp.category, a.url or "", a.title or "", a.teaser, a.author,
+                            a.topic, a.image_url, a.image_title,
+                            fp.commit_hash, fp.timestamp, fp.timestamp, a.rank, a.rank,
+                        )
+                        for a in fp.articles
+                    ]
+                )
+                num_added += 1
+
+            db.commit()
+
+        except BaseException:
+            # drop the partially written commit, it will be indexed on the next update
+            db.rollback()
+            raise
+
+        return num_added
+
+    def search(
+            self,
+            text: Optional[str] = None,
+            channels: Optional[Iterable[str]] = None,
+            categories: Optional[Iterable[str]] = None,
+            since: Optional[str] = None,
+            until: Optional[str] = None,
+            order: str = "timestamp_min",
+            limit: Optional[int] = 100,
+    ) -> List[dict]:
+        """
+        Returns articles matching all given conditions.
+
+        `text` is an FTS5 query on title and teaser (e.g. 'klima* NOT wetter'),
+        `since` and `until` select articles seen within that ISO timestamp range.
+        `order` is a column name, prefixed with '-' for descending order,
+        or 'rank' to sort by full-text relevance.
+        """
+        where = []
+        params = []
+        sql = "SELECT articles.* FROM articles"
+
+        if text:
+            sql += " JOIN articles_fts ON articles_fts.rowid = articles.id"
+            where.append("articles_fts MATCH ?")
+            params.append(text)
+
+        for column, values in (("channel", channels), ("category", categories)):
+            if values is not None:
+                values = list(values)
+                where.append(f"articles.{column} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+
+        if since is not None:
+            where.append("articles.timestamp_max >= ?")
+            params.append(str(since))
+        if until is not None:
+            where.append("articles.timestamp_min < ?")
+            params.append(str(until))
+
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+
+        if order == "rank":
+            if not text:
+                raise ValueError("order='rank' requires a full-text query")
+            sql += " ORDER BY articles_fts.rank"
+        else:
+            column = order.lstrip("-")
+            if column not in self._columns():
+                raise ValueError(f"Invalid order column '{column}'")
+            sql += f" ORDER BY articles.{column} {'DESC' if order.startswith('-') else 'ASC'}"
+
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        return [dict(row) for row in self.db.execute(sql, params)]
+
+    def _columns(self) -> List[str]:
+        return [row[1] for row in self.db.execute("PRAGMA table_info(articles)")]
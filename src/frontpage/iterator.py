@@ -11,6 +11,8 @@ from tqdm import tqdm
 
 from giterator import Giterator
 
+from ..gitobjects import GitObjectReader
+
 
 @dataclasses.dataclass
 class FrontpageArticle:
@@ -55,12 +57,18 @@ class FrontpageIterator:
             categories: Optional[Iterable[str]] = None,
             since_date: Optional[Union[str, datetime.date, datetime.datetime]] = None,
             until_date: Optional[Union[str, datetime.date, datetime.datetime]] = None,
+            skip_unchanged: bool = False,
             verbose: bool = True,
     ):
+        """
+        If `skip_unchanged` is True, snapshot files are only yielded
+        when their content changed since the previous commit.
+        """
         self.channels: List[str] = [] if channels is None else list(channels)
         self.categories: List[str] = [] if categories is None else list(categories)
         self.since_date = None if since_date is None else str(since_date)
         self.until_date = None if until_date is None else str(until_date)
+        self.skip_unchanged = skip_unchanged
         self.verbose = verbose
         self.repos = []
 
@@ -89,36 +97,39 @@ class FrontpageIterator:
                     total=repo.num_commits(self.SNAPSHOT_PATH),
                 )
 
-            for commit in commit_iterable:
-
-                for file in commit.iter_files(self.SNAPSHOT_PATH):
-                    filename_split = file.name.split("/")
-                    name = filename_split[-1]
-                    if not name.endswith(".json") or name.startswith("_"):
-                        continue
-
-                    channel = filename_split[-2]
-                    category = name[:-5]
-
-                    if self.channels and channel not in self.channels:
-                        continue
-                    if self.categories and category not in self.categories:
-                        continue
-
-                    data = json.loads(file.text())
-
-                    yield Frontpage(
-                        channel=channel,
-                        category=category,
-                        timestamp=data["timestamp"],
-                        url=data["url"],
-                        scripts=data["scripts"],
-                        articles=[
-                            FrontpageArticle(**a, rank=i)
-                            for i, a in enumerate(data["articles"])
-                        ],
-                        commit_hash=commit.hash,
-                    )
+            with GitObjectReader(repo.path) as reader:
+                known_hashes = {} if self.skip_unchanged else None
+
+                for commit in commit_iterable:
+
+                    for filename, blob_hash in reader.iter_files(commit.hash, self.SNAPSHOT_PATH, known_hashes):
+                        filename_split = filename.split("/")
+                        name = filename_split[-1]
+                        if not name.endswith(".json") or name.startswith("_"):
+                            continue
+
+                        channel = filename_split[-2]
+                        category = name[:-5]
+
+                        if self.channels and channel not in self.channels:
+                            continue
+                        if self.categories and category not in self.categories:
+                            continue
+
+                        data = json.loads(reader.read_blob(blob_hash))
+
+                        yield Frontpage(
+                            channel=channel,
+                            category=category,
+                            timestamp=data["timestamp"],
+                            url=data["url"],
+                            scripts=data["scripts"],
+                            articles=[
+                                FrontpageArticle(**a, rank=i)
+                                for i, a in enumerate(data["articles"])
+                            ],
+                            commit_hash=commit.hash,
+                        )
 
     def iter_articles(self) -> Generator[Tuple[Frontpage, FrontpageArticle], None, None]:
         for fp in self.iter_frontpages():
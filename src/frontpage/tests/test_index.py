@@ -0,0 +1,138 @@
+import tempfile
+import unittest
+from pathlib import Path
+from typing import List
+
+from src.frontpage import FrontpageIndex
+from src.frontpage.iterator import Frontpage, FrontpageArticle
+
+
+class TestFrontpageIndex(unittest.TestCase):
+
+    def make_frontpage(
+            self,
+            commit_hash: str,
+            timestamp: str,
+            titles: List[str],
+            channel: str = "spiegel",
+            category: str = "index",
+    ) -> Frontpage:
+        return Frontpage(
+            channel=channel,
+            category=category,
+            timestamp=timestamp,
+            url=f"https://{channel}.de/",
+            scripts=[],
+            articles=[
+                FrontpageArticle(
+                    rank=i, title=title, url=f"https://{channel}.de/{title.replace(' ', '-')}",
+                    teaser=f"teaser of {title}",
+                )
+                for i, title in enumerate(titles)
+            ],
+            commit_hash=commit_hash,
+        )
+
+    def make_index(self) -> FrontpageIndex:
+        index = FrontpageIndex(":memory:")
+        self.addCleanup(index.close)
+        index.add_frontpages([
+            self.make_frontpage("a", "2023-01-01T10:00:00", ["Klima Gipfel", "Wetter heute"]),
+            self.make_frontpage("a", "2023-01-01T10:00:00", ["Wetter heute", "Fussball"], channel="zdf"),
+            self.make_frontpage("b", "2023-01-02T10:00:00", ["Wetter heute", "Klima Krise"]),
+            self.make_frontpage("c", "2023-01-03T10:00:00", ["Neue Regierung", "Wetter heute"]),
+        ])
+        return index
+
+    def test_100_add_frontpages(self):
+        index = self.make_index()
+
+        self.assertEqual(6, index.num_articles())
+        self.assertEqual("2023-01-03T10:00:00", index.last_timestamp())
+
+        rows = index.search(text='"Wetter heute"', channels=["spiegel"])
+        self.assertEqual(1, len(rows))
+        self.assertEqual(
+            ("a", "2023-01-01T10:00:00", "2023-01-03T10:00:00", 0, 1),
+            tuple(rows[0][key] for key in ("commit_hash", "timestamp_min", "timestamp_max", "rank_min", "rank_max")),
+        )
+
+        # already indexed commits are skipped
+        self.assertEqual(1, index.add_frontpages([
+            self.make_frontpage("b", "2023-01-02T10:00:00", ["Ignored"]),
+            self.make_frontpage("d", "2023-01-04T10:00:00", ["Wetter heute"]),
+        ]))
+        self.assertEqual([], index.search(text="Ignored"))
+        self.assertEqual(6, index.num_articles())
+        self.assertEqual("2023-01-04T10:00:00", index.search(text='"Wetter heute"', channels=["spiegel"])[0]["timestamp_max"])
+
+    def test_200_rollback(self):
+        with tempfile.TemporaryDirectory(prefix="investigate-news-test") as dir:
+            filename = Path(dir) / "index.sqlite3"
+
+            def iter_frontpages():
+                yield self.make_frontpage("a", "2023-01-01T10:00:00", ["First"])
+                yield self.make_frontpage("b", "2023-01-02T10:00:00", ["Second"])
+                raise RuntimeError("interrupted")
+
+            with FrontpageIndex(filename) as index:
+                with self.assertRaises(RuntimeError):
+                    index.add_frontpages(iter_frontpages())
+
+            # only the completely written commit is stored
+            with FrontpageIndex(filename) as index:
+                self.assertEqual(["First"], [row["title"] for row in index.search()])
+                self.assertEqual("2023-01-01T10:00:00", index.last_timestamp())
+
+                self.assertEqual(1, index.add_frontpages([
+                    self.make_frontpage("a", "2023-01-01T10:00:00", ["Ignored"]),
+                    self.make_frontpage("b", "2023-01-02T10:00:00", ["Second"]),
+                ]))
+                self.assertEqual(["First", "Second"], [row["title"] for row in index.search()])
+
+    def test_300_search(self):
+        index = self.make_index()
+
+        self.assertEqual(
+            ["Klima Gipfel", "Klima Krise"],
+            [row["title"] for row in index.search(text="klima")],
+        )
+        self.assertEqual(
+            ["Klima Krise", "Klima Gipfel"],
+            [row["title"] for row in index.search(text="klima", order="-timestamp_min")],
+        )
+        self.assertEqual(
+            ["Gipfel", "Krise"],
+            sorted(row["title"].split()[1] for row in index.search(text="teaser AND klima", order="rank")),
+        )
+        self.assertEqual(
+            ["Klima Gipfel"],
+            [row["title"] for row in index.search(text="klim* NOT krise")],
+        )
+        self.assertEqual(
+            ["Fussball", "Wetter heute"],
+            sorted(row["title"] for row in index.search(channels=["zdf"])),
+        )
+        self.assertEqual([], index.search(channels=[]))
+        self.assertEqual(
+            ["Klima Krise", "Neue Regierung", "Wetter heute"],
+            sorted(row["title"] for row in index.search(channels=["spiegel"], since="2023-01-02")),
+        )
+        self.assertEqual(
+            ["Klima Gipfel", "Wetter heute"],
+            sorted(row["title"] for row in index.search(channels=["spiegel"], until="2023-01-02")),
+        )
+        self.assertEqual(
+            ["Klima Gipfel", "Klima Krise", "Neue Regierung", "Wetter heute"],
+            [row["title"] for row in index.search(channels=["spiegel"], order="title")],
+        )
+        self.assertEqual(
+            ["2023-01-03T10:00:00", "2023-01-03T10:00:00", "2023-01-02T10:00:00", "2023-01-01T10:00:00"],
+            [row["timestamp_max"] for row in index.search(channels=["spiegel"], order="-timestamp_max")],
+        )
+        self.assertEqual(2, len(index.search(limit=2)))
+
+        with self.assertRaises(ValueError):
+            index.search(order="title; DROP TABLE articles")
+        with self.assertRaises(ValueError):
+            index.search(order="rank")
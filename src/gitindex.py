@@ -0,0 +1,155 @@
+import bisect
+import os
+import subprocess
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple, Union, Generator
+
+from . import DATA_PATH
+from .ndjson import NDJson
+
+
+class GitCommitIndex:
+    """
+    Persisted list of the commits that changed files below `path`,
+    oldest first, with their commit time (UTC) and the changed files.
+
+    Commits are looked up by hash prefix or by timestamp
+    with a binary search instead of walking the history.
+    `update` appends the commits that are not indexed yet
+    and rebuilds the index if the history was rewritten.
+    """
+
+    def __init__(
+            self,
+            repo_path: Union[str, Path],
+            path: str = "",
+            filename: Union[str, Path, None] = None,
+    ):
+        self.repo_path = Path(repo_path)
+        self.path = path
+        self.filename = Path(filename or DATA_PATH / "git-index" / f"{self.repo_path.name}.ndjson")
+        self.hashes: List[str] = []
+        self.timestamps: List[str] = []
+        self.files: List[List[str]] = []
+        self._sorted_hashes: Optional[List[Tuple[str, int]]] = None
+        # commit times are not necessarily in commit order, so these are sorted by (timestamp, position)
+        self._sorted_timestamps: Optional[List[Tuple[str, int]]] = None
+        # filename -> sorted (timestamp, position) of the commits that changed the file
+        self._file_timestamps: Optional[Dict[str, List[Tuple[str, int]]]] = None
+        self._loaded = False
+
+    def __len__(self) -> int:
+        self._load()
+        return len(self.hashes)
+
+    def update(self) -> int:
+        """
+        Appends all new commits to the index file.
+
+        If the last indexed commit is no longer part of the history
+        (e.g. after a force-push), the whole index is rebuilt.
+        Returns the number of added commits.
+        """
+        self._load()
+        since_hash = self.hashes[-1] if self.hashes else None
+        mode = "a"
+        if since_hash and not self._is_ancestor(since_hash):
+            since_hash = None
+            mode = "w"
+            self._clear()
+
+        self.filename.parent.mkdir(parents=True, exist_ok=True)
+        num_added = 0
+        with NDJson(self.filename, mode) as fp:
+            for commit_hash, timestamp, files in self._iter_git_log(since_hash):
+                fp.write({"hash": commit_hash, "timestamp": timestamp, "files": files})
+                self._add(commit_hash, timestamp, files)
+                num_added += 1
+
+        return num_added
+
+    def find_hash(self, hash_prefix: str) -> Optional[int]:
+        """
+        Returns the position of the commit whose hash starts with `hash_prefix`
+        """
+        self._load()
+        if self._sorted_hashes is None:
+            self._sorted_hashes = sorted((h, i) for i, h in enumerate(self.hashes))
+
+        idx = bisect.bisect_left(self._sorted_hashes, (hash_prefix, ))
+        if idx < len(self._sorted_hashes) and self._sorted_hashes[idx][0].startswith(hash_prefix):
+            return self._sorted_hashes[idx][1]
+
+    def find_timestamp(self, timestamp: str, filename: Optional[str] = None) -> Optional[int]:
+        """
+        Returns the position of the last commit at or before `timestamp`.
+
+        If `filename` is given, only commits that changed this file are considered.
+        """
+        self._load()
+        if filename is None:
+            if self._sorted_timestamps is None:
+                self._sorted_timestamps = sorted(zip(self.timestamps, range(len(self.timestamps))))
+            entries = self._sorted_timestamps
+
+        else:
+            if self._file_timestamps is None:
+                self._file_timestamps = {}
+                for i, files in enumerate(self.files):
+                    for name in files:
+                        self._file_timestamps.setdefault(name, []).append((self.timestamps[i], i))
+                for entries in self._file_timestamps.values():
+                    entries.sort()
+            entries = self._file_timestamps.get(filename, [])
+
+        idx = bisect.bisect_right(entries, (timestamp, len(self.hashes))) - 1
+        return entries[idx][1] if idx >= 0 else None
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.filename.exists():
+            for entry in NDJson(self.filename):
+                self._add(entry["hash"], entry["timestamp"], entry["files"])
+
+    def _add(self, commit_hash: str, timestamp: str, files: List[str]):
+        self.hashes.append(commit_hash)
+        self.timestamps.append(timestamp)
+        self.files.append(files)
+        self._sorted_hashes = None
+        self._sorted_timestamps = None
+        self._file_timestamps = None
+
+    def _clear(self):
+        self.hashes.clear()
+        self.timestamps.clear()
+        self.files.clear()
+        self._sorted_hashes = None
+        self._sorted_timestamps = None
+        self._file_timestamps = None
+
+    def _is_ancestor(self, commit_hash: str) -> bool:
+        return subprocess.run(
+            ["git", "merge-base", "--is-ancestor", commit_hash, "HEAD"],
+            cwd=str(self.repo_path),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        ).returncode == 0
+
+    def _iter_git_log(self, since_hash: Optional[str]) -> Generator[Tuple[str, str, List[str]], None, None]:
+        output = subprocess.check_output(
+            [
+                "git", "log", "--reverse", "--no-renames", "--name-only",
+                "--format=%x00%H %cd", "--date=format-local:%Y-%m-%dT%H:%M:%S",
+                f"{since_hash}..HEAD" if since_hash else "HEAD",
+                "--", self.path or ".",
+            ],
+            cwd=str(self.repo_path),
+            env={**os.environ, "TZ": "UTC"},
+        ).decode()
+
+        for entry in output.split("\0")[1:]:
+            lines = entry.strip().splitlines()
+            commit_hash, timestamp = lines[0].split()
+            yield commit_hash, timestamp, [line for line in lines[1:] if line]
@@ -0,0 +1,172 @@
+import subprocess
+from pathlib import Path
+from typing import Optional, Tuple, Dict, Generator, Union
+
+
+class GitObjectReader:
+    """
+    Reads commits, trees and blobs through a single long-running
+    `git cat-file --batch` process instead of spawning git per file.
+
+    Trees are walked directly, so unchanged sub-trees and blobs
+    can be skipped by comparing their object hashes.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._process: Optional[subprocess.Popen] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def __getstate__(self):
+        # the cat-file process is never shared between processes
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.path = state["path"]
+        self._process = None
+
+    def close(self):
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+                self._process.wait()
+            except Exception:
+                pass
+            self._process = None
+
+    @property
+    def process(self) -> subprocess.Popen:
+        if self._process is None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=str(self.path),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        return self._process
+
+    def read_object(self, ref: str) -> Tuple[str, bytes]:
+        """
+        Returns the type and the raw content of any git object
+        """
+        process = self.process
+        process.stdin.write(ref.encode() + b"\n")
+        process.stdin.flush()
+
+        header = process.stdout.readline().split()
+        if len(header) != 3:
+            raise KeyError(f"git object '{ref}' not found in {self.path}")
+
+        size = int(header[2])
+        content = process.stdout.read(size)
+        process.stdout.read(1)
+        return header[1].decode(), content
+
+    def read_blob(self, ref: str) -> bytes:
+        obj_type, content = self.read_object(ref)
+        if obj_type != "blob":
+            raise ValueError(f"git object '{ref}' is a {obj_type}, expected blob")
+        return content
+
+    def read_tree(self, ref: str) -> Generator[Tuple[str, str, bool], None, None]:
+        """
+        Yields (name, hash, is_tree) for each entry of a tree object
+        """
+        obj_type, content = self.read_object(ref)
+        if obj_type != "tree":
+            raise ValueError(f"git object '{ref}' is a {obj_type}, expected tree")
+
+        pos = 0
+        while pos < len(content):
+            space = content.index(b" ", pos)
+            zero = content.index(b"\0", space)
+            mode = content[pos:space]
+            name = content[space + 1:zero].decode()
+            yield name, content[zero + 1:zero + 21].hex(), mode == b"40000"
+            pos = zero + 21
+
+    def get_tree_hash(self, commit_hash: str, path: str = "") -> Optional[str]:
+        """
+        Returns the hash of the tree at `path` in the given commit,
+        or None if the path does not exist.
+        """
+        obj_type, content = self.read_object(commit_hash)
+        if obj_type != "commit":
+            raise ValueError(f"git object '{commit_hash}' is a {obj_type}, expected commit")
+        tree_hash = content[5:content.index(b"\n")].decode()
+
+        for part in path.strip("/").split("/"):
+            if not part:
+                continue
+            for name, hash, is_tree in self.read_tree(tree_hash):
+                if is_tree and name == part:
+                    tree_hash = hash
+                    break
+            else:
+                return None
+
+        return tree_hash
+
+    def read_file(self, commit_hash: str, filename: str) -> Optional[bytes]:
+        """
+        Returns the content of the file in the given commit,
+        or None if it does not exist.
+        """
+        path, _, name = filename.strip("/").rpartition("/")
+        tree_hash = self.get_tree_hash(commit_hash, path)
+        if tree_hash is not None:
+            for entry_name, hash, is_tree in self.read_tree(tree_hash):
+                if entry_name == name and not is_tree:
+                    return self.read_blob(hash)
+
+    def iter_files(
+            self,
+            commit_hash: str,
+            path: str = "",
+            known: Optional[Dict[str, Dict[str, str]]] = None,
+    ) -> Generator[Tuple[str, str], None, None]:
+        """
+        Yields (filename, blob hash) of all files below `path`.
+
+        If `known` is given, it maps each visited tree path to the
+        hashes of its entries and is updated in-place. Sub-trees and
+        blobs whose hash did not change since the previous call
+        with the same `known` dict are skipped.
+        """
+        path = path.strip("/")
+        tree_hash = self.get_tree_hash(commit_hash, path)
+        if tree_hash is not None:
+            yield from self._iter_tree(tree_hash, path, known, False)
+
+    def _iter_tree(
+            self,
+            tree_hash: str,
+            prefix: str,
+            known: Optional[Dict[str, Dict[str, str]]],
+            is_new: bool,
+    ) -> Generator[Tuple[str, str], None, None]:
+        entries = list(self.read_tree(tree_hash))
+
+        previous = {}
+        if known is not None:
+            if not is_new:
+                previous = known.get(prefix, previous)
+            known[prefix] = {name: hash for name, hash, _ in entries}
+
+        for name, hash, is_tree in entries:
+            if previous.get(name) == hash:
+                continue
+
+            filename = f"{prefix}/{name}" if prefix else name
+            if is_tree:
+                yield from self._iter_tree(hash, filename, known, name not in previous)
+            else:
+                yield filename, hash
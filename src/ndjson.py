@@ -11,11 +11,11 @@ class NDJson:
     def __init__(
             self,
             filename: Union[str, Path],
-            mode: 'Literal["r", "w"]' = "r",
+            mode: 'Literal["r", "w", "a"]' = "r",
             ensure_ascii: bool = False,
             separators: Tuple[str, str] = (',', ':'),
     ):
-        assert mode in "rw", mode
+        assert mode in ("r", "w", "a"), mode
 
         self.filename = filename
         self._io = None
@@ -52,7 +52,7 @@ class NDJson:
                 yield json.loads(line)
 
     def write(self, data: Union[dict, list, tuple]):
-        if self.mode != "w":
+        if self.mode not in ("w", "a"):
             raise RuntimeError(f"Can not write to NDJson(mode={repr(self.mode)})")
         if self._io is None:
             raise RuntimeError("NdJson is not open yet")
@@ -82,3 +82,11 @@ class TestNdJson(unittest.TestCase):
                     [{"a": 1}, {"b": 2}],
                     list(NDJson(filename))
                 )
+
+                with NDJson(filename, "a") as fp:
+                    fp.write({"c": 3})
+
+                self.assertEqual(
+                    [{"a": 1}, {"b": 2}, {"c": 3}],
+                    list(NDJson(filename))
+                )
@@ -1,3 +1,5 @@
 from .iterator import TeletextIterator
 from .page import TeletextPage
 from .teletext import Teletext
+from .dedup import TeletextPageDeduplicator
+from .history import TeletextHistory, TeletextHistoryWriter
@@ -1,3 +1,6 @@
+import functools
+from typing import List, Optional
+
 
 
 CHANNEL_CATEGORIES_MAP = {
@@ -155,18 +158,30 @@ CHANNEL_CATEGORIES_MAP = {
 }
 
 
-def get_page_category(channel: str, page: int, timestamp: str) -> str:
+def get_page_category(channel: str, page: int, timestamp: Optional[str] = None) -> str:
+    """
+    Returns the category of the page.
+
+    `timestamp` is not used yet, all pages are categorized
+    with the current layout of the channel.
+    """
+    table = _get_channel_table(channel)
+    if page < 0:
+        return "undefined"
+    return table[min(page, len(table) - 1)]
+
+
+@functools.lru_cache()
+def _get_channel_table(channel: str) -> List[str]:
+    """
+    Returns the category of each page number 0-999 of the channel
+    """
     if channel not in CHANNEL_CATEGORIES_MAP:
         raise ValueError(f"Channel '{channel}' not in CHANNEL_CATEGORIES_MAP")
 
+    table = []
     last_category = "undefined"
-    for num in sorted(CHANNEL_CATEGORIES_MAP[channel]):
-        categories = CHANNEL_CATEGORIES_MAP[channel]
-
-        if page == num:
-            return categories[num]
-        if num > page:
-            return last_category
-        last_category = categories[num]
-
-    return last_category
+    for page in range(1000):
+        last_category = CHANNEL_CATEGORIES_MAP[channel].get(page, last_category)
+        table.append(last_category)
+    return table
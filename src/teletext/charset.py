@@ -1,4 +1,8 @@
 # from https://github.com/ali1234/vhs-teletext/blob/master/teletext/charset.py
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
 
 #	Name:   Map from Teletext G0 character set to Unicode
 #	Date:   2018 April 20
@@ -503,3 +507,115 @@ g3 = {
     0x7C: chr(0x1FB6E), # RIGHT TRIANGULAR ONE QUARTER BLOCK
     0x7D: chr(0x1FB6F), # LOWER TRIANGULAR ONE QUARTER BLOCK
 }
+
+
+VD_GLYPH_TO_UTF8 = [
+#   x0   x1   x2   x3   x4   x5   x6   x7   x8   x9   xA   xB   xC   xD   xE   xF
+    " ", "!","\"", "#", "¤", "%", "&", "'", "(", ")", "*", "+", ",", "-", ".", "/",  # 0x
+    "0", "1", "2", "3", "4", "5", "6", "7", "8", "9", ":", ";", "<", "=", ">", "?",  # 1x
+    "@", "A", "B", "C", "D", "E", "F", "G", "H", "I", "J", "K", "L", "M", "N", "O",  # 2x
+    "P", "Q", "R", "S", "T", "U", "V", "W", "X", "Y", "Z", "[","\\", "]", "^", "_",  # 3x
+    "`", "a", "b", "c", "d", "e", "f", "g", "h", "i", "j", "k", "l", "m", "n", "o",  # 4x
+    "p", "q", "r", "s", "t", "u", "v", "w", "x", "y", "z", "{", "|", "}", "~", "■",  # 5x
+    " ", "🬀", "🬁", "🬂", "🬃", "🬄", "🬅", "🬆", "🬇", "🬈", "🬉", "🬊", "🬋", "🬌", "🬍", "🬎",  # 6x
+    "🬏", "🬐", "🬑", "🬒", "🬓", "▌", "🬔", "🬕", "🬖", "🬗", "🬘", "🬙", "🬚", "🬛", "🬜", "🬝",  # 7x
+    "🬞", "🬟", "🬠", "🬡", "🬢", "🬣", "🬤", "🬥", "🬦", "🬧", "▐", "🬨", "🬩", "🬪", "🬫", "🬬",  # 8x
+    "🬭", "🬮", "🬯", "🬰", "🬱", "🬲", "🬳", "🬴", "🬵", "🬶", "🬷", "🬸", "🬹", "🬺", "🬻", "█",  # 9x
+    "#", "¤", "@", "[", "\\","]", "^", "_", "{", "|", "}", "~", " ", " ", " ", " ",  # Ax English
+    "#", "$", "§", "Ä", "Ö", "Ü", "^", "_", "°", "ä", "ö", "ü", "ß", " ", " ", " ",  # Bx German
+    "#", "¤", "É", "Ä", "Ö", "Å", "Ü", "_", "é", "ä", "ö", "å", "ü", " ", " ", " ",  # Cx Swedish/Finnish/Hungarian
+    "£", "$", "é", "°", "ç", "→", "↑", "#", "ù", "à", "ò", "è", "ì", " ", " ", " ",  # Dx Italian
+    "é", "ï", "à", "ë", "ê", "ù", "î", "#", "è", "â", "ô", "û", "ç", " ", " ", " ",  # Ex French
+    "ç", "$", "¡", "á", "é", "í", "ó", "ú", "¿", "ü", "ñ", "è", "à", " ", " ", " ",  # Fx Portuguese/Spanish
+]
+assert len(VD_GLYPH_TO_UTF8) == 0x100, len(VD_GLYPH_TO_UTF8)
+
+def glyph_to_utf8(glyph: int) -> Optional[str]:
+    if 0 <= glyph <= 0xff:
+        return VD_GLYPH_TO_UTF8[glyph]
+
+
+def _compile_charset(mapping: Dict[int, str]) -> np.ndarray:
+    table = np.full(0x80, 0x20, dtype=np.uint32)
+    for code, char in mapping.items():
+        table[code] = ord(char)
+    return table
+
+
+def _compile_t42_charsets() -> List[np.ndarray]:
+    """
+    Returns the G0 table of each national option (0-7)
+    and the mosaic table as used in T42 captures
+    """
+    national = {
+        c: i for i, c in enumerate((
+            0x23, 0x24, 0x40, 0x5B, 0x5C, 0x5D, 0x5E, 0x5F, 0x60, 0x7B, 0x7C, 0x7D, 0x7E
+        ))
+    }
+    tables = []
+    for language in range(8):
+        mapping = {}
+        for c in range(0x20, 0x80):
+            glyph = c - 0x20
+            if c in national:
+                glyph = 0xA0 + national[c] + language * 0x10
+            mapping[c] = glyph_to_utf8(glyph) or " "
+        tables.append(_compile_charset(mapping))
+
+    mapping = {}
+    for c in range(0x20, 0x80):
+        if c <= 0x3f:
+            glyph = c - 0x20 + 0x60
+        elif c <= 0x5f:
+            glyph = c - 0x20
+        else:
+            glyph = c - 0x60 + 0x80
+        mapping[c] = glyph_to_utf8(glyph) or " "
+    tables.append(_compile_charset(mapping))
+    return tables
+
+
+# row index into CHARSET_TABLE for each character set
+CHARSETS: Dict[str, int] = {
+    **{f"t42-national-{i}": i for i in range(8)},
+    "t42-mosaic": 8,
+    "g0": 9,
+    "g0-cyr": 10,
+    "g1": 11,
+    "g2": 12,
+    "g3": 13,
+}
+T42_MOSAIC = CHARSETS["t42-mosaic"]
+
+# (charset, 7-bit code) -> unicode code point, undefined codes are spaces
+CHARSET_TABLE: np.ndarray = np.stack(_compile_t42_charsets() + [
+    _compile_charset(g0["default"]),
+    _compile_charset(g0["cyr"]),
+    _compile_charset(g1),
+    _compile_charset(g2),
+    _compile_charset(g3),
+])
+CHARSET_TABLE.flags.writeable = False
+
+
+def to_codepoints(codes: np.ndarray, charsets: Union[int, str, np.ndarray]) -> np.ndarray:
+    """
+    Converts an array of 7-bit codes into unicode code points.
+
+    `charsets` is a name or index of `CHARSETS`, or an array of
+    indices that is broadcast against `codes`.
+    """
+    if isinstance(charsets, str):
+        charsets = CHARSETS[charsets]
+    index = (np.asarray(charsets, dtype=np.uint16) << 7) | (np.asarray(codes) & 0x7f)
+    return np.take(CHARSET_TABLE.ravel(), index)
+
+
+def codepoints_to_lines(codepoints: np.ndarray) -> List[str]:
+    """
+    Converts a (rows, columns) array of unicode code points into one string per row
+    """
+    codepoints = np.asarray(codepoints)
+    width = codepoints.shape[-1]
+    text = codepoints.astype("<u4", copy=False).tobytes().decode("utf-32-le")
+    return [text[i:i + width] for i in range(0, len(text), width)]
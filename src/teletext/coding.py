@@ -149,3 +149,24 @@ def crc(n, c):
         r = ((n >> b) & 1) ^ ((c >> 6) & 1) ^ ((c >> 8) & 1) ^ ((c >> 11) & 1) ^ ((c >> 15) & 1)
         c = r | ((c & 0x7FFF) << 1)
     return c
+
+
+# table-driven crc: the crc is linear, so crc(n, c) == crc(n, 0) ^ crc(0, c & 0xff00) ^ crc(0, c & 0xff)
+crc_byte_tab = np.array([crc(n, 0) for n in range(256)], dtype=np.uint16)
+crc_byte_tab.flags.writeable = False
+crc_hi_tab = np.array([crc(0, c << 8) for c in range(256)], dtype=np.uint16)
+crc_hi_tab.flags.writeable = False
+crc_lo_tab = np.array([crc(0, c) for c in range(256)], dtype=np.uint16)
+crc_lo_tab.flags.writeable = False
+
+
+def crc_bytes(a, c=0):
+    """
+    Returns the crc of the last axis of the uint8 array `a`,
+    e.g. of one crc per row for 2-dimensional arrays.
+    """
+    a = np.asarray(a, dtype=np.uint8)
+    c = np.full(a.shape[:-1], c, dtype=np.uint16)
+    for i in range(a.shape[-1]):
+        c = crc_byte_tab[a[..., i]] ^ crc_hi_tab[c >> 8] ^ crc_lo_tab[c & 0xff]
+    return c
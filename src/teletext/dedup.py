@@ -0,0 +1,78 @@
+import hashlib
+from collections import OrderedDict
+from typing import Tuple, Generator, Iterable
+
+from .page import TeletextPage
+from .teletext import Teletext, LazyTeletextPages, split_lines
+
+
+class TeletextPageDeduplicator:
+    """
+    Remembers a hash of the content of each (channel, page, sub_page)
+    and tells if a page has changed since the previous snapshot.
+
+    The hash is computed from the undecoded ndjson lines, so unchanged
+    pages never need to be rendered. Only the `max_size` most recently
+    seen pages are remembered.
+    """
+
+    # channels whose first line contains the current time
+    STATUS_LINE_CHANNELS = ("zdf", "zdf-info", "zdf-neo", "ntv", "sr")
+
+    def __init__(self, max_size: int = 200_000):
+        self.max_size = max_size
+        self.num_changed = 0
+        self.num_unchanged = 0
+        self._hashes: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def iter_changed_pages(self, tt: Teletext) -> Generator[TeletextPage, None, None]:
+        """
+        Yields all pages of the snapshot whose content changed
+        since they were last seen.
+        """
+        for index in tt.page_index:
+            if self.is_changed(tt, index):
+                yield tt.pages[index]
+
+    def is_changed(self, tt: Teletext, index: Tuple[int, int]) -> bool:
+        key = (tt.channel, *index)
+        content_hash = self.content_hash(tt, index)
+
+        changed = self._hashes.get(key) != content_hash
+        if changed:
+            self.num_changed += 1
+            self._hashes[key] = content_hash
+            if len(self._hashes) > self.max_size:
+                self._hashes.popitem(last=False)
+        else:
+            self.num_unchanged += 1
+        self._hashes.move_to_end(key)
+
+        return changed
+
+    def content_hash(self, tt: Teletext, index: Tuple[int, int]) -> bytes:
+        raw = None
+        if isinstance(tt.pages, LazyTeletextPages):
+            raw = tt.pages.get_raw(index)
+
+        if raw is not None:
+            lines = split_lines(bytes(raw))[1:]
+        else:
+            lines = (line.encode() for line in tt.pages[index]._lines_ndjson)
+
+        return self._hash_lines(lines, skip_first=tt.channel in self.STATUS_LINE_CHANNELS)
+
+    @classmethod
+    def _hash_lines(cls, lines: Iterable[bytes], skip_first: bool) -> bytes:
+        hasher = hashlib.blake2b(digest_size=16)
+        for line in lines:
+            if line:
+                if skip_first:
+                    skip_first = False
+                    continue
+                hasher.update(line)
+                hasher.update(b"\n")
+        return hasher.digest()
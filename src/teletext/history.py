@@ -0,0 +1,294 @@
+import bisect
+import gzip
+import json
+import re
+from pathlib import Path
+from typing import Optional, Tuple, List, Dict, Union, Generator, Iterable, IO
+
+from ..ndjson import NDJson
+from .page import TeletextPage
+from .teletext import Teletext
+from .categories import get_page_category
+
+
+class TeletextHistoryWriter:
+    """
+    Writes the history of teletext snapshots as ndjson records
+    per (channel, page, sub_page).
+
+    A page is stored as a keyframe with all its lines the first time
+    and after every `keyframe_interval` changes. In between,
+    only the lines that changed since the previous snapshot are stored.
+    Unchanged pages are not stored at all.
+
+    Records look like:
+
+        {"channel":"ard","page":100,"sub_page":1,"timestamp":"...","page_timestamp":"...","lines":["[...]", ...]}
+        {"channel":"ard","page":100,"sub_page":1,"timestamp":"...","page_timestamp":"...","changes":[[3,"[...]"]],"num_lines":24}
+        {"channel":"ard","page":100,"sub_page":1,"timestamp":"...","removed":true}
+
+    and keyframes and changes may contain an "error" field.
+
+    "timestamp" is the time of the snapshot and "page_timestamp"
+    the time the page itself was scraped.
+    """
+
+    def __init__(
+            self,
+            filename: Union[str, Path],
+            keyframe_interval: int = 100,
+    ):
+        self.filename = filename
+        self.keyframe_interval = keyframe_interval
+        self.num_records = 0
+        # channel -> (page, sub_page) -> (lines, error, number of deltas since keyframe)
+        self._state: Dict[str, Dict[Tuple[int, int], Tuple[List[str], Optional[str], int]]] = {}
+        self._file: Optional[NDJson] = None
+
+    def __enter__(self):
+        self._file = NDJson(self.filename, "w")
+        self._file.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._file.__exit__(exc_type, exc_val, exc_tb)
+        self._file = None
+
+    def add(self, tt: Teletext) -> int:
+        """
+        Stores the changes of one channel snapshot.
+        Returns the number of changed pages.
+        """
+        state = self._state.setdefault(tt.channel, {})
+        num_changed = 0
+        for index in tt.page_index:
+            if self._add_page(state, tt.channel, tt.timestamp, tt.pages[index]):
+                num_changed += 1
+
+        for index in sorted(set(state) - set(tt.page_index)):
+            self._write((tt.channel, *index), tt.timestamp, removed=True)
+            del state[index]
+            num_changed += 1
+
+        return num_changed
+
+    def _add_page(self, state: dict, channel: str, timestamp: str, page: TeletextPage) -> bool:
+        index = (page.index, page.sub_index)
+        key = (channel, *index)
+        lines = page._lines_ndjson
+        error = page.error or None
+        prev = state.get(index)
+
+        if prev is not None:
+            prev_lines, prev_error, num_deltas = prev
+            if lines == prev_lines and error == prev_error:
+                return False
+
+            if num_deltas < self.keyframe_interval:
+                changes = [
+                    [i, line]
+                    for i, line in enumerate(lines)
+                    if i >= len(prev_lines) or line != prev_lines[i]
+                ]
+                self._write(
+                    key, timestamp, error=error, page_timestamp=page.timestamp,
+                    changes=changes, num_lines=len(lines),
+                )
+                state[index] = (list(lines), error, num_deltas + 1)
+                return True
+
+        self._write(key, timestamp, error=error, page_timestamp=page.timestamp, lines=lines)
+        state[index] = (list(lines), error, 0)
+        return True
+
+    def _write(self, key: Tuple[str, int, int], timestamp: str, error: Optional[str] = None, **kwargs):
+        record = {"channel": key[0], "page": key[1], "sub_page": key[2], "timestamp": timestamp}
+        if error:
+            record["error"] = error
+        record.update(kwargs)
+        self._file.write(record)
+        self.num_records += 1
+
+
+class TeletextHistory:
+    """
+    Reader for the files of `TeletextHistoryWriter`.
+
+    Rebuilds pages or whole channel snapshots at any point in time
+    and iterates over the changed lines only.
+
+    Only the timestamp and file offset of each record are kept in memory.
+    A page is rebuilt by reading its nearest keyframe and the following
+    changes from the file.
+    """
+
+    _RE_RECORD = re.compile(rb'\{"channel":"([^"]*)","page":(\d+),"sub_page":(\d+),"timestamp":"([^"]*)"')
+
+    _KEYFRAME = 0
+    _CHANGES = 1
+    _REMOVED = 2
+
+    def __init__(self, filename: Union[str, Path]):
+        self.filename = filename
+        self.num_records = 0
+        # (channel, page, sub_page) -> (timestamps, file offsets, record types)
+        self._page_records: Dict[Tuple[str, int, int], Tuple[List[str], List[int], List[int]]] = {}
+
+        offset = 0
+        with self._open() as fp:
+            for line in fp:
+                match = self._RE_RECORD.match(line)
+                if match:
+                    key = (match.group(1).decode(), int(match.group(2)), int(match.group(3)))
+                    timestamp = match.group(4).decode()
+                    if b'"lines":' in line:
+                        record_type = self._KEYFRAME
+                    elif b'"removed":' in line:
+                        record_type = self._REMOVED
+                    else:
+                        record_type = self._CHANGES
+                else:
+                    record = json.loads(line)
+                    key = (record["channel"], record["page"], record["sub_page"])
+                    timestamp = record["timestamp"]
+                    record_type = (
+                        self._KEYFRAME if "lines" in record
+                        else self._REMOVED if "removed" in record
+                        else self._CHANGES
+                    )
+
+                timestamps, offsets, record_types = self._page_records.setdefault(key, ([], [], []))
+                timestamps.append(timestamp)
+                offsets.append(offset)
+                record_types.append(record_type)
+                offset += len(line)
+                self.num_records += 1
+
+    def channels(self) -> List[str]:
+        return sorted({key[0] for key in self._page_records})
+
+    def get_page(self, channel: str, page: int, sub_page: int, timestamp: str) -> Optional[TeletextPage]:
+        """
+        Returns the page as it was at `timestamp`,
+        or None if it did not exist at that time.
+        """
+        key = (channel, page, sub_page)
+        offsets = self._get_record_offsets(key, timestamp)
+        if offsets:
+            return self._build_page(key, self._read_records(offsets))
+
+    def get_teletext(self, channel: str, timestamp: str) -> Teletext:
+        """
+        Rebuilds all pages of the channel as they were at `timestamp`
+        """
+        tt = Teletext()
+        tt.channel = channel
+        tt.timestamp = timestamp
+
+        # read the records of all pages in a single pass through the file
+        key_offsets = {}
+        for key in self._page_records:
+            if key[0] == channel:
+                offsets = self._get_record_offsets(key, timestamp)
+                if offsets:
+                    key_offsets[key] = offsets
+
+        all_offsets = sorted(o for offsets in key_offsets.values() for o in offsets)
+        records = dict(zip(all_offsets, self._read_records(all_offsets)))
+        for key, offsets in key_offsets.items():
+            tt.pages[key[1:]] = self._build_page(key, [records[o] for o in offsets])
+
+        tt.page_index = sorted(tt.pages)
+        return tt
+
+    def iter_changed_lines(
+            self,
+            channels: Optional[Iterable[str]] = None,
+    ) -> Generator[Tuple[str, int, int, str, int, str], None, None]:
+        """
+        Yields (channel, page, sub_page, timestamp, line index, ndjson line)
+        for each new or changed line, in the order of the snapshots.
+        """
+        channels = None if channels is None else set(channels)
+        current_lines: Dict[Tuple[str, int, int], List[str]] = {}
+
+        for record in NDJson(self.filename):
+            if channels is not None and record["channel"] not in channels:
+                continue
+
+            key = (record["channel"], record["page"], record["sub_page"])
+            if "removed" in record:
+                current_lines.pop(key, None)
+                continue
+
+            lines = current_lines.setdefault(key, [])
+            if "lines" in record:
+                changes = [
+                    (i, line)
+                    for i, line in enumerate(record["lines"])
+                    if i >= len(lines) or line != lines[i]
+                ]
+                current_lines[key] = list(record["lines"])
+            else:
+                changes = record["changes"]
+                _apply_changes(lines, record)
+
+            for i, line in changes:
+                yield (*key, record["timestamp"], i, line)
+
+    def _open(self) -> IO[bytes]:
+        if str(self.filename).lower().endswith(".gz"):
+            return gzip.open(self.filename, "rb")
+        return open(self.filename, "rb")
+
+    def _get_record_offsets(self, key: Tuple[str, int, int], timestamp: str) -> List[int]:
+        """
+        Returns the file offsets of the keyframe and changes that
+        make up the page at `timestamp`
+        """
+        entry = self._page_records.get(key)
+        if entry is None:
+            return []
+        timestamps, offsets, record_types = entry
+        end = bisect.bisect_right(timestamps, timestamp)
+        if end == 0 or record_types[end - 1] == self._REMOVED:
+            return []
+
+        start = end - 1
+        while record_types[start] != self._KEYFRAME:
+            start -= 1
+        return offsets[start:end]
+
+    def _read_records(self, offsets: List[int]) -> List[dict]:
+        """
+        Reads the records at the ascending `offsets`
+        """
+        records = []
+        with self._open() as fp:
+            for offset in offsets:
+                fp.seek(offset)
+                records.append(json.loads(fp.readline()))
+        return records
+
+    def _build_page(self, key: Tuple[str, int, int], records: List[dict]) -> TeletextPage:
+        lines = list(records[0]["lines"])
+        for record in records[1:]:
+            _apply_changes(lines, record)
+
+        record = records[-1]
+        tt_page = TeletextPage()
+        tt_page.channel, tt_page.index, tt_page.sub_index = key
+        tt_page.timestamp = record.get("page_timestamp") or record["timestamp"]
+        tt_page.error = record.get("error")
+        tt_page.category = get_page_category(tt_page.channel, tt_page.index, tt_page.timestamp)
+        tt_page._lines_ndjson = lines
+        return tt_page
+
+
+def _apply_changes(lines: List[str], record: dict):
+    del lines[record["num_lines"]:]
+    for i, line in record["changes"]:
+        if i < len(lines):
+            lines[i] = line
+        else:
+            lines.append(line)
@@ -1,12 +1,80 @@
-import io
-from typing import Optional, List
+import math
+from pathlib import Path
+from typing import Optional, List, Tuple, Dict, Iterable, Union
 
+import numpy as np
 from PIL import Image, ImageFont, ImageDraw
 
 from .page import TeletextPage
 
 
+class GlyphAtlas:
+    """
+    Pre-rasterized glyphs of one font in fixed size cells.
+
+    Glyphs are rendered once on first use and kept as
+    (num_glyphs, cell_height, cell_width) uint8 coverage array.
+    Index 0 is the empty glyph.
+    """
+
+    _instances: Dict[tuple, "GlyphAtlas"] = {}
+
+    def __init__(self, font: ImageFont.ImageFont, cell_width: int, cell_height: int):
+        self.font = font
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.glyphs = np.zeros((1, cell_height, cell_width), dtype=np.uint8)
+        self._glyph_index: Dict[int, int] = {0: 0}
+
+    @classmethod
+    def get(cls, font_filename: Optional[str], font_size: int, cell_width: int, cell_height: int) -> "GlyphAtlas":
+        """
+        Returns the shared atlas for the font and cell size
+        """
+        key = (font_filename, font_size, cell_width, cell_height)
+        if key not in cls._instances:
+            if font_filename:
+                font = ImageFont.truetype(str(font_filename), font_size)
+            else:
+                try:
+                    font = ImageFont.load_default(font_size)
+                except TypeError:
+                    # Pillow < 10.1
+                    font = ImageFont.load_default()
+            cls._instances[key] = cls(font, cell_width, cell_height)
+        return cls._instances[key]
+
+    def lookup(self, codepoints: np.ndarray) -> np.ndarray:
+        """
+        Converts an array of unicode code points into glyph indices
+        """
+        unique, inverse = np.unique(codepoints, return_inverse=True)
+        missing = [int(c) for c in unique if int(c) not in self._glyph_index]
+        if missing:
+            self._add_glyphs(missing)
+        indices = np.array([self._glyph_index[int(c)] for c in unique], dtype=np.int32)
+        return indices[inverse].reshape(codepoints.shape)
+
+    def _add_glyphs(self, codepoints: List[int]):
+        glyphs = []
+        for codepoint in codepoints:
+            image = Image.new("L", (self.cell_width, self.cell_height))
+            ImageDraw.ImageDraw(image).text((0, 0), chr(codepoint), font=self.font, fill=255)
+            self._glyph_index[codepoint] = len(self.glyphs) + len(glyphs)
+            glyphs.append(np.asarray(image))
+        self.glyphs = np.concatenate([self.glyphs, np.stack(glyphs)])
+
+
 class TeletextImageRenderer:
+    """
+    Renders teletext pages into RGB images.
+
+    All character cells of one or many pages are composited at once
+    from a `GlyphAtlas` and fore- and background color planes.
+
+    If `font` is not given, the first existing file of `FONT_FILENAMES`
+    is used, or Pillow's default font if none exists.
+    """
 
     COLORS = {
         "b": (0, 0, 0),
@@ -19,41 +87,116 @@ class TeletextImageRenderer:
         "w": (255, 255, 255),
     }
 
-    def __init__(self, width: int = 40, height: int = 25, cell_width: int = 8, cell_height: int = 8):
+    FONT_FILENAMES = (
+        Path("~/.local/share/fonts/unscii-8.ttf").expanduser(),
+        Path("/usr/share/fonts/truetype/unscii/unscii-8.ttf"),
+    )
+
+    def __init__(
+            self,
+            width: int = 40,
+            height: int = 25,
+            cell_width: int = 8,
+            cell_height: int = 8,
+            font: Union[str, Path, None] = None,
+            font_size: int = 8,
+    ):
         self.width = width
         self.height = height
         self.cell_width = cell_width
         self.cell_height = cell_height
-        self._font = None
+        self.font_filename = font
+        self.font_size = font_size
+        self._atlas: Optional[GlyphAtlas] = None
+        # colors in teletext order, same as T42Grid.fg/bg
+        self._palette = np.array(list(self.COLORS.values()), dtype=np.int32)
+        self._color_index = {c: i for i, c in enumerate(self.COLORS)}
+
+    @property
+    def atlas(self) -> GlyphAtlas:
+        if self._atlas is None:
+            font_filename = self.font_filename
+            if font_filename is None:
+                for filename in self.FONT_FILENAMES:
+                    if filename.exists():
+                        font_filename = filename
+                        break
+            self._atlas = GlyphAtlas.get(font_filename, self.font_size, self.cell_width, self.cell_height)
+        return self._atlas
 
     @property
-    def font(self):
-        if self._font is None:
-            self._font = ImageFont.truetype("/home/bergi/.local/share/fonts/unscii-8.ttf", 8)
-        return self._font
+    def font(self) -> ImageFont.ImageFont:
+        return self.atlas.font
 
     def render(self, page: TeletextPage) -> Image.Image:
-        image = Image.new("RGB", (self.width * self.cell_width, self.height * self.cell_height))
-        draw = ImageDraw.ImageDraw(image)
+        return Image.fromarray(self.render_many([page])[0])
+
+    def render_many(self, pages: Iterable[TeletextPage]) -> np.ndarray:
+        """
+        Renders all pages into a (num_pages, height, width, 3) uint8 array,
+        e.g. for writing video frames.
+        """
+        cells = [self._page_cells(page) for page in pages]
+        if not cells:
+            return np.zeros((0, self.height * self.cell_height, self.width * self.cell_width, 3), dtype=np.uint8)
+        return self.render_cells(*(np.stack(c) for c in zip(*cells)))
+
+    def render_contact_sheet(self, pages: Iterable[TeletextPage], columns: int = 8) -> Image.Image:
+        """
+        Renders all pages next to each other, `columns` per row
+        """
+        images = self.render_many(pages)
+        num, height, width, _ = images.shape
+        rows = max(1, math.ceil(num / columns))
+        columns = min(columns, max(1, num))
+
+        sheet = np.zeros((rows * columns, height, width, 3), dtype=np.uint8)
+        sheet[:num] = images
+        sheet = sheet.reshape(rows, columns, height, width, 3).transpose(0, 2, 1, 3, 4)
+        return Image.fromarray(sheet.reshape(rows * height, columns * width, 3))
 
-        y = 0
-        for line in page.lines:
-            if y >= (self.height - 1) * self.cell_height:
-                continue
+    def render_cells(self, codepoints: np.ndarray, fg: np.ndarray, bg: np.ndarray) -> np.ndarray:
+        """
+        Composites (..., rows, columns) arrays of unicode code points
+        and fore- and background color indices (0-7) into
+        (..., rows * cell_height, columns * cell_width, 3) uint8 images.
+        """
+        *batch, rows, columns = codepoints.shape
+        glyph_indices = self.atlas.lookup(codepoints)
+        coverage = self.atlas.glyphs[glyph_indices].astype(np.int32)
+        fg_rgb = self._palette[fg][..., None, None, :]
+        bg_rgb = self._palette[bg][..., None, None, :]
+
+        # (..., rows, columns, cell_height, cell_width, 3)
+        pixels = bg_rgb + (fg_rgb - bg_rgb) * coverage[..., None] // 255
+
+        pixels = np.moveaxis(pixels, -4, -3)
+        return pixels.reshape(*batch, rows * self.cell_height, columns * self.cell_width, 3).astype(np.uint8)
+
+    def render_grid(self, grid) -> Image.Image:
+        """
+        Renders a `T42Grid` of a decoded T42 page
+        """
+        return Image.fromarray(self.render_cells(grid.glyphs, grid.fg, grid.bg))
+
+    def _page_cells(self, page: TeletextPage) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        shape = (self.height, self.width)
+        codepoints = np.zeros(shape, dtype=np.uint32)
+        fg = np.full(shape, 7, dtype=np.uint8)
+        bg = np.zeros(shape, dtype=np.uint8)
+
+        # the last row stays empty
+        for y, line in enumerate(page.lines[:self.height - 1]):
             x = 0
             for block in line:
-                for c in block.text:
-                    if x < (self.width + 1) * self.cell_width:
-                        draw.rectangle(
-                            ((x, y), (x + self.cell_width, y + self.cell_height)),
-                            fill=self.COLORS.get(block.bg_color, (0, 0, 0))
-                        )
-                        draw.text(
-                            (x, y), c,
-                            font=self.font,
-                            fill=self.COLORS.get(block.color, (255, 255, 255)),
-                        )
-                    x += self.cell_width
-
-            y += self.cell_height
-        return image
+                text = block.text[:self.width - x]
+                if text:
+                    end = x + len(text)
+                    codepoints[y, x:end] = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+                    fg[y, x:end] = self._color_index.get(block.color, 7)
+                    bg[y, x:end] = self._color_index.get(block.bg_color, 0)
+                    x = end
+                if x >= self.width:
+                    break
+
+        return codepoints, fg, bg
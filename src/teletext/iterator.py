@@ -1,23 +1,30 @@
-import json
-import tarfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
 from pathlib import Path
-from typing import Optional, Tuple, List, Iterable, Generator
+from typing import Optional, Tuple, List, Iterable, Generator, Dict, Deque
 
 from tqdm import tqdm
 
 
 from giterator import Giterator
 
+from .. import DATA_PATH
+from ..gitobjects import GitObjectReader
+from ..gitindex import GitCommitIndex
 from .teletext import Teletext, TeletextPage
 
 
 class TeletextIterator:
     """
     Access to Teletext instances throughout the git history
+
+    The commits of each repo are listed in a `GitCommitIndex`
+    which is stored in `COMMIT_INDEX_PATH` and updated on first use.
     """
 
     PROJECT_ROOT: Path = Path(__file__).resolve().parent.parent.parent
     SNAPSHOT_PATH = "docs/snapshots"
+    COMMIT_INDEX_PATH: Path = DATA_PATH / "git-index"
 
     def __init__(
             self,
@@ -27,6 +34,8 @@ class TeletextIterator:
         self.channels: List[str] = [] if channels is None else list(channels)
         self.verbose = verbose
         self.repos = []
+        self._commit_indices: Optional[List[GitCommitIndex]] = None
+        self._readers: Dict[int, GitObjectReader] = {}
 
         for repo_name in (
                 "teletext-archive-unicode",
@@ -38,62 +47,219 @@ class TeletextIterator:
             else:
                 print(f"NOT FOUND:", path)
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Stops the git processes used for reading snapshots
+        """
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
+
+    @property
+    def commit_indices(self) -> List[GitCommitIndex]:
+        """
+        One up-to-date commit index per repo
+        """
+        if self._commit_indices is None:
+            self._commit_indices = []
+            for repo in self.repos:
+                index = GitCommitIndex(
+                    repo.path, self.SNAPSHOT_PATH,
+                    filename=Path(self.COMMIT_INDEX_PATH) / f"{Path(repo.path).name}.ndjson",
+                )
+                index.update()
+                self._commit_indices.append(index)
+        return self._commit_indices
+
     def iter_teletexts(
             self,
             after_hash: Optional[str] = None,
+            num_workers: int = 0,
+            commits_per_task: int = 10,
     ) -> Generator[Teletext, None, None]:
+        """
+        Yields the Teletext of each channel snapshot of each commit.
+
+        If `after_hash` is given, iteration starts right after that commit.
 
-        for repo in self.repos:
-            commit_iterable = repo.iter_commits(self.SNAPSHOT_PATH)
+        With `num_workers` > 0 the commits are split into tasks of
+        `commits_per_task` commits which are read and parsed
+        in that many processes. The order stays the same.
+        """
+        if num_workers > 0:
+            yield from self._iter_teletexts_parallel(after_hash, num_workers, commits_per_task)
+            return
+
+        for repo_idx, commit_hashes in self._iter_repo_commits(after_hash):
             if self.verbose:
-                commit_iterable = tqdm(
-                    commit_iterable,
-                    desc=f"{repo.path} commits",
-                    total=repo.num_commits(self.SNAPSHOT_PATH),
-                )
+                commit_hashes = tqdm(commit_hashes, desc=f"{self.repos[repo_idx].path} commits")
 
-            yield_files = after_hash is None
+            for commit_hash in commit_hashes:
+                yield from _iter_commit_teletexts(
+                    self._reader(repo_idx), self.SNAPSHOT_PATH, commit_hash, self.channels,
+                )
 
-            for commit in commit_iterable:
+    def _iter_teletexts_parallel(
+            self,
+            after_hash: Optional[str],
+            num_workers: int,
+            commits_per_task: int,
+    ) -> Generator[Teletext, None, None]:
+        with ProcessPoolExecutor(num_workers) as pool:
+            for repo_idx, commit_hashes in self._iter_repo_commits(after_hash):
+                repo = self.repos[repo_idx]
+                tasks = [
+                    (repo.path, self.SNAPSHOT_PATH, commit_hashes[i: i + commits_per_task], self.channels)
+                    for i in range(0, len(commit_hashes), commits_per_task)
+                ]
 
-                if yield_files:
-                    for file in commit.iter_files(self.SNAPSHOT_PATH):
-                        name = file.name.split("/")[-1]
-                        if not name.endswith(".ndjson") or name.startswith("_"):
-                            continue
+                progress = None
+                if self.verbose:
+                    progress = tqdm(desc=f"{repo.path} commits", total=len(commit_hashes))
 
-                        channel = name.split(".")[0]
-                        if self.channels and channel not in self.channels:
+                # keep a bounded number of tasks in flight and yield them in order
+                futures: Deque[Tuple[Future, int]] = deque()
+                try:
+                    for task_idx in range(len(tasks) + num_workers * 2):
+                        if task_idx < len(tasks):
+                            task = tasks[task_idx]
+                            futures.append((pool.submit(_read_commits, *task), len(task[2])))
+                        if task_idx < num_workers * 2 - 1 or not futures:
                             continue
 
-                        tt = Teletext.from_ndjson(file.content)
-                        tt.commit_hash = commit.hash
-                        yield tt
+                        future, num_commits = futures.popleft()
+                        for data in future.result():
+                            yield Teletext.from_compact(data)
 
-                if after_hash and commit.hash.startswith(after_hash):
-                    yield_files = True
+                        if progress is not None:
+                            progress.update(num_commits)
+                finally:
+                    for future, _ in futures:
+                        future.cancel()
+                    if progress is not None:
+                        progress.close()
 
     def iter_commit_timestamps(self, after_hash: Optional[str] = None) -> Generator[Tuple[str, str], None, None]:
         """
         Yields the timestamp and the hash of each data commit
         """
-        yield_commits = after_hash is None
-        for commit in self.git.iter_commit_hashes(f"{self.SNAPSHOT_PATH}/zdf.ndjson"):
-            if yield_commits:
-                file = list(self.git.iter_files(commit["hash"], [f"{self.SNAPSHOT_PATH}/zdf.ndjson"]))[0]
-                header = json.loads(file.data.decode("utf-8").split("\n", 1)[0])
-                yield header["timestamp"], commit["hash"]
-
-            if after_hash and commit["hash"].startswith(after_hash):
-                yield_commits = True
+        for repo_idx, commit_hashes in self._iter_repo_commits(after_hash):
+            index = self.commit_indices[repo_idx]
+            start = len(index) - len(commit_hashes)
+            for timestamp, commit_hash in zip(index.timestamps[start:], commit_hashes):
+                yield timestamp, commit_hash
 
     def get_historic_teletext(self, channel: str, commit_hash: str) -> Optional[Teletext]:
-        try:
-            files = list(self.git.iter_files(commit_hash, [f"docs/snapshots/{channel}.ndjson"]))
-        except tarfile.ReadError:
-            return
-        if files:
-            tt = Teletext.from_ndjson(files[0].data)
-            tt.commit_hash = commit_hash
+        """
+        Returns the channel snapshot of the given commit (or hash prefix)
+        without walking the history.
+        """
+        filename = f"{self.SNAPSHOT_PATH}/{channel}.ndjson"
+        for repo_idx, index in enumerate(self.commit_indices):
+            pos = index.find_hash(commit_hash)
+            if pos is not None:
+                full_hash = index.hashes[pos]
+                content = self._reader(repo_idx).read_file(full_hash, filename)
+                break
+        else:
+            # not a data commit, ask git directly
+            for repo_idx in range(len(self.repos)):
+                try:
+                    content = self._reader(repo_idx).read_file(commit_hash, filename)
+                    break
+                except (KeyError, ValueError):
+                    pass
+            else:
+                return
+            full_hash = commit_hash
+
+        if content is not None:
+            tt = Teletext.from_ndjson(content)
+            tt.commit_hash = full_hash
             return tt
 
+    def get_teletext_at(self, channel: str, timestamp: str) -> Optional[Teletext]:
+        """
+        Returns the latest channel snapshot that was committed
+        at or before the (UTC) `timestamp`.
+        """
+        filename = f"{self.SNAPSHOT_PATH}/{channel}.ndjson"
+        best = None
+        for index in self.commit_indices:
+            pos = index.find_timestamp(timestamp, filename)
+            if pos is not None and (best is None or index.timestamps[pos] >= best[0]):
+                best = (index.timestamps[pos], index.hashes[pos])
+
+        if best is not None:
+            return self.get_historic_teletext(channel, best[1])
+
+    def _iter_repo_commits(self, after_hash: Optional[str] = None) -> Generator[Tuple[int, List[str]], None, None]:
+        """
+        Yields the repo index and the data commits of each repo,
+        starting after `after_hash` if given.
+        """
+        started = after_hash is None
+        for repo_idx, index in enumerate(self.commit_indices):
+            if started:
+                yield repo_idx, index.hashes
+            else:
+                pos = index.find_hash(after_hash)
+                if pos is not None:
+                    started = True
+                    yield repo_idx, index.hashes[pos + 1:]
+
+    def _reader(self, repo_idx: int) -> GitObjectReader:
+        if repo_idx not in self._readers:
+            self._readers[repo_idx] = GitObjectReader(self.repos[repo_idx].path)
+        return self._readers[repo_idx]
+
+
+def _iter_commit_teletexts(
+        reader: GitObjectReader,
+        snapshot_path: str,
+        commit_hash: str,
+        channels: List[str],
+) -> Generator[Teletext, None, None]:
+    for filename, blob_hash in reader.iter_files(commit_hash, snapshot_path):
+        name = filename.split("/")[-1]
+        if not name.endswith(".ndjson") or name.startswith("_"):
+            continue
+
+        channel = name.split(".")[0]
+        if channels and channel not in channels:
+            continue
+
+        tt = Teletext.from_ndjson(reader.read_blob(blob_hash))
+        tt.commit_hash = commit_hash
+        yield tt
+
+
+# one cat-file process per repo and worker process
+_worker_readers: Dict[str, GitObjectReader] = {}
+
+
+def _read_commits(
+        repo_path: str,
+        snapshot_path: str,
+        commit_hashes: List[str],
+        channels: List[str],
+) -> List[tuple]:
+    """
+    Parses all channel snapshots of the given commits and
+    returns them in `Teletext.to_compact` representation
+    """
+    reader = _worker_readers.get(str(repo_path))
+    if reader is None:
+        reader = _worker_readers[str(repo_path)] = GitObjectReader(repo_path)
+
+    return [
+        tt.to_compact()
+        for commit_hash in commit_hashes
+        for tt in _iter_commit_teletexts(reader, snapshot_path, commit_hash, channels)
+    ]
@@ -1,12 +1,44 @@
 import datetime
 import io
 import json
-from typing import List, Optional, TextIO, Tuple, Union
+from typing import List, Optional, TextIO, Tuple, Union, Dict, Any, Callable
 
 from ..console import ConsoleColors as CC
 from ..words import tokenize, concat_split_words
 
 
+# (color, bg_color, char_set) for each encoded attribute string like "wb1"
+_ATTRIBUTE_CACHE: Dict[str, Tuple[Optional[str], Optional[str], int]] = {}
+
+_ANSI_ESCAPES: Dict[Tuple[Optional[str], Optional[str]], str] = {}
+_ANSI_RESET = CC.escape()
+
+
+def _ansi_escape(color: Optional[str], bg_color: Optional[str]) -> str:
+    try:
+        return _ANSI_ESCAPES[(color, bg_color)]
+    except KeyError:
+        return _ANSI_ESCAPES.setdefault((color, bg_color), CC.escape(
+            TeletextPage.COLOR_CONSOLE_MAPPING[color or "w"],
+            TeletextPage.COLOR_CONSOLE_MAPPING[bg_color or "b"],
+        ))
+
+
+class _TextFilterTable(dict):
+    """
+    `str.translate` table that removes numbers and graphics characters
+    """
+    def __missing__(self, code: int) -> Optional[int]:
+        if code >= 0x1bf00 or 0x2500 <= code < 0x2600 or 0x30 <= code <= 0x39:
+            value = self[code] = None
+        else:
+            value = self[code] = code
+        return value
+
+
+_TEXT_FILTER_TABLE = _TextFilterTable()
+
+
 class TeletextPage:
     """
     Single page representation.
@@ -44,6 +76,8 @@ class TeletextPage:
          - the extended character set
          - a teletext page link
         """
+        __slots__ = ("text", "color", "bg_color", "char_set", "_link")
+
         def __init__(
                 self,
                 text: str,
@@ -113,10 +147,7 @@ class TeletextPage:
             block_str = self.text
 
             if colors:
-                block_str = CC.escape(
-                    TeletextPage.COLOR_CONSOLE_MAPPING[self.color or "w"],
-                    TeletextPage.COLOR_CONSOLE_MAPPING[self.bg_color or "b"]
-                ) + block_str + CC.escape()
+                block_str = _ansi_escape(self.color, self.bg_color) + block_str + _ANSI_RESET
 
             return block_str
 
@@ -136,8 +167,39 @@ class TeletextPage:
 
             return cls(**kwargs)
 
+        @classmethod
+        def _from_json_fast(cls, block: List) -> "TeletextPage.Block":
+            """
+            Same as `from_json` but skips the argument checks
+            and reuses the parsed attributes
+            """
+            instance = cls.__new__(cls)
+            attributes = block[0]
+            try:
+                instance.color, instance.bg_color, instance.char_set = _ATTRIBUTE_CACHE[attributes]
+            except KeyError:
+                instance.color, instance.bg_color, instance.char_set = _ATTRIBUTE_CACHE.setdefault(
+                    attributes, (
+                        attributes[0] if attributes[0] != "_" else None,
+                        attributes[1] if attributes[1] != "_" else None,
+                        int(attributes[2]) if len(attributes) > 2 else 0,
+                    )
+                )
+            instance.text = block[-1]
+            if len(block) > 2:
+                link = block[1]
+                if isinstance(link, int):
+                    instance._link = link
+                else:
+                    instance._link = None
+                    instance.link = link
+            else:
+                instance._link = None
+            return instance
+
     def __init__(self):
         self._lines: List[List[TeletextPage.Block]] = None
+        self._render_cache: Dict[tuple, Any] = {}
         self._lines_ndjson: List[str] = []
         self.index = 100
         self.sub_index = 1
@@ -162,10 +224,24 @@ class TeletextPage:
         return datetime.datetime.strptime(self.timestamp, "%Y-%m-%dT%H:%M:%S")
 
     @property
-    def lines(self):
+    def lines(self) -> List[List[Block]]:
         if self._lines is None:
-            self._lines = []
+            self._render_cache = {}
+            try:
+                # parse all lines with a single call
+                json_lines = json.loads("[" + ",".join(self._lines_ndjson) + "]")
+            except ValueError:
+                json_lines = None
+
+            if json_lines is not None and len(json_lines) == len(self._lines_ndjson):
+                from_json = TeletextPage.Block._from_json_fast
+                self._lines = [
+                    [from_json(block) for block in line]
+                    for line in json_lines
+                ]
+                return self._lines
 
+            self._lines = []
             for line_idx, line in enumerate(self._lines_ndjson):
                 try:
                     line = json.loads(line)
@@ -174,7 +250,7 @@ class TeletextPage:
                     continue
 
                 self._lines.append([
-                    TeletextPage.Block.from_json(block)
+                    TeletextPage.Block._from_json_fast(block)
                     for block in line
                 ])
         return self._lines
@@ -202,44 +278,37 @@ class TeletextPage:
                 print(json.dumps(json_line, ensure_ascii=False, separators=(',', ':')), file=file)
 
     def to_ansi(self, file: Optional[TextIO] = None, colors: bool = True, border: bool = False) -> Optional[str]:
+        text = self._cached(("ansi", colors, border), self._render_ansi, colors, border)
         if file is None:
-            file = io.StringIO()
-            self.to_ansi(file, colors=colors, border=border)
-            file.seek(0)
-            return file.read()
-
-        if not border:
-            for line in self.lines:
-                for block in line:
-                    block_str = block.to_ansi(colors=colors)
-                    print(block_str, end="", file=file)
-
-                print(file=file)
-
-        else:
-            lines = [
-                "".join(block.to_ansi(colors=False) for block in line)
+            return text
+        file.write(text)
+
+    def _render_ansi(self, colors: bool, border: bool) -> str:
+        lines = self._plain_lines()
+        if colors:
+            color_lines = [
+                "".join(_ansi_escape(block.color, block.bg_color) + block.text + _ANSI_RESET for block in line)
                 for line in self.lines
             ]
-            width = max(0, 0, *(len(l) for l in lines))
 
-            if colors:
-                color_lines = [
-                    "".join(block.to_ansi(colors=True) for block in line)
-                    for line in self.lines
-                ]
+        if not border:
+            return "".join(line + "\n" for line in (color_lines if colors else lines))
+
+        width = max(0, 0, *(len(l) for l in lines))
+        if colors:
+            c = CC.escape(CC.WHITE, bright=False)
+            off = CC.escape()
+            rows = [c + "▛" + "▀" * width + "▜" + off]
+            for c_line, line in zip(color_lines, lines):
+                rows.append(c + "▌" + off + c_line + " " * (width - len(line)) + c + "▐" + off)
+            rows.append(c + "▙" + "▄" * width + "▟" + off)
+        else:
+            rows = ["▛" + "▀" * width + "▜"]
+            for line in lines:
+                rows.append("▌" + line + " " * (width - len(line)) + "▐")
+            rows.append("▙" + "▄" * width + "▟")
 
-                c = CC.escape(CC.WHITE, bright=False)
-                off = CC.escape()
-                print(c + "▛" + "▀" * width + "▜" + off, file=file)
-                for c_line, line in zip(color_lines, lines):
-                    print(c + "▌" + off + c_line + " " * (width - len(line)) + c + "▐" + off, file=file)
-                print(c + "▙" + "▄" * width + "▟" + off, file=file)
-            else:
-                print("▛" + "▀" * width + "▜", file=file)
-                for line in lines:
-                    print("▌" + line + " " * (width - len(line)) + "▐", file=file)
-                print("▙" + "▄" * width + "▟", file=file)
+        return "".join(row + "\n" for row in rows)
 
     def to_image(self):
         from .image_renderer import TeletextImageRenderer
@@ -253,23 +322,36 @@ class TeletextPage:
         Also concats bro-
         ken lines together.
         """
-        texts = []
-        for line in self.lines:
-            for block in line:
-                for c in block.text:
-                    if ord(c) < 0x1bf00 and not 0x2500 <= ord(c) < 0x2600 and not "0" <= c <= "9":
-                        texts.append(c)
+        return self._cached(("text", concat_split_words), self._render_text, concat_split_words)
 
-            texts.append("\n")
-        text = "".join(texts)
+    def _render_text(self, concat_split_words: bool) -> str:
+        text = "".join(line + "\n" for line in self._plain_lines()).translate(_TEXT_FILTER_TABLE)
 
         if concat_split_words:
             text = globals()["concat_split_words"](text)
         return text
 
     def to_tokens(self, lowercase: bool = False, concat_split_words: bool = True) -> List[str]:
-        text = self.to_text(concat_split_words=concat_split_words)
-        return tokenize(text, lowercase=lowercase)
+        return list(self._cached(
+            ("tokens", lowercase, concat_split_words),
+            lambda: tokenize(self.to_text(concat_split_words=concat_split_words), lowercase=lowercase),
+        ))
+
+    def _plain_lines(self) -> List[str]:
+        return self._cached(
+            ("plain", ),
+            lambda: ["".join(block.text for block in line) for line in self.lines],
+        )
+
+    def _cached(self, key: tuple, func: Callable, *args):
+        """
+        Renders are cached until the `lines` are decoded again
+        """
+        try:
+            return self._render_cache[key]
+        except KeyError:
+            value = self._render_cache[key] = func(*args)
+            return value
 
     def _simplify_line(self, line: List[Block]) -> List[Block]:
         """
@@ -2,179 +2,389 @@
 T42 format parser
 based on https://github.com/Casandro/teletext_ng/blob/main/tools/dump_tta_text_colour.c
 """
-from typing import Optional, List, Tuple
+import pickle
+from typing import Optional, List, Tuple, Dict, Sequence, Iterable, Union
+
+import numpy as np
 
 from src import console
+from . import coding, charset
+from .charset import VD_GLYPH_TO_UTF8, glyph_to_utf8
+
+
+class T42Grid:
+    """
+    Character cells of a decoded page.
+
+    All attributes are (rows, 40) array views into a single
+    contiguous buffer:
+
+        - `glyphs`: uint32 unicode code points
+        - `fg`, `bg`: uint8 fore- and background colors (0-7)
+        - `mosaic`: uint8 mosaic flag
+
+    `to_buffer()` and `from_buffer()` (de-)serialize without copying.
+    """
+
+    BYTES_PER_CELL = 4 + 3
+
+    def __init__(self, buffer: Union[bytes, bytearray, memoryview]):
+        buffer = memoryview(buffer).cast("B")
+        if len(buffer) % (self.BYTES_PER_CELL * 40):
+            raise ValueError(f"Invalid T42Grid buffer size {len(buffer)}")
+        self._buffer = buffer
+        self.num_rows = len(buffer) // (self.BYTES_PER_CELL * 40)
+
+        num_cells = self.num_rows * 40
+        shape = (self.num_rows, 40)
+        self.glyphs = np.frombuffer(buffer, dtype="<u4", count=num_cells).reshape(shape)
+        self.fg, self.bg, self.mosaic = np.frombuffer(
+            buffer, dtype=np.uint8, offset=num_cells * 4,
+        ).reshape(3, *shape)
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, T42Grid):
+            return False
+        return self._buffer == other._buffer
+
+    def __reduce_ex__(self, protocol):
+        if protocol >= 5:
+            return self.__class__, (pickle.PickleBuffer(self._buffer),)
+        return self.__class__, (self._buffer.tobytes(),)
+
+    @classmethod
+    def from_arrays(
+            cls,
+            glyphs: np.ndarray,
+            fg: np.ndarray,
+            bg: np.ndarray,
+            mosaic: np.ndarray,
+    ) -> "T42Grid":
+        num_cells = glyphs.size
+        buffer = bytearray(num_cells * cls.BYTES_PER_CELL)
+        np.frombuffer(buffer, dtype="<u4", count=num_cells)[:] = glyphs.ravel()
+        attributes = np.frombuffer(buffer, dtype=np.uint8, offset=num_cells * 4).reshape(3, -1)
+        attributes[0] = fg.ravel()
+        attributes[1] = bg.ravel()
+        attributes[2] = mosaic.ravel()
+        return cls(buffer)
+
+    @classmethod
+    def from_buffer(cls, buffer: Union[bytes, bytearray, memoryview]) -> "T42Grid":
+        return cls(buffer)
+
+    def to_buffer(self) -> memoryview:
+        return self._buffer
+
+    def row_text(self, row: int) -> str:
+        return self.glyphs[row].tobytes().decode("utf-32-le")
+
+    def to_lines(self) -> List[str]:
+        return charset.codepoints_to_lines(self.glyphs)
+
+    def to_ansi_colored(self, rows: Optional[Iterable[int]] = None) -> str:
+        if rows is None:
+            rows = range(self.num_rows)
+
+        # cells where the (fg, bg) color differs from the previous cell,
+        # each row starts with (7, 0)
+        color = (self.fg.astype(np.int32) << 3) | self.bg
+        changed = np.empty(color.shape, dtype=bool)
+        changed[:, 0] = color[:, 0] != (7 << 3)
+        changed[:, 1:] = color[:, 1:] != color[:, :-1]
+
+        lines = self.to_lines()
+        ansi = []
+        for row in rows:
+            text = lines[row]
+            prev_idx = 0
+            indices = np.flatnonzero(changed[row])
+            for idx, c in zip(indices.tolist(), color[row, indices].tolist()):
+                ansi.append(text[prev_idx:idx])
+                ansi.append(ANSI_COLOR_ESCAPES[c])
+                prev_idx = idx
+            ansi.append(text[prev_idx:])
+            ansi.append(ANSI_COLOR_ESCAPES[-1])
+            ansi.append("\n")
+
+        return "".join(ansi[:-1])
 
 
 class T42Page:
 
-    def __init__(self, data: bytes, timestamp: Optional[str] = None, channel: Optional[str] = None):
+    def __init__(
+            self,
+            data: bytes,
+            timestamp: Optional[str] = None,
+            channel: Optional[str] = None,
+            page: Optional[int] = None,
+            sub_page: Optional[int] = None,
+    ):
+        """
+        `page` and `sub_page` are defaults (e.g. from the filename)
+        for data without a header packet.
+        """
         self.data = data
         self.timestamp = timestamp
         self.channel = channel
         self.language = 0
-        self._page = 0
-        self._sub_page = 0
-        self._color_f = 7
-        self._color_b = 0
-        self._mosaik = 0
-        self._blocks = None
-        self._XX = 0
+        self._page = page or 0
+        self._sub_page = sub_page or 0
+        self._grid: Optional[T42Grid] = None
+
+    @classmethod
+    def decode_many(cls, pages: Sequence["T42Page"]):
+        """
+        Decodes the data of all pages with a single `decode_t42` call.
+
+        This is much faster than letting each page decode itself.
+        """
+        data, starts = cls._concat_data(pages)
+        decoded = decode_t42(data, starts)
+        ends = list(starts[1:]) + [len(data) // 42]
+        for idx, (page, start, end) in enumerate(zip(pages, starts, ends)):
+            page._set_decoded(decoded, idx, start, end)
+
+    @classmethod
+    def check_many(cls, pages: Sequence["T42Page"]) -> Dict[str, np.ndarray]:
+        """
+        Returns the `check_t42` signal quality of all pages with a single call
+        """
+        data, starts = cls._concat_data(pages)
+        return check_t42(data, starts)
+
+    @classmethod
+    def drop_corrupt(cls, pages: Sequence["T42Page"], max_parity_errors: int = 0) -> List["T42Page"]:
+        """
+        Returns the pages without uncorrectable Hamming errors and with
+        at most `max_parity_errors` parity errors.
+
+        This is cheap compared to decoding and can run before `decode_many`.
+        """
+        if not pages:
+            return []
+        check = cls.check_many(pages)
+        keep = (check["page_hamming_uncorrectable"] == 0) & (check["page_parity_errors"] <= max_parity_errors)
+        return [page for page, k in zip(pages, keep) if k]
+
+    @classmethod
+    def _concat_data(cls, pages: Sequence["T42Page"]) -> Tuple[bytes, np.ndarray]:
+        sizes = [len(page.data) // 42 for page in pages]
+        starts = np.cumsum([0] + sizes[:-1])
+        return b"".join(page.data[:size * 42] for page, size in zip(pages, sizes)), starts
 
     @property
-    def blocks(self) -> List[List[Tuple[str, int, int, int]]]:
-        if self._blocks is None:
-            self._blocks = self._parse()
+    def grid(self) -> T42Grid:
+        if self._grid is None:
+            self._set_decoded(decode_t42(self.data), 0, 0, len(self.data) // 42)
+        return self._grid
 
-        return self._blocks
+    @property
+    def blocks(self) -> List[List[Tuple[str, int, int, int]]]:
+        """
+        The `grid` as (char, fg, bg, mosaic) tuple per cell.
+
+        The list is created on each call, use `grid` for bulk processing.
+        """
+        grid = self.grid
+        return [
+            list(zip(text, fg, bg, mosaic))
+            for text, fg, bg, mosaic in zip(
+                grid.to_lines(), grid.fg.tolist(), grid.bg.tolist(), grid.mosaic.tolist(),
+            )
+        ]
 
     @property
     def page(self) -> int:
-        if not self._page:
-            self._parse()
+        self.grid
         return self._page
 
     @property
     def sub_page(self) -> int:
-        if not self._page:
-            self._parse()
+        self.grid
         return self._sub_page
 
     def to_ansi_colored(self, header: bool = True, extra: bool = False) -> str:
-        ansi = []
-        color = (7, 0)
-        for line_idx, line in enumerate(self.blocks):
-            if line_idx == 0 and not header:
-                continue
-            if line_idx > 23 and not extra:
-                break
+        num_rows = len(self.grid) if extra else min(24, len(self.grid))
+        return self.grid.to_ansi_colored(range(0 if header else 1, num_rows))
+
+    def _set_decoded(self, decoded: Dict[str, np.ndarray], page_idx: int, start: int, end: int):
+        self._grid = T42Grid.from_arrays(
+            decoded["codepoints"][start:end],
+            decoded["fg"][start:end],
+            decoded["bg"][start:end],
+            decoded["mosaic"][start:end],
+        )
+        if decoded["page"][page_idx] >= 0:
+            self._page = int(decoded["page"][page_idx])
+        if decoded["sub_page"][page_idx] >= 0:
+            self._sub_page = int(decoded["sub_page"][page_idx])
+            self.language = int(decoded["language"][page_idx])
+
+
+def decode_t42(data: bytes, page_starts: Optional[Sequence[int]] = None) -> Dict[str, np.ndarray]:
+    """
+    Decodes all 42-byte packets of a T42 buffer at once.
+
+    The buffer may hold the concatenated data of several pages,
+    `page_starts` is then the index of the first packet of each page.
+    Decoding many pages in one call is a lot faster than one by one.
+
+    Returns a dict with
+
+        - `row`, `magazine`: per packet
+        - `codepoints`, `fg`, `bg`, `mosaic`: (num_packets, 40) arrays of
+          unicode code points, fore- and background color and mosaic flag
+        - `page`, `sub_page`, `language`: per page, from the page's last
+          header packet, or -1 if there is none (or the page number is not decimal)
+
+    Each row is decoded like the per-byte C implementation:
+    control codes are rendered as space and change the color/mosaic state
+    for themselves and all following cells of the row.
+    """
+    num_packets = len(data) // 42
+    packets = np.frombuffer(data, dtype=np.uint8, count=num_packets * 42).reshape(num_packets, 42)
+    page_starts = np.array([0] if page_starts is None else page_starts, dtype=np.int64)
+    packet_index = np.arange(num_packets)
+
+    ham = coding.hamming8_decode(packets[:, :10]).astype(np.int32)
+    mpag = (ham[:, 1] << 4) | ham[:, 0]
+    magazine = mpag & 0x7
+    row = mpag >> 3
+    is_header = row == 0
+
+    # the header's 8 address bytes are rendered as spaces
+    codes = coding.parity_decode(packets[:, 2:])
+    codes[is_header, :8] = 0x20
+
+    # propagate the language of each header to the following packets of the same page
+    contr = (ham[:, 9] << 4) | ham[:, 8]
+    is_page_start = np.zeros(num_packets, dtype=bool)
+    is_page_start[page_starts[page_starts < num_packets]] = True
+    is_page_start[:1] = True
+    language_idx = np.maximum.accumulate(np.where(is_header | is_page_start, packet_index, 0))
+    languages = np.where(is_header, (contr >> 4) & 0x7, 0)[language_idx]
+
+    # 0x00-0x07 select alphanumeric and 0x10-0x17 mosaic colors
+    # the color in bits 0-2 and the mosaic flag in bit 3
+    state = _fill_runs((codes < 0x20) & ((codes & 0xf) <= 0x07), (codes & 0x07) | ((codes & 0x10) >> 1), 7)
+    fg = state & 0x07
+    mosaic = state >> 3
+    bg = _fill_runs((codes | 1) == 0x1d, np.where(codes == 0x1d, fg, 0), 0)
+
+    codepoints = charset.to_codepoints(codes, np.where(mosaic, charset.T42_MOSAIC, languages.astype(np.uint8)[:, None]))
+
+    # last header packet of each page
+    header_idx = np.full(len(page_starts), -1, dtype=np.int64)
+    page_of_packet = np.searchsorted(page_starts, packet_index, side="right") - 1
+    np.maximum.at(header_idx, page_of_packet[is_header], packet_index[is_header])
+    has_header = header_idx >= 0
+    idx = header_idx[has_header]
+
+    digits = np.stack((magazine[idx], ham[idx, 3], ham[idx, 2]))
+    digits[0, digits[0] == 0] = 8
+    is_decimal = (digits <= 9).all(axis=0)
+    sub = ham[idx, 4] | (ham[idx, 5] << 4) | (ham[idx, 6] << 8) | (ham[idx, 7] << 12)
+
+    page = np.full(len(page_starts), -1, dtype=np.int32)
+    sub_page = page.copy()
+    language = page.copy()
+    page[has_header] = np.where(is_decimal, digits[0] * 100 + digits[1] * 10 + digits[2], -1)
+    sub_page[has_header] = np.where(sub & 0x3f7f, sub & 0x3f7f, 1)
+    language[has_header] = languages[idx]
+
+    return {
+        "row": row,
+        "magazine": magazine,
+        "codepoints": codepoints,
+        "fg": fg,
+        "bg": bg,
+        "mosaic": mosaic,
+        "page": page,
+        "sub_page": sub_page,
+        "language": language,
+    }
+
+
+def check_t42(data: bytes, page_starts: Optional[Sequence[int]] = None) -> Dict[str, np.ndarray]:
+    """
+    Signal quality of all 42-byte packets of a T42 buffer,
+    without decoding the text.
+
+    `page_starts` is the index of the first packet of each page, like in `decode_t42`.
+
+    Returns a dict with
+
+        - `hamming_corrected`, `hamming_uncorrectable`: per packet, the number of
+          single (corrected) and double bit errors in the Hamming 8/4 coded
+          address bytes (2 per packet plus 8 for header packets)
+        - `parity_error_map`: (num_packets, 40) bool array of odd-parity errors
+          (the Hamming coded header cells and the rows 26-31, which are not
+          odd-parity text, are never errors)
+        - `parity_errors`: per packet, the number of parity errors
+        - `page_hamming_uncorrectable`, `page_parity_errors`: per page sums
+        - `page_crc`: per page CRC-16 over the header cells 8-31 and rows 1-25,
+          where missing rows count as spaces
+    """
+    num_packets = len(data) // 42
+    packets = np.frombuffer(data, dtype=np.uint8, count=num_packets * 42).reshape(num_packets, 42)
+    page_starts = np.array([0] if page_starts is None else page_starts, dtype=np.int64)
+    num_pages = len(page_starts)
+
+    ham = coding.hamming8_decode(packets[:, :2]).astype(np.int32)
+    row = ((ham[:, 1] << 4) | ham[:, 0]) >> 3
+    is_header = row == 0
+
+    hamming_errors = coding.hamming8_errors(packets[:, :10])
+    hamming_errors[~is_header, 2:] = 0
+    hamming_corrected = (hamming_errors == 1).sum(axis=1)
+    hamming_uncorrectable = (hamming_errors == 2).sum(axis=1)
+
+    parity_error_map = coding.parity_errors(packets[:, 2:])
+    parity_error_map[is_header, :8] = False
+    parity_error_map[row > 25] = False
+    parity_errors = parity_error_map.sum(axis=1)
+
+    page_of_packet = np.searchsorted(page_starts, np.arange(num_packets), side="right") - 1
+    page_hamming_uncorrectable = np.bincount(page_of_packet, hamming_uncorrectable, minlength=num_pages)
+    page_parity_errors = np.bincount(page_of_packet, parity_errors, minlength=num_pages)
+
+    # place the rows of each page, later packets replace earlier ones
+    rows = np.full((num_pages, 26, 40), 0x20, dtype=np.uint8)
+    valid = (row <= 25) & (page_of_packet >= 0)
+    rows[page_of_packet[valid], row[valid]] = coding.parity_decode(packets[valid, 2:])
+    page_crc = coding.crc_bytes(np.concatenate((rows[:, 0, 8:32], rows[:, 1:].reshape(num_pages, -1)), axis=1))
+
+    return {
+        "hamming_corrected": hamming_corrected,
+        "hamming_uncorrectable": hamming_uncorrectable,
+        "parity_error_map": parity_error_map,
+        "parity_errors": parity_errors,
+        "page_hamming_uncorrectable": page_hamming_uncorrectable.astype(np.int64),
+        "page_parity_errors": page_parity_errors.astype(np.int64),
+        "page_crc": page_crc,
+    }
+
+
+def _fill_runs(mask: np.ndarray, values: np.ndarray, initial: int) -> np.ndarray:
+    """
+    For each cell of the (rows, 40) mask returns the value of the
+    last True cell at or before it in the same row, or `initial`.
+
+    The runs between the True cells are written with a single `np.repeat`,
+    so the cost mostly depends on the number of True cells.
+    """
+    rows, cols = mask.shape
+    starts = mask.copy()
+    starts[:, 0] = True
+    positions = np.flatnonzero(starts)
+    run_values = np.where(mask.ravel()[positions], values.ravel()[positions], initial).astype(values.dtype)
+    run_lengths = np.diff(positions, append=rows * cols)
+    return np.repeat(run_values, run_lengths).reshape(rows, cols)
 
-            for b in line:
-                if b[1:3] != color:
-                    color = b[1:3]
-                    ansi.append(console.ConsoleColors.escape(fore=color[0], back=color[1]))
-
-                ansi.append(b[0])
-
-            color = (7, 0)
-            ansi.append(console.ConsoleColors.escape())
-
-            ansi.append("\n")
-
-        return "".join(ansi[:-1])
-
-    def _parse(self):
-        blocks = []
-        for packet_idx in range(len(self.data) // 42):
-            packet = self.data[packet_idx * 42: (packet_idx + 1) * 42]
-
-            mpag = de_hamm(packet[1]) << 4 | de_hamm(packet[0])
-            magazine = mpag & 0x7
-            row = mpag >> 3
-            start = 2
-
-            if row == 0:
-                page = de_hamm(packet[3]) << 4 | de_hamm(packet[2])
-                sub = de_hamm(packet[4]) | (de_hamm(packet[5]) << 4) | (de_hamm(packet[6]) << 8) | (de_hamm(packet[7]) << 12)
-                contr = de_hamm(packet[9]) << 4 | de_hamm(packet[8])
-
-                fullpage = magazine << 8 | page
-                if fullpage < 0x100:
-                    fullpage = fullpage | 0x800
-
-                self._page = int(f"{fullpage:03x}")
-                self._sub_page = (sub & 0x3f7f) or 1
-                self.language = (contr >> 4) & 0x7
-                start = 10
-
-            blocks.append(self._parse_line(packet, start))
-
-        return blocks
-
-    def _parse_line(self, line: bytes, start: int):
-        self._color_f = 7
-        self._color_b = 0
-        self._mosaik = 0
-
-        blocks = []
-        for i in range(start - 2):
-            blocks.append((" ", self._color_f, self._color_b, self._mosaik))
-        line = line[start:]
-
-        for c in line:
-            c = c & 0x7f
-
-            if c < 0x20:
-                if c & 0xf <= 0x07:
-                    self._color_f = c & 0x07
-                if c <= 0x07:
-                    self._mosaik = 0
-                if 0x10 <= c <= 0x17:
-                    self._mosaik = 1
-                if c == 0x1c:
-                    self._color_b = 0
-                if c == 0x1d:
-                    self._color_b = self._color_f
-
-                blocks.append((" ", self._color_f, self._color_b, self._mosaik))
-
-            if c >= 0x20:
-                glyph = c - 0x20
-
-                if self._mosaik == 0:
-                    if c == 0x23: glyph = 0xA0 + self.language * 0x10
-                    if c == 0x24: glyph = 0xA1 + self.language * 0x10
-                    if c == 0x40: glyph = 0xA2 + self.language * 0x10
-                    if c == 0x5B: glyph = 0xA3 + self.language * 0x10
-                    if c == 0x5C: glyph = 0xA4 + self.language * 0x10
-                    if c == 0x5D: glyph = 0xA5 + self.language * 0x10
-                    if c == 0x5E: glyph = 0xA6 + self.language * 0x10
-                    if c == 0x5F: glyph = 0xA7 + self.language * 0x10
-                    if c == 0x60: glyph = 0xA8 + self.language * 0x10
-                    if c == 0x7B: glyph = 0xA9 + self.language * 0x10
-                    if c == 0x7C: glyph = 0xAa + self.language * 0x10
-                    if c == 0x7D: glyph = 0xAb + self.language * 0x10
-                    if c == 0x7E: glyph = 0xAc + self.language * 0x10
-
-                else:
-                    if 0x20 <= c <= 0x3f: glyph = c - 0x20 + 0x60
-                    if 0x40 <= c <= 0x5f: glyph = c - 0x20
-                    if 0x60 <= c <= 0x7f: glyph = c - 0x60 + 0x80
-
-                char = glyph_to_utf8(glyph)
-                blocks.append((char or " ", self._color_f, self._color_b, self._mosaik))
-
-        while len(blocks) < 40:
-            blocks.append((" ", self._color_f, self._color_b, self._mosaik))
-
-        return blocks
-
-
-VD_GLYPH_TO_UTF8 = [
-#   x0   x1   x2   x3   x4   x5   x6   x7   x8   x9   xA   xB   xC   xD   xE   xF
-    " ", "!","\"", "#", "¤", "%", "&", "'", "(", ")", "*", "+", ",", "-", ".", "/",  # 0x
-    "0", "1", "2", "3", "4", "5", "6", "7", "8", "9", ":", ";", "<", "=", ">", "?",  # 1x
-    "@", "A", "B", "C", "D", "E", "F", "G", "H", "I", "J", "K", "L", "M", "N", "O",  # 2x
-    "P", "Q", "R", "S", "T", "U", "V", "W", "X", "Y", "Z", "[","\\", "]", "^", "_",  # 3x
-    "`", "a", "b", "c", "d", "e", "f", "g", "h", "i", "j", "k", "l", "m", "n", "o",  # 4x
-    "p", "q", "r", "s", "t", "u", "v", "w", "x", "y", "z", "{", "|", "}", "~", "■",  # 5x
-    " ", "🬀", "🬁", "🬂", "🬃", "🬄", "🬅", "🬆", "🬇", "🬈", "🬉", "🬊", "🬋", "🬌", "🬍", "🬎",  # 6x
-    "🬏", "🬐", "🬑", "🬒", "🬓", "▌", "🬔", "🬕", "🬖", "🬗", "🬘", "🬙", "🬚", "🬛", "🬜", "🬝",  # 7x
-    "🬞", "🬟", "🬠", "🬡", "🬢", "🬣", "🬤", "🬥", "🬦", "🬧", "▐", "🬨", "🬩", "🬪", "🬫", "🬬",  # 8x
-    "🬭", "🬮", "🬯", "🬰", "🬱", "🬲", "🬳", "🬴", "🬵", "🬶", "🬷", "🬸", "🬹", "🬺", "🬻", "█",  # 9x
-    "#", "¤", "@", "[", "\\","]", "^", "_", "{", "|", "}", "~", " ", " ", " ", " ",  # Ax English
-    "#", "$", "§", "Ä", "Ö", "Ü", "^", "_", "°", "ä", "ö", "ü", "ß", " ", " ", " ",  # Bx German
-    "#", "¤", "É", "Ä", "Ö", "Å", "Ü", "_", "é", "ä", "ö", "å", "ü", " ", " ", " ",  # Cx Swedish/Finnish/Hungarian
-    "£", "$", "é", "°", "ç", "→", "↑", "#", "ù", "à", "ò", "è", "ì", " ", " ", " ",  # Dx Italian
-    "é", "ï", "à", "ë", "ê", "ù", "î", "#", "è", "â", "ô", "û", "ç", " ", " ", " ",  # Ex French
-    "ç", "$", "¡", "á", "é", "í", "ó", "ú", "¿", "ü", "ñ", "è", "à", " ", " ", " ",  # Fx Portuguese/Spanish
-]
-assert len(VD_GLYPH_TO_UTF8) == 0x100, len(VD_GLYPH_TO_UTF8)
-
-def glyph_to_utf8(glyph: int) -> Optional[str]:
-    if 0 <= glyph <= 0xff:
-        return VD_GLYPH_TO_UTF8[glyph]
 
 def bit(x: int, which: int):
     return (x >> which) & 1
@@ -182,3 +392,10 @@ def bit(x: int, which: int):
 
 def de_hamm(x: int):
     return bit(x, 1) | (bit(x, 3) << 1) | (bit(x, 5) << 2) | (bit(x, 7) << 3)
+
+
+# ANSI escape per (fg << 3 | bg), the last one resets the colors
+ANSI_COLOR_ESCAPES = [
+    console.ConsoleColors.escape(fore=color >> 3, back=color & 0x7)
+    for color in range(64)
+] + [console.ConsoleColors.escape()]
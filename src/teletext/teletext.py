@@ -1,15 +1,18 @@
 import json
+import re
 from pathlib import Path
-from typing import List, Optional, TextIO, Tuple, Union, IO, Dict
+from typing import List, Optional, TextIO, Tuple, Union, IO, Dict, MutableMapping, Iterator, AnyStr
 
 from .page import TeletextPage
 from .categories import get_page_category
 
 
 class Teletext:
-    
+
+    _RE_PAGE_HEADER = re.compile(rb'\{"page":(\d+),"sub_page":(\d+)[,}]')
+
     def __init__(self):
-        self.pages: Dict[Tuple[int, int], TeletextPage] = {}
+        self.pages: MutableMapping[Tuple[int, int], TeletextPage] = {}
         self.page_index: List[Tuple[int, int]] = []
         self.timestamp: str = None
         self.channel: str = None
@@ -22,18 +25,28 @@ class Teletext:
     def from_ndjson(
             cls,
             file: Union[str, Path, IO, List[str], bytes],
+            lazy: bool = False,
     ) -> "Teletext":
+        """
+        Parses a snapshot file.
+
+        With `lazy=True` the raw bytes are only scanned for page headers
+        and each page's header and lines are decoded on first access.
+        """
+        if lazy:
+            return cls._from_ndjson_lazy(file)
+
         if isinstance(file, (str, Path)):
-            lines = Path(file).read_text().strip().splitlines()
+            lines = split_lines(Path(file).read_text())
         elif isinstance(file, list):
             lines = file
         elif isinstance(file, bytes):
-            lines = file.replace(b"\x96\xc2\x00\x0a", b"").decode().splitlines()
+            lines = split_lines(file.replace(b"\x96\xc2\x00\x0a", b"").decode())
         else:
             content = file.read()
             if isinstance(content, bytes):
                 content = content.decode()
-            lines = content.strip().splitlines()
+            lines = split_lines(content)
 
         tt = cls()
 
@@ -70,6 +83,92 @@ class Teletext:
         tt.page_index.sort()
         return tt
 
+    @classmethod
+    def _from_ndjson_lazy(cls, file: Union[str, Path, IO, List[str], bytes]) -> "Teletext":
+        if isinstance(file, (str, Path)):
+            data = Path(file).read_bytes()
+        elif isinstance(file, list):
+            data = "\n".join(file).encode()
+        elif isinstance(file, bytes):
+            data = file
+        else:
+            data = file.read()
+            if isinstance(data, str):
+                data = data.encode()
+
+        if b"\x96\xc2\x00\x0a" in data:
+            data = data.replace(b"\x96\xc2\x00\x0a", b"")
+
+        tt = cls()
+        ranges = {}
+        cur_index, cur_start = None, None
+        for start in _iter_json_line_starts(data):
+            if cur_index is not None:
+                ranges[cur_index] = (cur_start, start)
+                cur_index = None
+
+            page_match = cls._RE_PAGE_HEADER.match(data, start)
+            if page_match:
+                cur_index = (int(page_match.group(1)), int(page_match.group(2)))
+            else:
+                end = data.find(b"\n", start)
+                line = json.loads(data[start:end if end >= 0 else len(data)])
+                # file header
+                if "scraper" in line:
+                    tt.timestamp = line["timestamp"]
+                    tt.channel = line["scraper"]
+                    continue
+                cur_index = (line["page"], line["sub_page"])
+
+            cur_start = start
+            tt.page_index.append(cur_index)
+
+        if cur_index is not None:
+            ranges[cur_index] = (cur_start, len(data))
+
+        tt.pages = LazyTeletextPages(data, tt.channel, ranges)
+        tt.page_index.sort()
+        return tt
+
+    def to_compact(self) -> tuple:
+        """
+        Returns a tuple of plain values that is cheap to pickle.
+
+        The page lines stay undecoded, `from_compact` restores
+        an equal Teletext.
+        """
+        return (
+            self.channel,
+            self.timestamp,
+            self.commit_hash,
+            [
+                (
+                    page.index, page.sub_index, page.timestamp, page.error, page.category,
+                    "\n".join(page._lines_ndjson),
+                )
+                for page in self.pages.values()
+            ],
+        )
+
+    @classmethod
+    def from_compact(cls, data: tuple) -> "Teletext":
+        tt = cls()
+        tt.channel, tt.timestamp, tt.commit_hash, pages = data
+        for index, sub_index, timestamp, error, category, lines in pages:
+            page = TeletextPage()
+            page.channel = tt.channel
+            page.index = index
+            page.sub_index = sub_index
+            page.timestamp = timestamp
+            page.error = error
+            page.category = category
+            if lines:
+                page._lines_ndjson = lines.split("\n")
+            tt.pages[(index, sub_index)] = page
+
+        tt.page_index = sorted(tt.pages)
+        return tt
+
     def get_page(self, page: int, sub_page: Optional[int] = None) -> Optional[TeletextPage]:
         if sub_page is not None:
             return self.pages.get((page, sub_page))
@@ -98,3 +197,91 @@ class Teletext:
             return self.page_index[-1]
 
         return page
+
+
+def split_lines(data: AnyStr) -> List[AnyStr]:
+    """
+    Splits ndjson text or bytes at LF or CRLF line breaks and drops empty lines.
+
+    Both the eager and lazy snapshot parsing use this, so pages have the same
+    lines regardless of how they were loaded.
+    """
+    newline, carriage_return = ("\n", "\r") if isinstance(data, str) else (b"\n", b"\r")
+    lines = []
+    for line in data.split(newline):
+        line = line.rstrip(carriage_return)
+        if line:
+            lines.append(line)
+    return lines
+
+
+def _iter_json_line_starts(data: bytes) -> Iterator[int]:
+    """
+    Yields the offset of each line that starts with '{'
+    """
+    if data.startswith(b"{"):
+        yield 0
+    pos = data.find(b"\n{")
+    while pos >= 0:
+        yield pos + 1
+        pos = data.find(b"\n{", pos + 1)
+
+
+class LazyTeletextPages(MutableMapping):
+    """
+    Mapping of (page, sub_page) to TeletextPage that keeps the raw
+    ndjson bytes and only decodes a page when it's accessed.
+    """
+
+    def __init__(self, data: bytes, channel: str, ranges: Dict[Tuple[int, int], Tuple[int, int]]):
+        self._data = memoryview(data)
+        self._channel = channel
+        self._ranges = ranges
+        self._pages: Dict[Tuple[int, int], TeletextPage] = {}
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return iter(self._ranges)
+
+    def __contains__(self, index) -> bool:
+        return index in self._ranges
+
+    def __getitem__(self, index: Tuple[int, int]) -> TeletextPage:
+        page = self._pages.get(index)
+        if page is None:
+            page = self._decode_page(*self._ranges[index])
+            self._pages[index] = page
+        return page
+
+    def __setitem__(self, index: Tuple[int, int], page: TeletextPage):
+        self._pages[index] = page
+        self._ranges.setdefault(index, None)
+
+    def __delitem__(self, index: Tuple[int, int]):
+        del self._ranges[index]
+        self._pages.pop(index, None)
+
+    def get_raw(self, index: Tuple[int, int]) -> Optional[memoryview]:
+        """
+        Returns the undecoded ndjson bytes of the page (header and lines)
+        or None if the page was not read from the raw data.
+        """
+        r = self._ranges[index]
+        if r is not None:
+            return self._data[r[0]:r[1]]
+
+    def _decode_page(self, start: int, end: int) -> TeletextPage:
+        lines = split_lines(bytes(self._data[start:end]).decode())
+        header = json.loads(lines[0])
+
+        page = TeletextPage()
+        page.channel = self._channel
+        page.index = header["page"]
+        page.sub_index = header["sub_page"]
+        page.timestamp = header["timestamp"]
+        page.error = header.get("error")
+        page.category = get_page_category(self._channel, page.index, page.timestamp)
+        page._lines_ndjson = lines[1:]
+        return page
@@ -1,8 +1,14 @@
+import io
+import struct
 import zipfile
 import re
+from concurrent.futures import ProcessPoolExecutor, Future
 from pathlib import Path
 from io import BytesIO
-from typing import Union, Generator
+from typing import Union, Generator, Optional, Container, List, Deque
+from collections import deque
+
+from tqdm import tqdm
 
 from .t42 import T42Page
 
@@ -17,20 +23,147 @@ class TeletextNG:
     def __init__(self, filename: Union[str, Path]):
         self.filename = filename
 
-    def iter_pages(self) -> Generator[T42Page, None, None]:
-        # open outer zip
+    def iter_pages(
+            self,
+            pages: Optional[Container[int]] = None,
+            num_workers: int = 0,
+            verbose: bool = False,
+            max_parity_errors: Optional[int] = None,
+    ) -> Generator[T42Page, None, None]:
+        """
+        Yields all pages of all zipped zips, ordered by timestamp.
+
+        If `pages` is given (e.g. `range(100, 200)`), only entries whose
+        filename page number is contained are read at all.
+
+        With `num_workers` > 0 the zipped zips are read and decoded
+        in that many processes. `verbose` shows the pages/sec throughput.
+
+        If `max_parity_errors` is given, pages with uncorrectable Hamming errors
+        or more parity errors are dropped before decoding (see `T42Page.drop_corrupt`).
+        """
+        tasks = self._get_tasks(pages, max_parity_errors)
+
+        progress = None
+        if verbose:
+            progress = tqdm(desc=Path(self.filename).name, unit=" pages")
+
+        if num_workers <= 0:
+            results = (_read_zipped_zip(*task) for task in tasks)
+        else:
+            results = self._iter_parallel(tasks, num_workers)
+
+        try:
+            for result in results:
+                if progress is not None:
+                    progress.update(len(result))
+                yield from result
+        finally:
+            if progress is not None:
+                progress.close()
+
+    def _get_tasks(self, pages: Optional[Container[int]], max_parity_errors: Optional[int] = None) -> List[tuple]:
+        tasks = []
         with zipfile.ZipFile(self.filename) as main_zip:
-            # for each zipped zip
-            for zip_filename in main_zip.filelist:
-                match = self._re_timestamp.match(zip_filename.filename)
+            for zip_info in main_zip.filelist:
+                match = self._re_timestamp.match(zip_info.filename)
                 if match:
                     timestamp = match.groups()[0]
-                    data = BytesIO(main_zip.read(zip_filename))
-                    data.seek(0)
-                    # open zipped zip
-                    with zipfile.ZipFile(data) as zip_file:
-                        for filename in zip_file.filelist:
-                            match = self._re_page.match(filename.filename)
-                            if match:
-                                page, sub_page = [int(g) for g in match.groups()]
-                                yield T42Page(zip_file.read(filename), timestamp=timestamp)
+                    tasks.append((self.filename, zip_info.filename, timestamp, pages, max_parity_errors))
+
+        tasks.sort(key=lambda task: task[2])
+        return tasks
+
+    @classmethod
+    def _iter_parallel(cls, tasks: List[tuple], num_workers: int) -> Generator[List[T42Page], None, None]:
+        # keep a bounded number of zips in flight and yield them in order
+        with ProcessPoolExecutor(num_workers) as pool:
+            futures: Deque[Future] = deque(
+                pool.submit(_read_zipped_zip, *task)
+                for task in tasks[:num_workers * 2]
+            )
+            for task in tasks[num_workers * 2:]:
+                yield futures.popleft().result()
+                futures.append(pool.submit(_read_zipped_zip, *task))
+
+            while futures:
+                yield futures.popleft().result()
+
+
+def _read_zipped_zip(
+        filename: Union[str, Path],
+        zip_filename: str,
+        timestamp: str,
+        pages: Optional[Container[int]],
+        max_parity_errors: Optional[int] = None,
+) -> List[T42Page]:
+    """
+    Reads and decodes all (matching) pages of one zipped zip
+    """
+    with open(filename, "rb") as fp:
+        with zipfile.ZipFile(fp) as main_zip:
+            zip_info = main_zip.getinfo(zip_filename)
+
+            if zip_info.compress_type == zipfile.ZIP_STORED:
+                # read the stored zip directly from the outer file
+                fp.seek(zip_info.header_offset)
+                header = fp.read(30)
+                name_length, extra_length = struct.unpack("<2H", header[26:30])
+                data = _FileWindow(fp, zip_info.header_offset + 30 + name_length + extra_length, zip_info.file_size)
+            else:
+                data = BytesIO(main_zip.read(zip_info))
+
+            result = []
+            with zipfile.ZipFile(data) as zip_file:
+                for info in zip_file.filelist:
+                    match = TeletextNG._re_page.match(info.filename)
+                    if match:
+                        page, sub_page = [int(g) for g in match.groups()]
+                        if pages is None or page in pages:
+                            result.append(T42Page(
+                                zip_file.read(info), timestamp=timestamp, page=page, sub_page=sub_page,
+                            ))
+
+    if max_parity_errors is not None:
+        result = T42Page.drop_corrupt(result, max_parity_errors)
+
+    T42Page.decode_many(result)
+    return result
+
+
+class _FileWindow(io.RawIOBase):
+    """
+    Read-only seekable view of a section of an open file
+    """
+    def __init__(self, file: io.BufferedReader, offset: int, size: int):
+        super().__init__()
+        self._file = file
+        self._offset = offset
+        self._size = size
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            pos += self._pos
+        elif whence == io.SEEK_END:
+            pos += self._size
+        self._pos = max(0, min(self._size, pos))
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._size - self._pos)
+        if size <= 0:
+            return 0
+        self._file.seek(self._offset + self._pos)
+        size = self._file.readinto(memoryview(buffer)[:size])
+        self._pos += size
+        return size
@@ -0,0 +1,16 @@
+import unittest
+
+from src.teletext.categories import get_page_category
+
+
+class TestCategories(unittest.TestCase):
+
+    def test_100_lookup(self):
+        self.assertEqual("undefined", get_page_category("3sat", 99))
+        self.assertEqual("index", get_page_category("3sat", 100))
+        self.assertEqual("index", get_page_category("3sat", 110))
+        self.assertEqual("news", get_page_category("3sat", 111))
+        self.assertEqual("internal", get_page_category("3sat", 899))
+        self.assertEqual("internal", get_page_category("3sat", 1200))
+        with self.assertRaises(ValueError):
+            get_page_category("unknown", 100)
@@ -0,0 +1,32 @@
+import unittest
+
+import numpy as np
+
+from src.teletext import charset
+
+
+class TestCharset(unittest.TestCase):
+
+    def test_100_tables(self):
+        self.assertEqual((len(charset.CHARSETS), 0x80), charset.CHARSET_TABLE.shape)
+        for name, mapping in (
+                ("g0", charset.g0["default"]),
+                ("g0-cyr", charset.g0["cyr"]),
+                ("g1", charset.g1),
+                ("g2", charset.g2),
+                ("g3", charset.g3),
+        ):
+            table = charset.CHARSET_TABLE[charset.CHARSETS[name]]
+            for code in range(0x80):
+                self.assertEqual(mapping.get(code, " "), chr(table[code]), (name, code))
+
+    def test_200_to_codepoints(self):
+        codes = np.array([[0x41, 0x5b, 0x7e], [0x41, 0x5b, 0x7e]], dtype=np.uint8)
+        self.assertEqual(["AÄß", "AÄß"], charset.codepoints_to_lines(charset.to_codepoints(codes, "t42-national-1")))
+
+        # a charset per cell
+        charsets = np.array([[1, 1, 1], [charset.T42_MOSAIC, 0, charset.CHARSETS["g0-cyr"]]])
+        self.assertEqual(
+            ["AÄß", "A[ч"],
+            charset.codepoints_to_lines(charset.to_codepoints(codes, charsets)),
+        )
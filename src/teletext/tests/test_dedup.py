@@ -0,0 +1,71 @@
+import unittest
+
+from src.teletext import Teletext, TeletextPageDeduplicator
+
+
+def make_snapshot(channel: str, timestamp: str, pages: dict) -> bytes:
+    lines = [f'{{"scraper":"{channel}","timestamp":"{timestamp}"}}']
+    for (page, sub_page), texts in pages.items():
+        lines.append(f'{{"page":{page},"sub_page":{sub_page},"timestamp":"{timestamp}"}}')
+        for text in texts:
+            lines.append(f'[["wb","{text}"]]')
+    return ("\n".join(lines) + "\n").encode()
+
+
+class TestTeletextPageDeduplicator(unittest.TestCase):
+
+    def test_100_changed_pages(self):
+        snapshots = [
+            {(100, 1): ["0", "a", "b"], (101, 1): ["0", "c"]},
+            {(100, 1): ["1", "a", "b"], (101, 1): ["1", "d"]},
+            {(100, 1): ["2", "a", "b"], (101, 1): ["2", "d"], (102, 1): ["2", "e"]},
+        ]
+        for lazy in (False, True):
+            dedup = TeletextPageDeduplicator()
+            changed = []
+            for i, pages in enumerate(snapshots):
+                for channel in ("ard", "zdf"):
+                    tt = Teletext.from_ndjson(make_snapshot(channel, f"2023-01-0{i + 1}T00:00:00", pages), lazy=lazy)
+                    changed.append([(p.channel, p.index) for p in dedup.iter_changed_pages(tt)])
+
+            self.assertEqual(
+                [
+                    [("ard", 100), ("ard", 101)], [("zdf", 100), ("zdf", 101)],
+                    [("ard", 100), ("ard", 101)], [("zdf", 101)],
+                    [("ard", 100), ("ard", 101), ("ard", 102)], [("zdf", 102)],
+                ],
+                changed,
+            )
+            self.assertEqual((11, 3), (dedup.num_changed, dedup.num_unchanged))
+
+    def test_110_mixed_modes(self):
+        data = make_snapshot("ard", "2023-01-01T00:00:00", {(100, 1): ["a", "b"], (101, 1): ["c"]})
+        dedup = TeletextPageDeduplicator()
+        self.assertEqual(2, len(list(dedup.iter_changed_pages(Teletext.from_ndjson(data, lazy=True)))))
+        self.assertEqual(0, len(list(dedup.iter_changed_pages(Teletext.from_ndjson(data)))))
+        self.assertEqual(
+            0, len(list(dedup.iter_changed_pages(Teletext.from_ndjson(data.replace(b"\n", b"\r\n"), lazy=True)))),
+        )
+
+    def test_200_status_line(self):
+        dedup = TeletextPageDeduplicator()
+        for channel, first_line, expected in (
+                ("zdf", "12:00", 1),
+                ("zdf", "12:01", 0),
+                ("ard", "12:00", 1),
+                ("ard", "12:01", 1),
+        ):
+            tt = Teletext.from_ndjson(make_snapshot(channel, "2023-01-01T00:00:00", {(100, 1): [first_line, "x"]}))
+            self.assertEqual(expected, len(list(dedup.iter_changed_pages(tt))))
+
+    def test_300_max_size(self):
+        dedup = TeletextPageDeduplicator(max_size=2)
+        tt = Teletext.from_ndjson(make_snapshot("ard", "2023-01-01T00:00:00", {
+            (100, 1): ["a"], (101, 1): ["b"], (102, 1): ["c"],
+        }))
+        self.assertEqual(3, len(list(dedup.iter_changed_pages(tt))))
+        self.assertEqual(2, len(dedup))
+        self.assertEqual(
+            [False, False, True],
+            [dedup.is_changed(tt, index) for index in ((102, 1), (101, 1), (100, 1))],
+        )
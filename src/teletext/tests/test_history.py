@@ -0,0 +1,113 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.teletext import Teletext, TeletextHistory, TeletextHistoryWriter
+
+
+class TestTeletextHistory(unittest.TestCase):
+
+    def make_snapshots(self, num: int):
+        rng = random.Random(23)
+        pages = {
+            (p, 1): [f'[["wb","page {p} line {i}"]]' for i in range(rng.randrange(1, 6))]
+            for p in range(100, 110)
+        }
+        snapshots = []
+        for t in range(num):
+            timestamp = f"2023-01-01T{t:02}:00:00"
+            for index in rng.sample(sorted(pages), 3):
+                lines = pages[index]
+                if rng.random() < .5 and lines:
+                    lines[rng.randrange(len(lines))] = f'[["yb","changed at {t}"]]'
+                elif rng.random() < .5 or not lines:
+                    lines.append(f'[["cb","added at {t}"]]')
+                else:
+                    del lines[rng.randrange(len(lines)):]
+
+            data = [f'{{"scraper":"ard","timestamp":"{timestamp}"}}']
+            for index, lines in sorted(pages.items()):
+                # page 105 is missing in some snapshots
+                if index[0] == 105 and t % 3 == 1:
+                    continue
+                data.append(f'{{"page":{index[0]},"sub_page":{index[1]},"timestamp":"{timestamp}"}}')
+                data.extend(lines)
+            snapshots.append(Teletext.from_ndjson(("\n".join(data) + "\n").encode()))
+        return snapshots
+
+    def test_100_history(self):
+        snapshots = self.make_snapshots(12)
+        for name in ("history.ndjson", "history.ndjson.gz"):
+            with tempfile.TemporaryDirectory(prefix="investigate-news-test") as dir:
+                self._test_history(snapshots, Path(dir) / name)
+
+    def _test_history(self, snapshots: list, filename: Path):
+        with TeletextHistoryWriter(filename, keyframe_interval=2) as writer:
+            num_changed = [writer.add(tt) for tt in snapshots]
+
+        self.assertEqual(10, num_changed[0])
+        self.assertLess(writer.num_records, 10 * len(snapshots))
+
+        history = TeletextHistory(filename)
+        self.assertEqual(["ard"], history.channels())
+        self.assertIsNone(history.get_page("ard", 100, 1, "2022"))
+
+        prev_lines = {}
+        changed_lines = []
+        for tt in snapshots:
+            tt2 = history.get_teletext("ard", tt.timestamp)
+            self.assertEqual(tt.page_index, tt2.page_index)
+            for index, page in tt.pages.items():
+                self.assertEqual(page._lines_ndjson, tt2.pages[index]._lines_ndjson)
+                self.assertEqual(page.to_ansi(), tt2.pages[index].to_ansi())
+                self.assertEqual(page._lines_ndjson, history.get_page("ard", *index, tt.timestamp)._lines_ndjson)
+                # replays at most a keyframe and `keyframe_interval` changes
+                self.assertLessEqual(len(history._get_record_offsets(("ard", *index), tt.timestamp)), 3)
+
+                prev = prev_lines.get(index, [])
+                for i, line in enumerate(page._lines_ndjson):
+                    if i >= len(prev) or prev[i] != line:
+                        changed_lines.append(("ard", *index, tt.timestamp, i, line))
+                prev_lines[index] = page._lines_ndjson
+            for index in set(prev_lines) - set(tt.pages):
+                del prev_lines[index]
+
+        self.assertEqual(
+            sorted(changed_lines),
+            sorted(history.iter_changed_lines()),
+        )
+        self.assertEqual([], list(history.iter_changed_lines(channels=["zdf"])))
+
+    def test_200_page_timestamps(self):
+        snapshots = [
+            Teletext.from_ndjson((
+                f'{{"scraper":"ard","timestamp":"2023-01-01T{hour}:00:00"}}\n'
+                f'{{"page":100,"sub_page":1,"timestamp":"2023-01-01T{hour}:02:00"}}\n'
+                f'[["wb","content at {hour}"]]\n'
+            ).encode())
+            for hour in ("10", "11")
+        ]
+        with tempfile.TemporaryDirectory(prefix="investigate-news-test") as dir:
+            filename = Path(dir) / "history.ndjson"
+            with TeletextHistoryWriter(filename) as writer:
+                for tt in snapshots:
+                    writer.add(tt)
+                writer.add(Teletext.from_ndjson(b'{"scraper":"ard","timestamp":"2023-01-01T12:00:00"}\n'))
+
+            history = TeletextHistory(filename)
+            for tt in snapshots:
+                tt2 = history.get_teletext("ard", tt.timestamp)
+                self.assertEqual([(100, 1)], tt2.page_index)
+                self.assertEqual(tt.pages[(100, 1)]._lines_ndjson, tt2.pages[(100, 1)]._lines_ndjson)
+                self.assertEqual(tt.pages[(100, 1)].timestamp, tt2.pages[(100, 1)].timestamp)
+
+            self.assertEqual([], history.get_teletext("ard", "2023-01-01T09:59:59").page_index)
+            self.assertEqual([], history.get_teletext("ard", "2023-01-01T12:00:00").page_index)
+            self.assertEqual(
+                [
+                    ("ard", 100, 1, "2023-01-01T10:00:00", 0, '[["wb","content at 10"]]'),
+                    ("ard", 100, 1, "2023-01-01T11:00:00", 0, '[["wb","content at 11"]]'),
+                ],
+                list(history.iter_changed_lines()),
+            )
@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+
+from src.teletext import Teletext
+from src.teletext.image_renderer import TeletextImageRenderer
+from src.teletext.t42 import T42Grid
+
+
+class TestImageRenderer(unittest.TestCase):
+
+    def page(self):
+        return Teletext.from_ndjson("\n".join((
+            '{"scraper":"ard","timestamp":"2023-01-01T12:00:00"}',
+            '{"page":100,"sub_page":1,"timestamp":"2023-01-01T12:00:01"}',
+            '[["wr","  "],["yb","X"],["g_","' + "-" * 50 + '"]]',
+        )).encode()).get_page(100)
+
+    def test_100_render(self):
+        renderer = TeletextImageRenderer()
+        page = self.page()
+        image = np.asarray(renderer.render(page))
+        self.assertEqual((200, 320, 3), image.shape)
+
+        # red background of the space cells, black background and yellow-ish pixels of 'X'
+        self.assertEqual([255, 0, 0], image[:8, :16].reshape(-1, 3).min(0).tolist())
+        cell = image[:8, 16:24].reshape(-1, 3)
+        self.assertEqual([0, 0, 0], cell.min(0).tolist())
+        self.assertGreater(cell[:, 0].max(), 0)
+        self.assertTrue((cell[:, 0] == cell[:, 1]).all())
+        self.assertEqual(0, cell[:, 2].max())
+        # empty last row
+        self.assertEqual(0, image[-8:].max())
+
+        images = renderer.render_many([page, page, page])
+        self.assertEqual((3, 200, 320, 3), images.shape)
+        self.assertTrue((images[2] == image).all())
+
+        sheet = np.asarray(renderer.render_contact_sheet([page] * 3, columns=2))
+        self.assertEqual((400, 640, 3), sheet.shape)
+        self.assertTrue((sheet[200:, :320] == image).all())
+        self.assertEqual(0, sheet[200:, 320:].max())
+
+    def test_200_render_grid(self):
+        renderer = TeletextImageRenderer()
+        glyphs = np.full((2, 40), ord("X"), dtype=np.uint32)
+        fg = np.full((2, 40), 3, dtype=np.uint8)
+        bg = np.full((2, 40), 1, dtype=np.uint8)
+        image = np.asarray(renderer.render_grid(T42Grid.from_arrays(glyphs, fg, bg, np.zeros_like(fg))))
+        self.assertEqual((16, 320, 3), image.shape)
+        # yellow on red
+        self.assertEqual([255, 0, 0], image.reshape(-1, 3).min(0).tolist())
+        self.assertEqual(0, image[..., 2].max())
+        self.assertGreater(image[..., 1].max(), 0)
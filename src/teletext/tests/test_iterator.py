@@ -0,0 +1,124 @@
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from typing import List
+
+from src.teletext import Teletext, TeletextIterator
+from src.teletext.iterator import _read_commits
+
+
+class _Repo:
+    def __init__(self, path: Path):
+        self.path = path
+
+
+class TestTeletextIterator(unittest.TestCase):
+
+    def _git(self, path: Path, *args: str) -> str:
+        return subprocess.check_output(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@test", *args],
+            cwd=str(path),
+        ).decode()
+
+    def _create_repo(self, path: Path, num_commits: int) -> List[str]:
+        self._git(path, "init", "-q")
+        (path / "docs" / "snapshots").mkdir(parents=True)
+        hashes = []
+        for i in range(num_commits):
+            for channel in ("ard", "zdf"):
+                timestamp = f"2023-01-01T00:{i:02}:00"
+                (path / "docs" / "snapshots" / f"{channel}.ndjson").write_text(
+                    f'{{"scraper":"{channel}","timestamp":"{timestamp}"}}\n'
+                    f'{{"page":100,"sub_page":1,"timestamp":"{timestamp}"}}\n'
+                    f'[["wb","{channel} {i}"]]\n'
+                    f'[["yb",101,"link"]]\n'
+                    f'{{"page":101,"sub_page":1,"timestamp":"{timestamp}","error":"timeout"}}\n'
+                )
+            self._git(path, "add", "-A")
+            self._git(path, "commit", "-q", "-m", "commit")
+            hashes.append(self._git(path, "rev-parse", "HEAD").strip())
+        return hashes
+
+    def _create_iterator(self, path: Path) -> TeletextIterator:
+        iterator = TeletextIterator(verbose=False)
+        iterator.repos = [_Repo(path)]
+        iterator.COMMIT_INDEX_PATH = path / "index"
+        return iterator
+
+    def test_100_compact(self):
+        with tempfile.TemporaryDirectory(prefix="investigate-news-test") as dir:
+            path = Path(dir)
+            hashes = self._create_repo(path, 1)
+
+            compact = _read_commits(str(path), TeletextIterator.SNAPSHOT_PATH, hashes, ["zdf"])
+            self.assertEqual(1, len(compact))
+            tt = Teletext.from_compact(compact[0])
+
+            self.assertEqual(("zdf", "2023-01-01T00:00:00", hashes[0]), (tt.channel, tt.timestamp, tt.commit_hash))
+            self.assertEqual([(100, 1), (101, 1)], tt.page_index)
+            self.assertEqual("zdf 0\nlink\n", tt.get_page(100).to_ansi(colors=False))
+            self.assertEqual("timeout", tt.get_page(101).error)
+            self.assertEqual([], tt.get_page(101)._lines_ndjson)
+            self.assertEqual(compact[0], tt.to_compact())
+
+    def test_200_parallel(self):
+        with tempfile.TemporaryDirectory(prefix="investigate-news-test") as dir:
+            path = Path(dir)
+            hashes = self._create_repo(path, 7)
+
+            iterator = self._create_iterator(path)
+            self.addCleanup(iterator.close)
+
+            expected = [
+                (h, channel, f"{channel} {i}")
+                for i, h in enumerate(hashes)
+                for channel in ("ard", "zdf")
+            ]
+            for num_workers, commits_per_task in ((0, 0), (1, 1), (2, 3), (3, 10)):
+                self.assertEqual(
+                    expected,
+                    [
+                        (tt.commit_hash, tt.channel, tt.get_page(100).lines[0][0].text)
+                        for tt in iterator.iter_teletexts(num_workers=num_workers, commits_per_task=commits_per_task)
+                    ]
+                )
+
+            self.assertEqual(
+                expected[10:],
+                [
+                    (tt.commit_hash, tt.channel, tt.get_page(100).lines[0][0].text)
+                    for tt in iterator.iter_teletexts(after_hash=hashes[4][:8], num_workers=2, commits_per_task=1)
+                ]
+            )
+            self.assertEqual(
+                expected[10:],
+                [
+                    (tt.commit_hash, tt.channel, tt.get_page(100).lines[0][0].text)
+                    for tt in iterator.iter_teletexts(after_hash=hashes[4][:8])
+                ]
+            )
+
+    def test_300_historic(self):
+        with tempfile.TemporaryDirectory(prefix="investigate-news-test") as dir:
+            path = Path(dir)
+            hashes = self._create_repo(path, 3)
+            iterator = self._create_iterator(path)
+            self.addCleanup(iterator.close)
+
+            self.assertEqual(hashes[1:], [h for t, h in iterator.iter_commit_timestamps(after_hash=hashes[0])])
+
+            tt = iterator.get_historic_teletext("zdf", hashes[1][:10])
+            self.assertEqual((hashes[1], "zdf 1"), (tt.commit_hash, tt.get_page(100).lines[0][0].text))
+            self.assertIsNone(iterator.get_historic_teletext("orf", hashes[1]))
+            self.assertIsNone(iterator.get_historic_teletext("zdf", "0123456789"))
+
+            timestamp = iterator.commit_indices[0].timestamps[-1]
+            tt = iterator.get_teletext_at("ard", timestamp)
+            self.assertEqual((hashes[-1], "ard 2"), (tt.commit_hash, tt.get_page(100).lines[0][0].text))
+            self.assertIsNone(iterator.get_teletext_at("ard", "2000-01-01T00:00:00"))
+
+            iterator.close()
+            self.assertEqual({}, iterator._readers)
+            tt = iterator.get_historic_teletext("zdf", hashes[0])
+            self.assertEqual("zdf 0", tt.get_page(100).lines[0][0].text)
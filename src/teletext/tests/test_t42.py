@@ -0,0 +1,146 @@
+import pickle
+import unittest
+
+import numpy as np
+
+from src.teletext import coding
+from src.teletext.t42 import T42Page, T42Grid, decode_t42, check_t42
+
+
+def encode_packet(magazine: int, row: int, payload: bytes) -> bytes:
+    mrag = (row << 3) | magazine
+    return bytes(coding.hamming8_encode([mrag & 0xf, mrag >> 4]).tolist()) + payload
+
+
+def encode_header(magazine: int, page: int, sub_page: int, language: int, text: bytes) -> bytes:
+    nibbles = [
+        page & 0xf, page >> 4,
+        sub_page & 0xf, (sub_page >> 4) & 0xf, (sub_page >> 8) & 0xf, (sub_page >> 12) & 0xf,
+        0, language,
+    ]
+    return encode_packet(magazine, 0, bytes(coding.hamming8_encode(nibbles).tolist()) + text)
+
+
+class TestT42(unittest.TestCase):
+
+    def page_data(self) -> bytes:
+        return b"".join((
+            encode_header(1, 0x23, 5, 1, b"Header".ljust(32)),
+            # red 'Hallo', blue background from 'Welt', german umlaut
+            encode_packet(1, 1, b"\x01Hallo\x04\x1dWelt \x5b\x7e".ljust(40)),
+            # mosaic white, full block
+            encode_packet(1, 2, b"\x17\x7f\x7f\x07A".ljust(40)),
+        ))
+
+    def test_100_decode(self):
+        page = T42Page(self.page_data())
+        self.assertEqual(123, page.page)
+        self.assertEqual(5, page.sub_page)
+        self.assertEqual(1, page.language)
+
+        self.assertEqual(3, len(page.blocks))
+        self.assertEqual([40, 40, 40], [len(line) for line in page.blocks])
+        self.assertEqual(" " * 8 + "Header", "".join(b[0] for b in page.blocks[0]).rstrip())
+        self.assertEqual(" Hallo  Welt Äß", "".join(b[0] for b in page.blocks[1]).rstrip())
+        self.assertEqual(" ██ A", "".join(b[0] for b in page.blocks[2]).rstrip())
+
+        self.assertEqual((" ", 1, 0, 0), page.blocks[1][0])
+        self.assertEqual(("H", 1, 0, 0), page.blocks[1][1])
+        self.assertEqual((" ", 4, 4, 0), page.blocks[1][7])
+        self.assertEqual(("W", 4, 4, 0), page.blocks[1][8])
+        self.assertEqual(("█", 7, 0, 1), page.blocks[2][1])
+        self.assertEqual(("A", 7, 0, 0), page.blocks[2][4])
+
+    def test_200_decode_many(self):
+        data = self.page_data()
+        pages = [T42Page(data), T42Page(data[42:]), T42Page(data)]
+        T42Page.decode_many(pages)
+
+        self.assertEqual([123, 0, 123], [p.page for p in pages])
+        self.assertEqual(T42Page(data).blocks, pages[2].blocks)
+        self.assertEqual(T42Page(data[42:]).blocks, pages[1].blocks)
+
+        decoded = decode_t42(data * 2, [0, 3])
+        self.assertEqual([123, 123], decoded["page"].tolist())
+        self.assertEqual([0, 1, 2, 0, 1, 2], decoded["row"].tolist())
+
+    def test_300_grid(self):
+        page = T42Page(self.page_data())
+        grid = page.grid
+        self.assertEqual((3, 40), grid.glyphs.shape)
+        self.assertEqual(" Hallo  Welt Äß", grid.to_lines()[1].rstrip())
+        self.assertEqual([1, 1, 1, 1, 1, 1, 4, 4], grid.fg[1, :8].tolist())
+        self.assertEqual([0, 0, 0, 0, 0, 0, 0, 4], grid.bg[1, :8].tolist())
+
+        grid2 = T42Grid.from_buffer(grid.to_buffer())
+        self.assertIs(grid.to_buffer().obj, grid2.to_buffer().obj)
+        self.assertEqual(grid, grid2)
+
+        buffers = []
+        data = pickle.dumps(grid, protocol=5, buffer_callback=buffers.append)
+        self.assertEqual(1, len(buffers))
+        self.assertEqual(grid, pickle.loads(data, buffers=buffers))
+        self.assertEqual(grid, pickle.loads(pickle.dumps(grid, protocol=4)))
+
+    def test_400_check(self):
+        def parity(text: bytes) -> bytes:
+            return bytes(coding.parity_encode(np.frombuffer(text, dtype=np.uint8)).tolist())
+
+        data = bytearray(b"".join((
+            encode_header(1, 0x23, 5, 1, parity(b"Header".ljust(32))),
+            encode_packet(1, 1, parity(b"Hallo".ljust(40))),
+            encode_packet(1, 2, parity(b"Welt".ljust(40))),
+        )))
+        clean = bytes(data)
+
+        check = check_t42(clean)
+        self.assertEqual([0, 0, 0], check["hamming_corrected"].tolist())
+        self.assertEqual([0, 0, 0], check["hamming_uncorrectable"].tolist())
+        self.assertEqual([0, 0, 0], check["parity_errors"].tolist())
+        self.assertEqual((3, 40), check["parity_error_map"].shape)
+
+        data[42 + 0] ^= 0x01          # single bit error in address of row 1
+        data[2 + 3] ^= 0x03           # double bit error in header page number
+        data[84 + 2 + 10] ^= 0x01     # parity error in row 2, column 10
+        check = check_t42(bytes(data))
+        self.assertEqual([0, 1, 0], check["hamming_corrected"].tolist())
+        self.assertEqual([1, 0, 0], check["hamming_uncorrectable"].tolist())
+        self.assertEqual([0, 0, 1], check["parity_errors"].tolist())
+        self.assertTrue(check["parity_error_map"][2, 10])
+        self.assertEqual([1], check["page_hamming_uncorrectable"].tolist())
+        self.assertEqual([1], check["page_parity_errors"].tolist())
+
+        # crc matches the bitwise crc over header cells 8-31 and 25 rows
+        text = b"Header".ljust(32)[:24] + b"Hallo".ljust(40) + b"Welt".ljust(40) + b" " * 40 * 23
+        c = 0
+        for n in text:
+            c = coding.crc(n, c)
+        self.assertEqual([c], check_t42(clean)["page_crc"].tolist())
+        self.assertEqual([c, c], check_t42(clean * 2, [0, 3])["page_crc"].tolist())
+
+        pages = [T42Page(clean), T42Page(bytes(data)), T42Page(clean[42:])]
+        self.assertEqual([pages[0], pages[2]], T42Page.drop_corrupt(pages))
+        data[2 + 3] ^= 0x03
+        self.assertEqual(2, len(T42Page.drop_corrupt([T42Page(clean), T42Page(bytes(data))], max_parity_errors=1)))
+        self.assertEqual(1, len(T42Page.drop_corrupt([T42Page(clean), T42Page(bytes(data))])))
+
+    def test_410_check_extension_packets(self):
+        def parity(text: bytes) -> bytes:
+            return bytes(coding.parity_encode(np.frombuffer(text, dtype=np.uint8)).tolist())
+
+        # X/26 with designation code 0 and 13 Hamming 24/18 coded triplets of value 0
+        x26 = bytes(coding.hamming8_encode([0]).tolist()) + b"\x8b\x80\x00" * 13
+        data = b"".join((
+            encode_header(1, 0x23, 5, 1, parity(b"Header".ljust(32))),
+            encode_packet(1, 1, parity(b"Hallo".ljust(40))),
+            encode_packet(1, 26, x26),
+        ))
+
+        check = check_t42(data)
+        self.assertEqual([0, 0, 0], check["hamming_uncorrectable"].tolist())
+        self.assertEqual([0, 0, 0], check["parity_errors"].tolist())
+        self.assertFalse(check["parity_error_map"].any())
+        self.assertEqual(check_t42(data[:84])["page_crc"].tolist(), check["page_crc"].tolist())
+
+        page = T42Page(data)
+        self.assertEqual([page], T42Page.drop_corrupt([page]))
@@ -0,0 +1,102 @@
+import unittest
+
+from src.teletext import Teletext, TeletextPage
+
+
+SNAPSHOT = "\n".join((
+    '{"scraper":"ard","timestamp":"2023-01-01T12:00:00"}',
+    '{"page":100,"sub_page":1,"timestamp":"2023-01-01T12:00:01"}',
+    '[["wb","ARD Text"],["yb",101,"Nachrichten"]]',
+    '[["w_","Wetter-"],["c_1","🬀🬁"]]',
+    '{"page":101,"sub_page":2,"timestamp":"2023-01-01T12:00:02"}',
+    '[["wb","Bundestag"]]',
+    '{"timestamp":"2023-01-01T12:00:03","page":101,"sub_page":1}',
+    '[["wb","Erste Seite"]]',
+    '{"page":170,"sub_page":1,"timestamp":"2023-01-01T12:00:04","error":"timeout"}',
+)) + "\n"
+
+
+class TestTeletext(unittest.TestCase):
+
+    def test_100_from_ndjson_lazy(self):
+        tt = Teletext.from_ndjson(SNAPSHOT.encode())
+        lazy_tt = Teletext.from_ndjson(SNAPSHOT.encode(), lazy=True)
+
+        self.assertEqual(("ard", "2023-01-01T12:00:00"), (lazy_tt.channel, lazy_tt.timestamp))
+        self.assertEqual([(100, 1), (101, 1), (101, 2), (170, 1)], lazy_tt.page_index)
+        self.assertEqual(list(tt.pages), list(lazy_tt.pages))
+        self.assertEqual(
+            b'{"page":101,"sub_page":2,"timestamp":"2023-01-01T12:00:02"}\n[["wb","Bundestag"]]\n',
+            bytes(lazy_tt.pages.get_raw((101, 2))),
+        )
+
+        for key, page in tt.pages.items():
+            lazy_page = lazy_tt.pages[key]
+            self.assertEqual(vars(page), vars(lazy_page))
+
+        self.assertIs(lazy_tt.get_page(101), lazy_tt.pages[(101, 1)])
+        self.assertEqual("timeout", lazy_tt.get_page(170).error)
+        self.assertEqual("weather", lazy_tt.get_page(170).category)
+        self.assertEqual(
+            "ARD TextNachrichten\nWetter-🬀🬁\n",
+            lazy_tt.get_page(100).to_ansi(colors=False),
+        )
+
+    def test_110_from_ndjson_line_breaks(self):
+        data = SNAPSHOT.replace("\n", "\r\n").replace(
+            '[["wb","Bundestag"]]', '\r\n[["wb","Bundestag"]]\r\n\r\n',
+        ).encode()
+        tt = Teletext.from_ndjson(SNAPSHOT.encode())
+        for lazy in (False, True):
+            tt2 = Teletext.from_ndjson(data, lazy=lazy)
+            self.assertEqual(tt.page_index, tt2.page_index)
+            for key, page in tt.pages.items():
+                self.assertEqual(vars(page), vars(tt2.pages[key]))
+            self.assertEqual(['[["wb","Bundestag"]]'], tt2.pages[(101, 2)]._lines_ndjson)
+
+    def test_200_page_lines(self):
+        tt = Teletext.from_ndjson(SNAPSHOT.encode())
+        page = tt.get_page(100)
+        self.assertEqual(
+            [
+                [
+                    TeletextPage.Block("ARD Text", "w", "b"),
+                    TeletextPage.Block("Nachrichten", "y", "b", link=101),
+                ],
+                [
+                    TeletextPage.Block("Wetter-", "w"),
+                    TeletextPage.Block("🬀🬁", "c", char_set=1),
+                ],
+            ],
+            page.lines,
+        )
+        self.assertIs(page.lines[0][0].bg_color, page.lines[0][1].bg_color)
+
+        # broken lines are skipped
+        page = TeletextPage()
+        page._lines_ndjson = ['[["wb",[101,2],"a"]]', '[["wb","b"]', '[["wb","c"]]']
+        self.assertEqual([[101, 2], None], [line[0].link for line in page.lines])
+
+    def test_300_page_render(self):
+        page = Teletext.from_ndjson(SNAPSHOT.encode()).get_page(100)
+        self.assertEqual("ARD TextNachrichten\nWetter-\n", page.to_text(concat_split_words=False))
+        self.assertEqual(
+            ["ard", "textnachrichten", "wetter"],
+            page.to_tokens(lowercase=True, concat_split_words=False),
+        )
+        self.assertEqual(
+            "▛▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▜\n"
+            "▌ARD TextNachrichten▐\n"
+            "▌Wetter-🬀🬁          ▐\n"
+            "▙▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▟\n",
+            page.to_ansi(colors=False, border=True),
+        )
+        self.assertEqual(
+            "".join(block.to_ansi() for block in page.lines[0]) + "\n"
+            + "".join(block.to_ansi() for block in page.lines[1]) + "\n",
+            page.to_ansi(),
+        )
+        self.assertIs(page.to_text(), page.to_text())
+        tokens = page.to_tokens()
+        tokens.append("x")
+        self.assertNotIn("x", page.to_tokens())
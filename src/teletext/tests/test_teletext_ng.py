@@ -1,10 +1,31 @@
+import io
+import tempfile
+import zipfile
 from pathlib import Path
 import unittest
+from typing import List
 
-from src.teletext.teletext_ng import TeletextNG
+import numpy as np
+
+from src.teletext.teletext_ng import TeletextNG, _FileWindow
 from src.teletext import charset, coding
 
 
+def parity(text: bytes) -> bytes:
+    return bytes(coding.parity_encode(np.frombuffer(text, dtype=np.uint8)).tolist())
+
+
+def encode_page(page: int, text: str) -> bytes:
+    magazine, page = page // 100, int(str(page % 100), 16)
+    header = [page & 0xf, page >> 4, 1, 0, 0, 0, 0, 0]
+    return b"".join((
+        bytes(coding.hamming8_encode([magazine, 0] + header).tolist()),
+        parity(b"Header".ljust(32)),
+        bytes(coding.hamming8_encode([(1 << 3) | magazine, 0]).tolist()),
+        parity(text.encode().ljust(40)),
+    ))
+
+
 class TestTeletextNg(unittest.TestCase):
 
     def test_100(self):
@@ -14,4 +35,63 @@ class TestTeletextNg(unittest.TestCase):
             print("XX", page.page, page.sub_page)
             print(page.to_ansi_colored())
 
-            input(">")
\ No newline at end of file
+            input(">")
+
+    def create_zip(self, filename: Path, timestamps: List[str]):
+        with zipfile.ZipFile(filename, "w") as main_zip:
+            for i, timestamp in enumerate(timestamps):
+                data = io.BytesIO()
+                with zipfile.ZipFile(data, "w", zipfile.ZIP_DEFLATED) as zip_file:
+                    for page in (100, 101, 200):
+                        zip_file.writestr(f"P{page}-01.t42", encode_page(page, f"page {page} at {timestamp}"))
+                    zip_file.writestr("readme.txt", "not a page")
+                    if i == 1:
+                        # a page with parity errors
+                        zip_file.writestr("P102-01.t42", encode_page(102, "corrupt")[:-40] + b"\x00" * 40)
+
+                main_zip.writestr(
+                    f"dump-{timestamp}.zip", data.getvalue(),
+                    compress_type=zipfile.ZIP_STORED if i % 2 else zipfile.ZIP_DEFLATED,
+                )
+            main_zip.writestr("readme.txt", "not a zip")
+
+    def test_200_nested_zip(self):
+        timestamps = ["2023-01-01T12:00:00", "2023-01-01T10:00:00", "2023-01-01T11:00:00"]
+        with tempfile.TemporaryDirectory(prefix="investigate-news-test") as dir:
+            filename = Path(dir) / "teletext.zip"
+            self.create_zip(filename, timestamps)
+            iterator = TeletextNG(filename)
+
+            def read(**kwargs):
+                return [
+                    (page.timestamp, page.page, page.sub_page, page.grid.row_text(1).strip())
+                    for page in iterator.iter_pages(**kwargs)
+                ]
+
+            expected = [
+                (timestamp, page, 1, f"page {page} at {timestamp}")
+                for timestamp in sorted(timestamps)
+                for page in (100, 101, 200)
+            ]
+            self.assertEqual(
+                expected[:3] + [("2023-01-01T10:00:00", 102, 1, "")] + expected[3:],
+                read(),
+            )
+            for num_workers in (0, 2):
+                self.assertEqual(expected, read(max_parity_errors=0, num_workers=num_workers))
+                self.assertEqual(
+                    [e for e in expected if e[1] < 200],
+                    read(pages=range(100, 200), max_parity_errors=0, num_workers=num_workers),
+                )
+
+    def test_300_file_window(self):
+        file = io.BytesIO(b"0123456789")
+        window = _FileWindow(file, 2, 5)
+        self.assertEqual(b"234", window.read(3))
+        self.assertEqual(b"56", window.read())
+        self.assertEqual(b"", window.read())
+        self.assertEqual(1, window.seek(-4, io.SEEK_END))
+        self.assertEqual(b"3", window.read(1))
+        self.assertEqual(4, window.seek(2, io.SEEK_CUR))
+        self.assertEqual(b"6", window.read())
+        self.assertEqual(5, window.seek(10))
@@ -0,0 +1,100 @@
+import subprocess
+import unittest
+import tempfile
+from pathlib import Path
+
+from src.gitindex import GitCommitIndex
+
+
+class TestGitCommitIndex(unittest.TestCase):
+
+    def _git(self, path: Path, *args: str, date: str = None) -> str:
+        env = None
+        if date:
+            env = {"GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date, "PATH": "/usr/bin:/bin"}
+        return subprocess.check_output(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@test", *args],
+            cwd=str(path), env=env,
+        ).decode()
+
+    def _commit(self, path: Path, files: dict, date: str) -> str:
+        for name, content in files.items():
+            filename = path / name
+            filename.parent.mkdir(parents=True, exist_ok=True)
+            filename.write_text(content)
+        self._git(path, "add", "-A")
+        self._git(path, "commit", "-q", "-m", "commit", date=date)
+        return self._git(path, "rev-parse", "HEAD").strip()
+
+    def test_index(self):
+        with tempfile.TemporaryDirectory(prefix="investigate-news-test") as dir:
+            path = Path(dir) / "repo"
+            path.mkdir()
+            self._git(path, "init", "-q")
+            hashes = [
+                self._commit(path, {"docs/a.json": "1", "docs/b.json": "1"}, "2023-01-01T12:00:00+02:00"),
+                self._commit(path, {"README": "x"}, "2023-01-02T12:00:00+00:00"),
+                self._commit(path, {"docs/b.json": "2"}, "2023-01-03T12:00:00+00:00"),
+            ]
+            filename = Path(dir) / "index.ndjson"
+
+            index = GitCommitIndex(path, "docs", filename)
+            self.assertEqual(2, index.update())
+            self.assertEqual([hashes[0], hashes[2]], index.hashes)
+            self.assertEqual(["2023-01-01T10:00:00", "2023-01-03T12:00:00"], index.timestamps)
+            self.assertEqual([["docs/a.json", "docs/b.json"], ["docs/b.json"]], index.files)
+
+            hashes.append(self._commit(path, {"docs/a.json": "3"}, "2023-01-04T12:00:00+00:00"))
+
+            # loads the persisted commits and appends the new one
+            index = GitCommitIndex(path, "docs", filename)
+            self.assertEqual(1, index.update())
+            self.assertEqual(0, index.update())
+            self.assertEqual(3, len(GitCommitIndex(path, "docs", filename)))
+
+            self.assertEqual(1, index.find_hash(hashes[2][:7]))
+            self.assertEqual(2, index.find_hash(hashes[3]))
+            self.assertIsNone(index.find_hash(hashes[1]))
+
+            self.assertIsNone(index.find_timestamp("2023-01-01T09:59:59"))
+            self.assertEqual(0, index.find_timestamp("2023-01-01T10:00:00"))
+            self.assertEqual(1, index.find_timestamp("2023-01-03T23:00:00"))
+            self.assertEqual(2, index.find_timestamp("2024"))
+            self.assertEqual(0, index.find_timestamp("2023-01-03T23:00:00", "docs/a.json"))
+            self.assertEqual(1, index.find_timestamp("2023-01-03T23:00:00", "docs/b.json"))
+            self.assertIsNone(index.find_timestamp("2024", "docs/c.json"))
+
+    def test_rewritten_history(self):
+        with tempfile.TemporaryDirectory(prefix="investigate-news-test") as dir:
+            path = Path(dir) / "repo"
+            path.mkdir()
+            self._git(path, "init", "-q")
+            self._commit(path, {"docs/a.json": "1"}, "2023-01-01T12:00:00+00:00")
+            self._commit(path, {"docs/a.json": "2"}, "2023-01-02T12:00:00+00:00")
+            filename = Path(dir) / "index.ndjson"
+
+            index = GitCommitIndex(path, "docs", filename)
+            self.assertEqual(2, index.update())
+
+            # replace the last commit, the indexed one is not reachable anymore
+            self._git(path, "reset", "-q", "--hard", "HEAD~1")
+            hashes = [
+                self._git(path, "rev-parse", "HEAD").strip(),
+                self._commit(path, {"docs/b.json": "3"}, "2023-01-03T12:00:00+00:00"),
+                # committer time before its parent
+                self._commit(path, {"docs/a.json": "4"}, "2022-12-31T12:00:00+00:00"),
+            ]
+
+            index = GitCommitIndex(path, "docs", filename)
+            self.assertEqual(3, index.update())
+            self.assertEqual(hashes, index.hashes)
+            reloaded = GitCommitIndex(path, "docs", filename)
+            self.assertEqual(3, len(reloaded))
+            self.assertEqual(hashes, reloaded.hashes)
+
+            self.assertEqual(2, index.find_timestamp("2022-12-31T12:00:00"))
+            self.assertEqual(0, index.find_timestamp("2023-01-02T00:00:00"))
+            self.assertEqual(1, index.find_timestamp("2024"))
+            self.assertEqual(0, index.find_timestamp("2023-01-02T00:00:00", "docs/a.json"))
+            self.assertEqual(2, index.find_timestamp("2022-12-31T12:00:00", "docs/a.json"))
+            self.assertIsNone(index.find_timestamp("2023-01-01T00:00:00", "docs/b.json"))
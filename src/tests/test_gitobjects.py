@@ -0,0 +1,65 @@
+import subprocess
+import unittest
+import tempfile
+from pathlib import Path
+
+from src.gitobjects import GitObjectReader
+
+
+class TestGitObjectReader(unittest.TestCase):
+
+    def _git(self, path: Path, *args: str) -> str:
+        return subprocess.check_output(
+            ["git", "-c", "user.name=test", "-c", "user.email=test@test", *args],
+            cwd=str(path),
+        ).decode()
+
+    def _commit(self, path: Path, files: dict) -> str:
+        for name, content in files.items():
+            filename = path / name
+            if content is None:
+                filename.unlink()
+            else:
+                filename.parent.mkdir(parents=True, exist_ok=True)
+                filename.write_text(content)
+        self._git(path, "add", "-A")
+        self._git(path, "commit", "-q", "-m", "commit")
+        return self._git(path, "rev-parse", "HEAD").strip()
+
+    def test_iter_changed_files(self):
+        with tempfile.TemporaryDirectory(prefix="investigate-news-test") as dir:
+            path = Path(dir)
+            self._git(path, "init", "-q")
+            hashes = [
+                self._commit(path, {"docs/snapshots/a/x.json": "1", "docs/snapshots/b/y.json": "2"}),
+                self._commit(path, {"docs/snapshots/b/y.json": "3"}),
+                self._commit(path, {"docs/snapshots/a/x.json": None}),
+                self._commit(path, {"docs/snapshots/a/x.json": "1"}),
+            ]
+
+            with GitObjectReader(path) as reader:
+                self.assertEqual(
+                    [("docs/snapshots/a/x.json", b"1"), ("docs/snapshots/b/y.json", b"3")],
+                    [
+                        (name, reader.read_blob(blob_hash))
+                        for name, blob_hash in reader.iter_files(hashes[1], "docs/snapshots")
+                    ]
+                )
+
+                known = {}
+                self.assertEqual(
+                    [
+                        ["docs/snapshots/a/x.json", "docs/snapshots/b/y.json"],
+                        ["docs/snapshots/b/y.json"],
+                        [],
+                        ["docs/snapshots/a/x.json"],
+                    ],
+                    [
+                        [name for name, _ in reader.iter_files(commit_hash, "docs/snapshots", known)]
+                        for commit_hash in hashes
+                    ]
+                )
+
+                self.assertEqual(b"3", reader.read_file(hashes[1], "docs/snapshots/b/y.json"))
+                self.assertIsNone(reader.read_file(hashes[2], "docs/snapshots/a/x.json"))
+                self.assertIsNone(reader.read_file(hashes[2], "docs/snapshots/c/x.json"))
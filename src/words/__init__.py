@@ -1,5 +1,6 @@
 from .calcdict import CalcDict
 from .counter import TokenCounter
 from .counterbuckets import TokenCounterBuckets
+from .sketch import CountMinSketch
 from .tokengraph import TokenGraph
 from .tokenizer import tokenize, concat_split_words
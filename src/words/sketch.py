@@ -0,0 +1,58 @@
+import hashlib
+from typing import Iterable, Optional
+
+import numpy as np
+
+
+class CountMinSketch:
+    """
+    Approximate counts of 64-bit hashes in `depth` rows of `width` counters.
+
+    The estimate of a hash is never lower than its true count. It is higher
+    by at most `e / width` of the total count with a probability
+    of `1 - exp(-depth)`.
+
+    `width` must be a power of two.
+    """
+
+    def __init__(self, width: int = 1 << 20, depth: int = 4, seed: int = 23):
+        if width < 2 or width & (width - 1):
+            raise ValueError(f"width must be a power of two, got {width}")
+        self.width = width
+        self.depth = depth
+        self.counts = np.zeros((depth, width), dtype=np.int64)
+        # multiply-shift hashing with one random odd multiplier per row
+        self._multipliers = np.random.default_rng(seed).integers(
+            0, 1 << 63, size=(depth, 1), dtype=np.uint64,
+        ) * np.uint64(2) + np.uint64(1)
+        self._shift = np.uint64(64 - (width.bit_length() - 1))
+
+    @property
+    def nbytes(self) -> int:
+        return self.counts.nbytes
+
+    def add(self, hashes: np.ndarray, counts: Optional[np.ndarray] = None):
+        indices = self._indices(hashes)
+        for row in range(self.depth):
+            np.add.at(self.counts[row], indices[row], 1 if counts is None else counts)
+
+    def estimate(self, hashes: np.ndarray) -> np.ndarray:
+        indices = self._indices(hashes)
+        return self.counts[np.arange(self.depth)[:, None], indices].min(axis=0)
+
+    def _indices(self, hashes: np.ndarray) -> np.ndarray:
+        hashes = np.asarray(hashes, dtype=np.uint64).reshape(1, -1)
+        return ((hashes * self._multipliers) >> self._shift).astype(np.int64)
+
+
+def hash_tokens(tokens: Iterable[str]) -> np.ndarray:
+    """
+    Returns the 64-bit BLAKE2b hashes of the utf-8 encoded tokens.
+
+    Unlike python's `hash()` they are the same in every process and run,
+    so sketches can be stored, compared and combined.
+    """
+    return np.frombuffer(
+        b"".join([hashlib.blake2b(token.encode(), digest_size=8).digest() for token in tokens]),
+        dtype="<u8",
+    ).astype(np.uint64)
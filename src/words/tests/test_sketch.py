@@ -0,0 +1,41 @@
+import hashlib
+import unittest
+
+import numpy as np
+
+from src.words import CountMinSketch
+from src.words.sketch import hash_tokens
+
+
+class TestSketch(unittest.TestCase):
+
+    def test_100_count_min(self):
+        hashes = np.arange(1000, dtype=np.uint64) * np.uint64(0x9e3779b97f4a7c15)
+        counts = np.arange(1000) % 7
+
+        sketch = CountMinSketch(width=1 << 8, depth=4)
+        sketch.add(hashes, counts)
+        sketch.add(hashes[:10])
+
+        estimate = sketch.estimate(hashes)
+        expected = counts + (np.arange(1000) < 10)
+        self.assertTrue(np.all(estimate >= expected))
+        self.assertEqual(int(expected.sum()) * 4, int(sketch.counts.sum()))
+
+        sketch = CountMinSketch(width=1 << 16, depth=4)
+        sketch.add(hashes, counts)
+        self.assertEqual(counts.tolist(), sketch.estimate(hashes).tolist())
+
+        with self.assertRaises(ValueError):
+            CountMinSketch(width=1000)
+
+    def test_200_hash_tokens(self):
+        hashes = hash_tokens(["a", "b", "ä"])
+        self.assertEqual(np.uint64, hashes.dtype)
+        self.assertEqual(3, len(set(hashes.tolist())))
+        # independent of the process' hash seed
+        self.assertEqual(
+            int.from_bytes(hashlib.blake2b(b"a", digest_size=8).digest(), "little"),
+            int(hashes[0]),
+        )
+        self.assertEqual(0, len(hash_tokens([])))
@@ -1,5 +1,11 @@
+import importlib.util
+import math
+import tempfile
 import unittest
-from io import BytesIO
+from io import BytesIO, StringIO
+from pathlib import Path
+
+import numpy as np
 
 from src.words import TokenGraph
 
@@ -71,6 +77,191 @@ class TestTokenGraph(unittest.TestCase):
         self.assertEqual(tg.edges, tg2.edges)
         self.assertEqual(tg.edge_frequencies(), tg2.edge_frequencies())
 
+    def test_110_add_documents(self):
+        documents = [["a", "b", "b", "c"], [], ["c", "a", "d", "c", "d"], ["d"]]
+        for directed in (False, True):
+            for allow_self_reference in (False, True):
+                tg1 = TokenGraph(directed=directed, allow_self_reference=allow_self_reference)
+                for tokens in documents:
+                    tg1.add_related_tokens(tokens)
+
+                tg2 = TokenGraph(directed=directed, allow_self_reference=allow_self_reference)
+                tg2.BATCH_SIZE = 4
+                self.assertEqual(4, tg2.add_documents(iter(documents)))
+
+                self.assertEqual(tg1.vertex_counts(), tg2.vertex_counts())
+                self.assertEqual(tg1.edge_counts(), tg2.edge_counts())
+                self.assertEqual(tg1.num_all_edges, tg2.num_all_edges)
+
+        tg = TokenGraph(directed=True, allow_self_reference=True)
+        tg.add_documents([["a", "b", "a"]])
+        self.assertEqual(
+            {("a", "a"): 3, ("a", "b"): 1, ("b", "a"): 1, ("b", "b"): 1},
+            tg.edge_counts(),
+        )
+
+    def test_120_merge(self):
+        documents = [["a", "b", "b"], ["c", "a"], ["d", "c", "d"], [], ["e", "a"]] * 3
+        for directed in (False, True):
+            tg = TokenGraph(directed=directed)
+            tg.add_documents(documents)
+
+            tg1 = TokenGraph(directed=directed)
+            tg1.add_documents(documents[:4])
+            tg2 = TokenGraph(directed=directed)
+            tg2.add_documents(documents[4:])
+
+            for merged in (
+                    tg1 + tg2,
+                    TokenGraph.merge_many([tg1, TokenGraph(directed=directed), tg2]),
+                    TokenGraph.from_documents(documents, directed=directed, num_workers=2, documents_per_task=2),
+            ):
+                self.assertEqual(tg.vocab, merged.vocab)
+                self.assertEqual(tg.vertex_counts(), merged.vertex_counts())
+                self.assertEqual(tg.edge_counts(), merged.edge_counts())
+                self.assertEqual((tg.num_all_tokens, tg.num_all_edges), (merged.num_all_tokens, merged.num_all_edges))
+
+        with self.assertRaises(ValueError):
+            TokenGraph() + TokenGraph(directed=True)
+
+    def test_130_approx(self):
+        documents = [["a", "b", "b", "c"], ["c", "a", "d", "c", "d"], ["d", "a"], ["e", "f"]] * 3
+        for directed in (False, True):
+            for kwargs in (
+                    {"vertex_count_gte": 6, "edge_count_gte": 6},
+                    {"vertex_count_gte": 7},
+                    {"edge_count_gte": 9},
+            ):
+                expected = TokenGraph.from_documents(documents, directed=directed).filter(**kwargs)
+                # a tiny sketch has many collisions, which must not change the result
+                tg = TokenGraph.from_documents_approx(documents, directed=directed, sketch_width=4, **kwargs)
+                self.assertEqual(expected.vocab, tg.vocab)
+                self.assertEqual(expected.edge_counts(), tg.edge_counts())
+                self.assertEqual(expected.num_all_edges, tg.num_all_edges)
+
+        with self.assertRaises(TypeError):
+            TokenGraph.from_documents_approx(iter(documents), edge_count_gte=2)
+
+    def test_200_compact(self):
+        tg = TokenGraph()
+        tg.add_related_tokens(["c", "b", "a"])
+        tg.add_related_tokens(["b", "a"])
+
+        self.assertEqual(["c", "b", "a"], tg.vocab)
+        self.assertEqual([1, 2, 2], tg.vertex_count_array.tolist())
+        sources, targets, counts = tg.edge_arrays()
+        self.assertEqual([0, 0, 1], sources.tolist())
+        self.assertEqual([1, 2, 2], targets.tolist())
+        self.assertEqual([1, 1, 2], counts.tolist())
+
+        # undirected edge keys are sorted by token
+        self.assertEqual([("b", "c"), ("a", "c"), ("a", "b")], list(tg.edges))
+        self.assertEqual({"count": 2}, tg.edges[("a", "b")])
+        self.assertIn(("a", "c"), tg)
+        self.assertNotIn(("a", "x"), tg)
+        self.assertEqual({"count": 1}, tg.vertices["c"])
+        self.assertEqual(4, tg.num_all_edges)
+
+        file = StringIO()
+        tg.to_json(file)
+        file.seek(0)
+        tg2 = TokenGraph.from_json(file)
+        self.assertEqual(tg.vertices, tg2.vertices)
+        self.assertEqual(tg.edges, tg2.edges)
+
+        # state of previous versions
+        tg2 = TokenGraph.from_state_dict({
+            "directed": False, "allow_self_reference": False, "num_all_tokens": 5, "num_all_edges": 4,
+            "vertices": {"c": {"count": 1}, "b": {"count": 2}, "a": {"count": 2}},
+            "edges": {("b", "c"): {"count": 1}, ("a", "c"): {"count": 1}, ("a", "b"): {"count": 2}},
+        })
+        self.assertEqual(tg.edge_counts(), tg2.edge_counts())
+        self.assertEqual(tg.vertex_counts(), tg2.vertex_counts())
+
+        tg.remove_tokens(["b"])
+        self.assertEqual({("a", "c"): 1}, tg.edge_counts())
+        self.assertEqual(["c", "a"], tg.vocab)
+
+    def test_210_binary(self):
+        tg = TokenGraph(directed=True)
+        tg.add_documents([["a", "b", "b", "c"], ["c", "ä", "d"], ["d", "a\r"]])
+
+        with tempfile.TemporaryDirectory() as path:
+            tg.to_binary(Path(path) / "graph")
+
+            for mmap in (True, False):
+                tg2 = TokenGraph.from_binary(Path(path) / "graph", mmap=mmap)
+                self.assertEqual(mmap, isinstance(tg2._edge_keys, np.memmap))
+                self.assertEqual(tg.vocab, tg2.vocab)
+                self.assertEqual(tg.vertex_counts(), tg2.vertex_counts())
+                self.assertEqual(tg.edge_counts(), tg2.edge_counts())
+                self.assertEqual((tg.num_all_tokens, tg.num_all_edges), (tg2.num_all_tokens, tg2.num_all_edges))
+                self.assertTrue(tg2.directed)
+
+                self.assertEqual(
+                    tg.filter(edge_count_gte=2).edge_counts(),
+                    tg2.filter(edge_count_gte=2).edge_counts(),
+                )
+                tg2.add_related_tokens(["c", "ä"])
+                self.assertEqual(2, tg2.edges[("c", "ä")]["count"])
+                del tg2
+
+        with self.assertRaises(ValueError):
+            TokenGraph.from_documents([["a\nb"]]).to_binary("/tmp/never-written")
+
+    def test_300_adjacency(self):
+        tg = TokenGraph()
+        tg.add_related_tokens(["a", "b", "b", "c"])
+
+        self.assertEqual({"a": 2, "c": 2}, tg.neighbors("b"))
+        self.assertEqual({}, tg.neighbors("x"))
+        self.assertEqual(
+            [(("a", "b"), {"count": 2}), (("b", "c"), {"count": 2})],
+            tg.get_token_edges("b"),
+        )
+        self.assertEqual({"a": 2, "b": 2, "c": 2}, tg.degree())
+
+        # caches are updated on change
+        tg.add_related_tokens(["c", "d"])
+        self.assertEqual({"a": 1, "b": 2, "d": 1}, tg.neighbors("c"))
+        self.assertEqual({"a": 2, "b": 2, "c": 3, "d": 1}, tg.degree())
+
+        tg.remove_tokens(["b"])
+        self.assertEqual({"a": 1, "d": 1}, tg.neighbors("c"))
+        self.assertEqual({"a": 1, "c": 2, "d": 1}, tg.degree())
+
+        tg = tg.filter(vertex_tokens=["c", "d"])
+        self.assertEqual({"d": 1}, tg.neighbors("c"))
+
+        # both directions
+        tg = TokenGraph(directed=True)
+        tg.add_related_tokens(["a", "b"])
+        tg.add_related_tokens(["c", "a"])
+        self.assertEqual({"b": 1, "c": 1}, tg.neighbors("a"))
+        self.assertEqual({"a": 2, "b": 1, "c": 1}, tg.degree())
+        self.assertEqual({"a": 1, "b": 1, "c": 0}, tg.degree_in())
+        self.assertEqual({"a": 1, "b": 0, "c": 1}, tg.degree_out())
+
+    def test_400_filter_repeat(self):
+        tg = TokenGraph()
+        # a triangle with a chain attached
+        for tokens in (["a", "b"], ["b", "c"], ["c", "a"], ["c", "d"], ["d", "e"], ["e", "f"], ["f", "f"]):
+            tg.add_related_tokens(tokens)
+
+        self.assertEqual(["a", "b", "c", "d", "e"], list(tg.filter(degree_gte=2).vertices))
+        core = tg.filter_repeat(degree_gte=2)
+        self.assertEqual(["a", "b", "c"], list(core.vertices))
+        self.assertEqual({("a", "b"): 1, ("b", "c"): 1, ("a", "c"): 1}, core.edge_counts())
+        self.assertEqual(core.edge_counts(), tg.filter_repeat(degree_gte=2, max_repetions=100).edge_counts())
+        self.assertEqual(["a", "b", "c", "d", "e"], list(tg.filter_repeat(degree_gte=2, max_repetions=1).vertices))
+
+        self.assertEqual(["c", "d", "e"], list(tg.filter_repeat(degree_gte=1, vertex_tokens=["c", "d", "e"]).vertices))
+        self.assertEqual([], list(tg.filter_repeat(degree_gte=2, vertex_tokens=["c", "d", "e"]).vertices))
+
+        tg.filter_repeat(degree_gte=2, inplace=True)
+        self.assertEqual(core.edge_counts(), tg.edge_counts())
+        self.assertEqual(3, tg.num_all_edges)
+
     def test_500_export_igraph(self):
         tg = TokenGraph()
         tg.add_related_tokens(["a", "b", "b", "c", "c", "c"])
@@ -81,3 +272,62 @@ class TestTokenGraph(unittest.TestCase):
             [0.3333333333333333, 0.5, 1.0],
             ig.es["weight"]
         )
+
+    def test_510_export_networkx(self):
+        tg = TokenGraph()
+        tg.add_related_tokens(["a", "b", "b", "c", "c", "c"])
+
+        ig = tg.to_igraph()
+        self.assertEqual(["a", "b", "c"], ig.vs["name"])
+        self.assertEqual([1, 2, 3], ig.vs["count"])
+        self.assertEqual([("a", "b"), ("a", "c"), ("b", "c")], [(ig.vs[e.source]["name"], ig.vs[e.target]["name"]) for e in ig.es])
+        self.assertEqual(0, TokenGraph().to_igraph().ecount())
+
+        nx = tg.to_networkx()
+        self.assertEqual({"a": 1, "b": 2, "c": 3}, dict(nx.nodes(data="count")))
+        self.assertEqual(
+            {("a", "b"): 2, ("a", "c"): 3, ("b", "c"): 6},
+            {(a, b): count for a, b, count in nx.edges(data="count")},
+        )
+        self.assertEqual(1., nx.edges["c", "b"]["weight"])
+        self.assertFalse(nx.is_directed())
+
+    @unittest.skipUnless(importlib.util.find_spec("scipy"), "scipy not installed")
+    def test_520_export_sparse(self):
+        tg = TokenGraph(allow_self_reference=True)
+        tg.add_related_tokens(["a", "b", "b"])
+
+        self.assertEqual([[1, 2], [2, 3]], tg.to_sparse_matrix().toarray().tolist())
+
+    def test_600_association(self):
+        tg = TokenGraph()
+        tg.add_documents([["a", "b"], ["a", "b"], ["a", "c"], ["c", "d"], ["d", "b"]])
+
+        pmi = tg.edge_scores("pmi")
+        vf, ef = tg.vertex_frequencies(), tg.edge_frequencies()
+        for (a, b), score in pmi.items():
+            self.assertAlmostEqual(math.log(ef[(a, b)] / (vf[a] * vf[b])), score)
+
+        npmi = tg.edge_scores("npmi")
+        self.assertAlmostEqual(pmi[("a", "b")] / -math.log(ef[("a", "b")]), npmi[("a", "b")])
+
+        # contingency table of (a, b) in the symmetric co-occurrence matrix:
+        #   [[2, 1], [1, 6]] with row and column sums 3 and 7 and n = 10
+        g2 = 2 * (2 * math.log(2) + 6 * math.log(6) - 2 * 3 * math.log(3) - 2 * 7 * math.log(7) + 10 * math.log(10))
+        self.assertAlmostEqual(g2, tg.edge_scores("llr")[("a", "b")])
+
+        self.assertEqual(["b", "c"], [t for t, _ in tg.top_associations("a", measure="llr")])
+        self.assertEqual([("b", npmi[("a", "b")])], tg.top_associations("a", k=1))
+        self.assertEqual([("b", npmi[("a", "b")])], tg.top_associations("a", edge_count_gte=2))
+        self.assertEqual([], tg.top_associations("x"))
+        self.assertEqual(
+            {token: tg.top_associations(token, k=1) for token in tg.vocab},
+            tg.top_associations_per_vertex(k=1),
+        )
+
+        # scores are updated on change
+        tg.add_related_tokens(["a", "c"])
+        self.assertNotAlmostEqual(pmi[("a", "c")], tg.edge_scores("pmi")[("a", "c")])
+
+        with self.assertRaises(ValueError):
+            tg.edge_scores("chi2")
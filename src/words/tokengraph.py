@@ -1,13 +1,38 @@
-import pickle
+import functools
+import json
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, Future
 from pathlib import Path
-from copy import deepcopy
-from typing import Set, Iterable, Dict, Tuple, Optional, Callable, Union, BinaryIO, TextIO
+from typing import Set, Iterable, Dict, Tuple, Optional, Callable, Union, List, Iterator, TextIO, Deque
+
+import numpy as np
 
 from ..mixin import StateDictMixin
 from .calcdict import CalcDict
+from .sketch import CountMinSketch, hash_tokens
+
+
+_ID_MASK = 0xffffffff
+# combines two token hashes into a pair hash
+_PAIR_HASH_MULTIPLIER = np.uint64(0x9e3779b97f4a7c15)
 
 
 class TokenGraph(StateDictMixin):
+    """
+    Co-occurrence graph of tokens.
+
+    Tokens are interned into the `vocab` list, so vertex `i` is `vocab[i]`
+    and its count is `vertex_count_array[i]`.
+
+    Edges are stored as sorted, packed int64 keys `(a << 32) | b` of the
+    vertex ids together with an array of counts. Undirected edges always
+    have `a <= b`. Newly added edges are collected in a pending buffer
+    and merged into the sorted arrays on the next read.
+
+    `vertices` and `edges` are read-only, dict-like views of the arrays,
+    returning a `{"count": n}` dict per vertex or edge.
+    """
 
     DEFAULT_VERTEX = {
         "count": 0,
@@ -17,6 +42,15 @@ class TokenGraph(StateDictMixin):
         "count": 0,
     }
 
+    ASSOCIATION_MEASURES = ("pmi", "npmi", "llr")
+
+    # merge the pending edges when this many have been collected
+    PENDING_SIZE = 1 << 22
+    # count the token pairs of add_documents when this many have been collected
+    BATCH_SIZE = 1 << 21
+    # number of partial graphs that are merged at once in from_documents
+    MERGE_SIZE = 16
+
     def __init__(
             self,
             directed: bool = False,
@@ -24,10 +58,21 @@ class TokenGraph(StateDictMixin):
     ):
         self.directed = bool(directed)
         self.allow_self_reference = bool(allow_self_reference)
-        self.vertices: Dict[str, dict] = {}
-        self.edges: Dict[Tuple[str, str], dict] = {}
+        self.vocab: List[str] = []
+        self.vocab_index: Dict[str, int] = {}
         self.num_all_tokens = 0
         self.num_all_edges = 0
+        self._vertex_counts = np.zeros(0, dtype=np.int64)
+        self._edge_keys = np.zeros(0, dtype=np.int64)
+        self._edge_counts = np.zeros(0, dtype=np.int64)
+        self._pending_keys: List[np.ndarray] = []
+        self._pending_counts: List[np.ndarray] = []
+        self._num_pending = 0
+        # caches of the merged edges, see _invalidate()
+        self._edge_ids: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._degrees: Optional[np.ndarray] = None
+        self._adjacency: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._edge_scores: Dict[str, np.ndarray] = {}
 
     def __str__(self):
         return f"TokenGraph({len(self.vertices):,} x {len(self.edges):,})"
@@ -35,27 +80,344 @@ class TokenGraph(StateDictMixin):
     def __copy__(self):
         return self.copy()
 
+    def __add__(self, other: "TokenGraph") -> "TokenGraph":
+        if not isinstance(other, TokenGraph):
+            return NotImplemented
+        return self.merge_many([self, other])
+
     def __contains__(self, token_or_edge: Union[str, Tuple[str, str]]):
         if isinstance(token_or_edge, str):
             return token_or_edge in self.vertices
         return token_or_edge in self.edges
 
+    @property
+    def vertices(self) -> "TokenGraphVertices":
+        return TokenGraphVertices(self)
+
+    @property
+    def edges(self) -> "TokenGraphEdges":
+        return TokenGraphEdges(self)
+
+    @property
+    def vertex_count_array(self) -> np.ndarray:
+        return self._vertex_counts[:len(self.vocab)]
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the source ids, target ids and counts of all edges,
+        sorted by source and target id.
+        """
+        self._merge_pending()
+        if self._edge_ids is None:
+            self._edge_ids = self._edge_keys >> 32, self._edge_keys & _ID_MASK
+        return self._edge_ids[0], self._edge_ids[1], self._edge_counts
+
+    @property
+    def edge_count_array(self) -> np.ndarray:
+        self._merge_pending()
+        return self._edge_counts
+
+    def _edge_ids_at(self, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the source and target ids of the edges at `indices` (or mask)
+        without unpacking all edges.
+        """
+        if self._edge_ids is not None:
+            return self._edge_ids[0][indices], self._edge_ids[1][indices]
+        keys = self._edge_keys[indices]
+        return keys >> 32, keys & _ID_MASK
+
+    def adjacency(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the CSR index `(indptr, neighbors, edge_indices)` of all edges
+        of each vertex, regardless of direction.
+
+        The neighbor ids of vertex `i` are `neighbors[indptr[i]:indptr[i+1]]`
+        and `edge_indices` are the positions in `edge_arrays()`.
+        The index is cached until the edges change and is then rebuilt
+        from scratch, so alternating adds and lookups cost O(edges) each.
+        """
+        sources, targets, _ = self.edge_arrays()
+        if self._adjacency is None or len(self._adjacency[0]) != len(self.vocab) + 1:
+            self._adjacency = _adjacency(len(self.vocab), sources, targets)
+        return self._adjacency
+
     def copy(self) -> "TokenGraph":
+        self._merge_pending()
         instance = TokenGraph(directed=self.directed, allow_self_reference=self.allow_self_reference)
         instance.num_all_tokens = self.num_all_tokens
         instance.num_all_edges = self.num_all_edges
-        instance.vertices = deepcopy(self.vertices)
-        instance.edges = deepcopy(self.edges)
+        instance.vocab = list(self.vocab)
+        instance.vocab_index = dict(self.vocab_index)
+        instance._vertex_counts = self.vertex_count_array.copy()
+        instance._edge_keys = self._edge_keys.copy()
+        instance._edge_counts = self._edge_counts.copy()
+        return instance
+
+    @classmethod
+    def merge_many(cls, graphs: Iterable["TokenGraph"]) -> "TokenGraph":
+        """
+        Returns a new graph with the summed vertex and edge counts of all graphs.
+
+        The vocabulary keeps the order of first appearance,
+        so merging the graphs of consecutive document chunks gives
+        the same graph as adding all documents to one graph.
+        """
+        graphs = list(graphs)
+        if not graphs:
+            raise ValueError("No graphs to merge")
+        for graph in graphs[1:]:
+            if (graph.directed, graph.allow_self_reference) != (graphs[0].directed, graphs[0].allow_self_reference):
+                raise ValueError("Can not merge graphs with different directed/allow_self_reference settings")
+
+        instance = cls(directed=graphs[0].directed, allow_self_reference=graphs[0].allow_self_reference)
+        all_keys, all_counts = [], []
+        for graph in graphs:
+            ids = instance._intern(graph.vocab)
+            instance._vertex_counts[ids] += graph.vertex_count_array
+            instance.num_all_tokens += graph.num_all_tokens
+            instance.num_all_edges += graph.num_all_edges
+
+            sources, targets, counts = graph.edge_arrays()
+            sources, targets = ids[sources], ids[targets]
+            if not instance.directed:
+                sources, targets = np.minimum(sources, targets), np.maximum(sources, targets)
+            all_keys.append((sources << 32) | targets)
+            all_counts.append(counts)
+
+        instance._edge_keys, instance._edge_counts = _sum_by_key(
+            np.concatenate(all_keys), np.concatenate(all_counts),
+        )
+        return instance
+
+    @classmethod
+    def from_documents(
+            cls,
+            documents: Iterable[List[str]],
+            directed: bool = False,
+            allow_self_reference: bool = False,
+            num_workers: int = 0,
+            documents_per_task: int = 1000,
+    ) -> "TokenGraph":
+        """
+        Builds a graph from lists of related tokens, see `add_documents`.
+
+        With `num_workers` > 0 the documents are split into tasks of
+        `documents_per_task` documents which are counted into partial
+        graphs in that many processes and merged in order.
+        """
+        if num_workers <= 0:
+            instance = cls(directed=directed, allow_self_reference=allow_self_reference)
+            instance.add_documents(documents)
+            return instance
+
+        partials: List[TokenGraph] = []
+
+        def _add_partial(future: Future):
+            partials.append(cls.from_compact(future.result()))
+            if len(partials) >= cls.MERGE_SIZE:
+                partials[:] = [cls.merge_many(partials)]
+
+        with ProcessPoolExecutor(num_workers) as pool:
+            # keep a bounded number of tasks in flight and merge them in order
+            futures: Deque[Future] = deque()
+            chunk = []
+            for tokens in documents:
+                chunk.append(list(tokens))
+                if len(chunk) >= documents_per_task:
+                    futures.append(pool.submit(_build_compact, chunk, directed, allow_self_reference))
+                    chunk = []
+                    if len(futures) >= num_workers * 2:
+                        _add_partial(futures.popleft())
+            if chunk:
+                futures.append(pool.submit(_build_compact, chunk, directed, allow_self_reference))
+
+            while futures:
+                _add_partial(futures.popleft())
+
+        if not partials:
+            return cls(directed=directed, allow_self_reference=allow_self_reference)
+        return cls.merge_many(partials)
+
+    @classmethod
+    def from_documents_approx(
+            cls,
+            documents: Iterable[List[str]],
+            vertex_count_gte: Optional[int] = None,
+            edge_count_gte: Optional[int] = None,
+            directed: bool = False,
+            allow_self_reference: bool = False,
+            sketch_width: int = 1 << 20,
+            sketch_depth: int = 4,
+    ) -> "TokenGraph":
+        """
+        Returns the same graph as
+
+            from_documents(documents).filter(vertex_count_gte=..., edge_count_gte=...)
+
+        but without counting all tokens and pairs exactly.
+
+        The first pass counts the tokens and token pairs into `CountMinSketch`es
+        of fixed size. The sketches never underestimate, so only the tokens and
+        pairs whose estimate passes the thresholds are counted exactly in the second pass.
+
+        `documents` is iterated twice, so it must not be an iterator.
+        """
+        if iter(documents) is documents:
+            raise TypeError("documents are iterated twice and can not be an iterator")
+
+        vertex_sketch = CountMinSketch(sketch_width, sketch_depth) if vertex_count_gte is not None else None
+        edge_sketch = CountMinSketch(sketch_width, sketch_depth) if edge_count_gte is not None else None
+
+        def _add_to_sketches(batch: List[np.ndarray]):
+            if vertex_sketch is not None:
+                vertex_sketch.add(np.concatenate(batch))
+            if edge_sketch is not None:
+                pairs = [_triu_indices(len(hashes)) for hashes in batch]
+                sources = np.concatenate([hashes[rows] for hashes, (rows, _) in zip(batch, pairs)])
+                targets = np.concatenate([hashes[cols] for hashes, (_, cols) in zip(batch, pairs)])
+                if not allow_self_reference:
+                    keep = sources != targets
+                    sources, targets = sources[keep], targets[keep]
+                edge_sketch.add(_pair_hashes(sources, targets, directed))
+
+        if vertex_sketch is not None or edge_sketch is not None:
+            batch = []
+            num_pairs = 0
+            for tokens in documents:
+                batch.append(hash_tokens(tokens))
+                num_pairs += len(batch[-1]) * (len(batch[-1]) + 1) // 2
+                if num_pairs >= cls.BATCH_SIZE:
+                    _add_to_sketches(batch)
+                    batch = []
+                    num_pairs = 0
+            if batch:
+                _add_to_sketches(batch)
+
+        instance = cls(directed=directed, allow_self_reference=allow_self_reference)
+        vocab_hashes = np.zeros(0, dtype=np.uint64)
+
+        def _edge_filter(sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+            hashes = _pair_hashes(vocab_hashes[sources], vocab_hashes[targets], directed)
+            return edge_sketch.estimate(hashes) >= edge_count_gte
+
+        batch = []
+        num_pairs = 0
+        for tokens in documents:
+            if vertex_sketch is not None:
+                tokens = list(tokens)
+                keep = vertex_sketch.estimate(hash_tokens(tokens)) >= vertex_count_gte
+                tokens = [token for token, k in zip(tokens, keep.tolist()) if k]
+
+            num_vocab = len(instance.vocab)
+            ids = instance._intern(tokens)
+            if edge_sketch is not None and len(instance.vocab) > num_vocab:
+                vocab_hashes = np.concatenate([vocab_hashes, hash_tokens(instance.vocab[num_vocab:])])
+
+            batch.append(ids)
+            num_pairs += len(ids) * (len(ids) + 1) // 2
+            if num_pairs >= cls.BATCH_SIZE:
+                instance._add_id_batch(batch, _edge_filter if edge_sketch is not None else None)
+                batch = []
+                num_pairs = 0
+
+        if batch:
+            instance._add_id_batch(batch, _edge_filter if edge_sketch is not None else None)
+
+        return instance.filter(vertex_count_gte=vertex_count_gte, edge_count_gte=edge_count_gte, inplace=True)
+
+    def to_compact(self) -> tuple:
+        """
+        Returns a tuple of settings, the vocabulary and the numpy arrays
+        which is fast to pickle, e.g. between processes.
+        """
+        self._merge_pending()
+        return (
+            self.directed, self.allow_self_reference, self.num_all_tokens, self.num_all_edges,
+            self.vocab, self.vertex_count_array, self._edge_keys, self._edge_counts,
+        )
+
+    @classmethod
+    def from_compact(cls, data: tuple) -> "TokenGraph":
+        directed, allow_self_reference, num_all_tokens, num_all_edges, vocab, vertex_counts, edge_keys, edge_counts = data
+        instance = cls(directed=directed, allow_self_reference=allow_self_reference)
+        instance.num_all_tokens = num_all_tokens
+        instance.num_all_edges = num_all_edges
+        instance.vocab = list(vocab)
+        instance.vocab_index = {token: i for i, token in enumerate(instance.vocab)}
+        instance._vertex_counts = np.array(vertex_counts, dtype=np.int64)
+        instance._edge_keys = edge_keys
+        instance._edge_counts = edge_counts
+        return instance
+
+    def to_binary(self, path: Union[str, Path]):
+        """
+        Stores the graph in directory `path` as
+
+            meta.json           settings and totals
+            vocab.txt           one token per line
+            vertex_counts.npy
+            edge_keys.npy       sorted packed (source << 32) | target ids
+            edge_counts.npy
+
+        which can be memory-mapped by `from_binary`.
+        """
+        path = Path(path)
+        for token in self.vocab:
+            if "\n" in token:
+                raise ValueError(f"Can not store token with newline: {token!r}")
+
+        self._merge_pending()
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "meta.json").write_text(json.dumps({
+            "format": "tokengraph",
+            "version": 1,
+            "directed": self.directed,
+            "allow_self_reference": self.allow_self_reference,
+            "num_all_tokens": self.num_all_tokens,
+            "num_all_edges": self.num_all_edges,
+        }))
+        (path / "vocab.txt").write_bytes("".join(f"{token}\n" for token in self.vocab).encode("utf-8"))
+        np.save(path / "vertex_counts.npy", self.vertex_count_array)
+        np.save(path / "edge_keys.npy", self._edge_keys)
+        np.save(path / "edge_counts.npy", self._edge_counts)
+
+    @classmethod
+    def from_binary(cls, path: Union[str, Path], mmap: bool = True) -> "TokenGraph":
+        """
+        Loads a graph stored with `to_binary`.
+
+        With `mmap` the edge arrays are memory-mapped read-only, so only the
+        vocabulary is read on load. Filtering reads the edge counts and copies
+        only the selected edges. Adding to the graph copies the edges into memory.
+        """
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text())
+        if meta.get("format") != "tokengraph" or meta.get("version") != 1:
+            raise ValueError(f"Unsupported TokenGraph format in {path}")
+
+        instance = cls(directed=meta["directed"], allow_self_reference=meta["allow_self_reference"])
+        instance.num_all_tokens = meta["num_all_tokens"]
+        instance.num_all_edges = meta["num_all_edges"]
+        instance.vocab = (path / "vocab.txt").read_bytes().decode("utf-8").split("\n")[:-1]
+        instance.vocab_index = {token: i for i, token in enumerate(instance.vocab)}
+        instance._vertex_counts = np.load(path / "vertex_counts.npy")
+        mmap_mode = "r" if mmap else None
+        instance._edge_keys = np.load(path / "edge_keys.npy", mmap_mode=mmap_mode)
+        instance._edge_counts = np.load(path / "edge_counts.npy", mmap_mode=mmap_mode)
         return instance
 
     def state_dict(self) -> dict:
+        sources, targets, counts = self.edge_arrays()
         return {
             "directed": self.directed,
             "allow_self_reference": self.allow_self_reference,
             "num_all_tokens": self.num_all_tokens,
             "num_all_edges": self.num_all_edges,
-            "vertices": self.vertices,
-            "edges": self.edges,
+            "vocab": list(self.vocab),
+            "vertex_counts": self.vertex_count_array.tolist(),
+            # [[source id, target id, count], ...]
+            "edges": np.stack([sources, targets, counts], axis=1).tolist(),
         }
 
     @classmethod
@@ -64,52 +426,79 @@ class TokenGraph(StateDictMixin):
             directed=data["directed"],
             allow_self_reference=data["allow_self_reference"],
         )
+        if "vocab" in data:
+            edges = np.array(data["edges"], dtype=np.int64).reshape(-1, 3)
+            instance._set_arrays(
+                data["vocab"], np.array(data["vertex_counts"], dtype=np.int64),
+                edges[:, 0], edges[:, 1], edges[:, 2],
+            )
+        else:
+            # previous format with one dict per vertex and edge
+            instance._set_dicts(data["vertices"], data["edges"])
+
         instance.num_all_tokens = data["num_all_tokens"]
         instance.num_all_edges = data["num_all_edges"]
-        instance.vertices = data["vertices"]
-        instance.edges = data["edges"]
         return instance
 
     def add_related_tokens(self, tokens: Iterable[str]):
-        if not isinstance(tokens, (tuple, list)):
-            tokens = list(tokens)
-
-        for token in tokens:
-            if token not in self.vertices:
-                vertex = self.DEFAULT_VERTEX.copy()
-                self.vertices[token] = vertex
-            else:
-                vertex = self.vertices[token]
-
-            vertex["count"] += 1
-            self.num_all_tokens += 1
-
-        for idx1, token1 in enumerate(tokens):
-            for idx2 in range(idx1, len(tokens)):
-                token2 = tokens[idx2]
-
-                if not self.allow_self_reference and token1 == token2:
-                    continue
-
-                edge_key = (token1, token2)
-                if not self.directed:
-                    edge_key = tuple(sorted(edge_key))
-
-                if edge_key not in self.edges:
-                    edge = self.DEFAULT_EDGE.copy()
-                    self.edges[edge_key] = edge
-                else:
-                    edge = self.edges[edge_key]
-
-                edge["count"] += 1
-                self.num_all_edges += 1
+        self.add_documents([tokens])
+
+    def add_documents(self, documents: Iterable[Iterable[str]]) -> int:
+        """
+        Adds each list of tokens like `add_related_tokens` but
+        generates and counts the token pairs of many documents at once.
+
+        Returns the number of documents.
+        """
+        batch = []
+        num_pairs = 0
+        num_documents = 0
+        for tokens in documents:
+            ids = self._intern(tokens)
+            batch.append(ids)
+            num_pairs += len(ids) * (len(ids) + 1) // 2
+            num_documents += 1
+            if num_pairs >= self.BATCH_SIZE:
+                self._add_id_batch(batch)
+                batch = []
+                num_pairs = 0
+
+        if batch:
+            self._add_id_batch(batch)
+        return num_documents
+
+    def _add_id_batch(
+            self,
+            batch: List[np.ndarray],
+            edge_filter: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None,
+    ):
+        ids = np.concatenate(batch)
+        self._vertex_counts[:len(self.vocab)] += np.bincount(ids, minlength=len(self.vocab))
+        self.num_all_tokens += len(ids)
+        # the scores depend on the vertex counts
+        self._edge_scores = {}
+
+        # all pairs (i, j) with i <= j of each document
+        pairs = [_triu_indices(len(doc_ids)) for doc_ids in batch]
+        sources = np.concatenate([doc_ids[rows] for doc_ids, (rows, _) in zip(batch, pairs)])
+        targets = np.concatenate([doc_ids[cols] for doc_ids, (_, cols) in zip(batch, pairs)])
+
+        if not self.allow_self_reference:
+            keep = sources != targets
+            sources, targets = sources[keep], targets[keep]
+        if not self.directed:
+            sources, targets = np.minimum(sources, targets), np.maximum(sources, targets)
+        if edge_filter is not None:
+            keep = edge_filter(sources, targets)
+            sources, targets = sources[keep], targets[keep]
+
+        keys, counts = _sum_by_key((sources << 32) | targets, np.ones(len(sources), dtype=np.int64))
+        self._add_edge_keys(keys, counts)
+        self.num_all_edges += len(sources)
 
     def remove_tokens(self, tokens: Iterable[str]):
-        for tok in tokens:
-            self.vertices.pop(tok, None)
-
-        self._remove_edges_without_vertex()
-        self._update_num_all()
+        vertex_mask = ~self._token_mask(tokens)
+        self._subgraph(vertex_mask, np.ones(len(self.edge_count_array), dtype=bool), self)
 
     def info(self) -> dict:
         min_v, max_v = self.vertices_count_min_max()
@@ -127,99 +516,205 @@ class TokenGraph(StateDictMixin):
         }
 
     def vertices_count_min_max(self) -> Tuple[int, int]:
-        min_v, max_v = None, None
-        for v in self.vertices.values():
-            if min_v is None or v["count"] < min_v:
-                min_v = v["count"]
-            if max_v is None or v["count"] > max_v:
-                max_v = v["count"]
-        return min_v, max_v
+        return _min_max(self.vertex_count_array)
 
     def edges_count_min_max(self) -> Tuple[int, int]:
-        min_e, max_e = None, None
-        for e in self.edges.values():
-            if min_e is None or e["count"] < min_e:
-                min_e = e["count"]
-            if max_e is None or e["count"] > max_e:
-                max_e = e["count"]
-        return min_e, max_e
+        return _min_max(self.edge_count_array)
 
     def degree_min_max(self) -> Tuple[int, int]:
-        min_e, max_e = None, None
-        for e in self.degree().values():
-            if min_e is None or e < min_e:
-                min_e = e
-            if max_e is None or e > max_e:
-                max_e = e
-        return min_e, max_e
+        return _min_max(self._degree_array(None))
 
     def degree(self) -> CalcDict:
-        return self._degree(self.vertices, self.edges, None)
+        return CalcDict(zip(self.vocab, self._degree_array(None).tolist()))
 
     def degree_in(self) -> CalcDict:
-        return self._degree(self.vertices, self.edges, None)
+        return CalcDict(zip(self.vocab, self._degree_array(True).tolist()))
 
     def degree_out(self) -> CalcDict:
-        return self._degree(self.vertices, self.edges, None)
-
-    @classmethod
-    def _degree(
-            cls,
-            vertices: Dict[str, dict],
-            edges: Dict[Tuple[str, str], dict],
-            in_out: Optional[bool],
-    ) -> CalcDict:
-        result = CalcDict({key: 0 for key in vertices.keys()})
-        if in_out is None:
-            for a, b in edges.keys():
-                result[a] += 1
-                result[b] += 1
-
-        elif in_out is True:
-            for a, b in edges.keys():
-                result[b] += 1
-
-        elif in_out is False:
-            for a, b in edges.keys():
-                result[a] += 1
-
+        return CalcDict(zip(self.vocab, self._degree_array(False).tolist()))
+
+    def _degree_array(self, in_out: Optional[bool], edge_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        self._merge_pending()
+        if in_out is None and edge_mask is None:
+            if self._degrees is None or len(self._degrees) != len(self.vocab):
+                self._degrees = self._degree_array(None, np.ones(len(self._edge_counts), dtype=bool))
+                self._degrees.flags.writeable = False
+            return self._degrees
+
+        if edge_mask is None:
+            sources, targets, _ = self.edge_arrays()
+        else:
+            sources, targets = self._edge_ids_at(edge_mask)
+
+        num = len(self.vocab)
+        result = np.zeros(num, dtype=np.int64)
+        if in_out is None or in_out is True:
+            result += np.bincount(targets, minlength=num)
+        if in_out is None or in_out is False:
+            result += np.bincount(sources, minlength=num)
         return result
 
     def vertex_counts(self) -> CalcDict:
-        return CalcDict({
-            k: v["count"]
-            for k, v in self.vertices.items()
-        })
+        return CalcDict(zip(self.vocab, self.vertex_count_array.tolist()))
 
     def edge_counts(self) -> CalcDict:
-        return CalcDict({
-            k: v["count"]
-            for k, v in self.edges.items()
-        })
+        return CalcDict(zip(self.edges, self.edge_count_array.tolist()))
 
     def vertex_frequencies(self) -> CalcDict:
         count_all = max(1, self.num_all_tokens)
-        return CalcDict({
-            k: v["count"] / count_all
-            for k, v in self.vertices.items()
-        })
+        return CalcDict(zip(self.vocab, (self.vertex_count_array / count_all).tolist()))
 
     def edge_frequencies(self) -> CalcDict:
         count_all = max(1, self.num_all_edges)
-        return CalcDict({
-            k: v["count"] / count_all
-            for k, v in self.edges.items()
-        })
+        return CalcDict(zip(self.edges, (self.edge_count_array / count_all).tolist()))
 
     def get_token_edges(self, token: str):
-        return sorted(
-            (
-                (key, value) for key, value in self.edges.items()
-                if key[0] == token or key[1] == token
-            ),
-            key=lambda x: x[1]["count"],
-            reverse=True,
+        idx = self.vocab_index.get(token)
+        if idx is None:
+            return []
+
+        sources, targets, counts = self.edge_arrays()
+        indptr, _, edge_indices = self.adjacency()
+        indices = np.sort(edge_indices[indptr[idx]:indptr[idx + 1]])
+        indices = indices[np.argsort(-counts[indices], kind="stable")]
+        return [
+            (key, {"count": count})
+            for key, count in zip(
+                self._edge_tuples(sources[indices], targets[indices]),
+                counts[indices].tolist(),
+            )
+        ]
+
+    def neighbors(self, token: str) -> CalcDict:
+        """
+        Returns the edge count of each neighbor of the token,
+        for directed graphs in both directions.
+        """
+        idx = self.vocab_index.get(token)
+        if idx is None:
+            return CalcDict()
+
+        counts = self.edge_count_array
+        indptr, neighbors, edge_indices = self.adjacency()
+        start, end = indptr[idx], indptr[idx + 1]
+        result = CalcDict()
+        for neighbor, count in zip(neighbors[start:end].tolist(), counts[edge_indices[start:end]].tolist()):
+            token = self.vocab[neighbor]
+            result[token] = result.get(token, 0) + count
+        return result
+
+    def edge_score_array(self, measure: str = "pmi") -> np.ndarray:
+        """
+        Returns the association score of each edge, in the order of `edge_arrays()`.
+
+            - "pmi": pointwise mutual information `log(p(a, b) / (p(a) * p(b)))`
+              of the edge and vertex frequencies
+            - "npmi": pmi normalized to [-1, 1] by `-log(p(a, b))`
+            - "llr": Dunning's log-likelihood ratio (G²) of the 2x2 contingency table
+              of each edge in the co-occurrence matrix (symmetric for undirected graphs)
+
+        The scores are cached until the graph changes.
+        """
+        if measure not in self.ASSOCIATION_MEASURES:
+            raise ValueError(f"Unknown measure '{measure}', expected one of {self.ASSOCIATION_MEASURES}")
+
+        self._merge_pending()
+        if measure not in self._edge_scores:
+            scores = self._calc_edge_scores(measure)
+            scores.flags.writeable = False
+            self._edge_scores[measure] = scores
+        return self._edge_scores[measure]
+
+    def edge_scores(self, measure: str = "pmi") -> CalcDict:
+        return CalcDict(zip(self.edges, self.edge_score_array(measure).tolist()))
+
+    def top_associations(
+            self,
+            token: str,
+            k: int = 10,
+            measure: str = "npmi",
+            edge_count_gte: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Returns the `k` neighbors of the token with the highest association score,
+        see `edge_score_array`. For directed graphs, edges in both directions are listed.
+
+        `edge_count_gte` ignores rare edges, which tend to have a high pmi.
+        """
+        idx = self.vocab_index.get(token)
+        if idx is None:
+            return []
+
+        scores = self.edge_score_array(measure)
+        indptr, neighbors, edge_indices = self.adjacency()
+        edge_indices = edge_indices[indptr[idx]:indptr[idx + 1]]
+        neighbors = neighbors[indptr[idx]:indptr[idx + 1]]
+        if edge_count_gte is not None:
+            keep = self._edge_counts[edge_indices] >= edge_count_gte
+            edge_indices, neighbors = edge_indices[keep], neighbors[keep]
+
+        entry_scores = scores[edge_indices]
+        order = np.argsort(-entry_scores, kind="stable")[:k]
+        return [
+            (self.vocab[neighbor], score)
+            for neighbor, score in zip(neighbors[order].tolist(), entry_scores[order].tolist())
+        ]
+
+    def top_associations_per_vertex(
+            self,
+            k: int = 10,
+            measure: str = "npmi",
+            edge_count_gte: Optional[int] = None,
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Returns `top_associations` for all vertices with edges, computed at once
+        """
+        scores = self.edge_score_array(measure)
+        indptr, neighbors, edge_indices = self.adjacency()
+        rows = np.repeat(np.arange(len(self.vocab)), np.diff(indptr))
+        entry_scores = scores[edge_indices]
+
+        # sorted by vertex, then by descending score
+        order = np.lexsort((-entry_scores, rows))
+        if edge_count_gte is not None:
+            order = order[self._edge_counts[edge_indices[order]] >= edge_count_gte]
+        sorted_rows = rows[order]
+        rank = np.arange(len(order)) - np.searchsorted(sorted_rows, sorted_rows)
+        order = order[rank < k]
+
+        result = {}
+        vocab = self.vocab
+        for row, neighbor, score in zip(rows[order].tolist(), neighbors[order].tolist(), entry_scores[order].tolist()):
+            result.setdefault(vocab[row], []).append((vocab[neighbor], score))
+        return result
+
+    def _calc_edge_scores(self, measure: str) -> np.ndarray:
+        sources, targets, counts = self.edge_arrays()
+        counts = counts.astype(np.float64)
+
+        if measure in ("pmi", "npmi"):
+            p_vertex = self.vertex_count_array / max(1, self.num_all_tokens)
+            p_edge = counts / max(1, self.num_all_edges)
+            with np.errstate(divide="ignore"):
+                pmi = np.log(p_edge) - np.log(p_vertex[sources]) - np.log(p_vertex[targets])
+            if measure == "pmi":
+                return pmi
+            neg_log_p = -np.log(p_edge)
+            return np.divide(pmi, neg_log_p, out=np.ones_like(pmi), where=neg_log_p > 0)
+
+        # G² = 2 * (sum(k log k) - sum(row log row) - sum(column log column) + n log n)
+        rows, columns, data = self._symmetric_edge_arrays()
+        row_sums = np.bincount(rows, weights=data, minlength=len(self.vocab))[sources]
+        column_sums = np.bincount(columns, weights=data, minlength=len(self.vocab))[targets]
+        total = float(data.sum())
+        g2 = 2 * (
+            _xlogx(counts) + _xlogx(row_sums - counts) + _xlogx(column_sums - counts)
+            + _xlogx(total - row_sums - column_sums + counts)
+            - _xlogx(row_sums) - _xlogx(total - row_sums)
+            - _xlogx(column_sums) - _xlogx(total - column_sums)
+            + _xlogx(np.float64(total))
         )
+        return np.maximum(g2, 0.)
 
     def filter(
             self,
@@ -232,79 +727,81 @@ class TokenGraph(StateDictMixin):
             edge_function: Optional[Callable] = None,
             inplace: bool = False
     ) -> "TokenGraph":
-        edges = self.edges
-        vertices = self.vertices
+        vertex_mask, edge_mask = self._filter_masks(
+            vertex_count_gte=vertex_count_gte,
+            vertex_tokens=vertex_tokens,
+            vertex_function=vertex_function,
+            degree_gte=degree_gte,
+            edge_count_gte=edge_count_gte,
+            edge_tokens=edge_tokens,
+            edge_function=edge_function,
+        )
+
+        if inplace:
+            instance = self
+        else:
+            instance = TokenGraph(
+                directed=self.directed,
+                allow_self_reference=self.allow_self_reference,
+            )
+
+        return self._subgraph(vertex_mask, edge_mask, instance)
+
+    def _filter_masks(
+            self,
+            vertex_count_gte: Optional[int] = None,
+            vertex_tokens: Optional[Iterable[str]] = None,
+            vertex_function: Optional[Callable] = None,
+            degree_gte: Optional[int] = None,
+            edge_count_gte: Optional[int] = None,
+            edge_tokens: Optional[Iterable[str]] = None,
+            edge_function: Optional[Callable] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the vertex and edge masks of `filter`
+        """
+        counts = self.edge_count_array
+        vertex_counts = self.vertex_count_array
+
+        edge_mask = np.ones(len(counts), dtype=bool)
+        vertex_mask = np.ones(len(vertex_counts), dtype=bool)
 
         if edge_count_gte is not None:
-            edges = {
-                key: value
-                for key, value in edges.items()
-                if value["count"] >= edge_count_gte
-            }
+            edge_mask &= counts >= edge_count_gte
 
         if edge_function is not None:
-            edges = {
-                key: value
-                for key, value in edges.items()
-                if edge_function(key, value)
-            }
+            indices = np.flatnonzero(edge_mask)
+            edge_mask[indices] = [
+                bool(edge_function(key, {"count": count}))
+                for key, count in zip(
+                    self._edge_tuples(*self._edge_ids_at(indices)),
+                    counts[indices].tolist(),
+                )
+            ]
 
         if edge_tokens is not None:
-            edge_tokens = set(edge_tokens)
-            edges = {
-                key: value
-                for key, value in edges.items()
-                if key[0] in edge_tokens or key[1] in edge_tokens
-            }
+            token_mask = self._token_mask(edge_tokens)
+            indices = np.flatnonzero(edge_mask)
+            sources, targets = self._edge_ids_at(indices)
+            edge_mask[indices] = token_mask[sources] | token_mask[targets]
 
         if vertex_count_gte is not None:
-            vertices = {
-                key: value
-                for key, value in vertices.items()
-                if value["count"] >= vertex_count_gte
-            }
+            vertex_mask &= vertex_counts >= vertex_count_gte
 
         if degree_gte is not None:
-            counts = self._degree(vertices, edges, None)
-            vertices = {
-                key: value
-                for key, value in vertices.items()
-                if counts[key] >= degree_gte
-            }
+            vertex_mask &= self._degree_array(None, edge_mask) >= degree_gte
 
         if vertex_tokens is not None:
-            vertex_tokens = set(vertex_tokens)
-            vertices = {
-                key: value
-                for key, value in vertices.items()
-                if key in vertex_tokens
-            }
+            vertex_mask &= self._token_mask(vertex_tokens)
 
         if vertex_function is not None:
-            vertices = {
-                key: value
-                for key, value in vertices.items()
-                if vertex_function(key, value)
-            }
-
-        edges = {
-            key: value
-            for key, value in edges.items()
-            if key[0] in vertices and key[1] in vertices
-        }
-
-        if inplace:
-            instance = self
-        else:
-            instance = TokenGraph(
-                directed=self.directed,
-                allow_self_reference=self.allow_self_reference,
-            )
+            indices = np.flatnonzero(vertex_mask)
+            vertex_mask[indices] = [
+                bool(vertex_function(self.vocab[idx], {"count": count}))
+                for idx, count in zip(indices.tolist(), vertex_counts[indices].tolist())
+            ]
 
-        instance.vertices = vertices
-        instance.edges = edges
-        instance._update_num_all()
-        return instance
+        return vertex_mask, edge_mask
 
     def filter_repeat(
             self,
@@ -318,6 +815,42 @@ class TokenGraph(StateDictMixin):
             max_repetions: Optional[int] = None,
             inplace: bool = False,
     ) -> "TokenGraph":
+        """
+        Applies `filter` until nothing changes anymore.
+
+        Only `degree_gte` depends on the previous result, so the vertices
+        are pruned like a k-core in a single pass: Vertices below the degree
+        are removed and the degree of their neighbors is decremented, until
+        all remaining vertices have the required degree.
+
+        If `max_repetions` is given, `filter` is really repeated that many times at most.
+        """
+        if max_repetions is None:
+            vertex_mask, edge_mask = self._filter_masks(
+                vertex_count_gte=vertex_count_gte,
+                vertex_tokens=vertex_tokens,
+                vertex_function=vertex_function,
+                edge_count_gte=edge_count_gte,
+                edge_tokens=edge_tokens,
+                edge_function=edge_function,
+            )
+            if degree_gte is not None:
+                sources, targets, _ = self.edge_arrays()
+                edge_mask &= vertex_mask[sources] & vertex_mask[targets]
+                vertex_mask = _peel_vertices(
+                    vertex_mask, edge_mask, sources, targets, self.adjacency(), degree_gte,
+                )
+
+            if inplace:
+                instance = self
+            else:
+                instance = TokenGraph(
+                    directed=self.directed,
+                    allow_self_reference=self.allow_self_reference,
+                )
+
+            return self._subgraph(vertex_mask, edge_mask, instance)
+
         fg1 = self
         count = 0
         while True:
@@ -332,7 +865,7 @@ class TokenGraph(StateDictMixin):
                 inplace=False,
             )
             count += 1
-            if max_repetions is not None and count >= max_repetions:
+            if count >= max_repetions:
                 break
             if len(fg1.vertices) == len(fg2.vertices) and len(fg1.edges) == len(fg2.edges):
                 break
@@ -341,22 +874,163 @@ class TokenGraph(StateDictMixin):
         if not inplace:
             return fg2
 
-        self.vertices = fg2.vertices
-        self.edges = fg2.edges
+        self.vocab = fg2.vocab
+        self.vocab_index = fg2.vocab_index
+        self._vertex_counts = fg2._vertex_counts
+        self._edge_keys = fg2._edge_keys
+        self._edge_counts = fg2._edge_counts
+        self._invalidate()
         self.num_all_tokens = fg2.num_all_tokens
         self.num_all_edges = fg2.num_all_edges
         return self
 
     def _update_num_all(self):
-        self.num_all_tokens = sum(v["count"] for v in self.vertices.values())
-        self.num_all_edges = sum(v["count"] for v in self.edges.values())
-
-    def _remove_edges_without_vertex(self):
-        self.edges = {
-            key: value
-            for key, value in self.edges.items()
-            if key[0] in self.vertices and key[1] in self.vertices
-        }
+        self.num_all_tokens = int(self.vertex_count_array.sum())
+        self.num_all_edges = int(self.edge_count_array.sum())
+
+    def _intern(self, tokens: Iterable[str]) -> np.ndarray:
+        """
+        Returns the ids of the tokens, adding new tokens to the vocabulary
+        """
+        vocab_index = self.vocab_index
+        ids = []
+        for token in tokens:
+            idx = vocab_index.get(token)
+            if idx is None:
+                idx = vocab_index[token] = len(self.vocab)
+                self.vocab.append(token)
+            ids.append(idx)
+
+        if len(self.vocab) > len(self._vertex_counts):
+            counts = np.zeros(max(1024, len(self.vocab), len(self._vertex_counts) * 2), dtype=np.int64)
+            counts[:len(self._vertex_counts)] = self._vertex_counts
+            self._vertex_counts = counts
+
+        return np.array(ids, dtype=np.int64)
+
+    def _token_mask(self, tokens: Iterable[str]) -> np.ndarray:
+        mask = np.zeros(len(self.vocab), dtype=bool)
+        ids = [self.vocab_index[t] for t in set(tokens) if t in self.vocab_index]
+        mask[ids] = True
+        return mask
+
+    def _edge_tuples(self, sources: np.ndarray, targets: np.ndarray) -> Iterator[Tuple[str, str]]:
+        """
+        Yields the token tuples of the edges. Undirected edges
+        are sorted by token, like they used to be stored.
+        """
+        vocab = self.vocab
+        for a, b in zip(sources.tolist(), targets.tolist()):
+            a, b = vocab[a], vocab[b]
+            if not self.directed and b < a:
+                a, b = b, a
+            yield a, b
+
+    def _edge_key(self, key: Tuple[str, str]) -> Optional[int]:
+        a = self.vocab_index.get(key[0])
+        b = self.vocab_index.get(key[1])
+        if a is None or b is None:
+            return None
+        if not self.directed and b < a:
+            a, b = b, a
+        return (a << 32) | b
+
+    def _edge_position(self, key: Tuple[str, str]) -> Optional[int]:
+        packed = self._edge_key(key)
+        if packed is not None:
+            self._merge_pending()
+            pos = int(np.searchsorted(self._edge_keys, packed))
+            if pos < len(self._edge_keys) and self._edge_keys[pos] == packed:
+                return pos
+
+    def _add_edge_keys(self, keys: np.ndarray, counts: Optional[np.ndarray] = None):
+        if len(keys):
+            self._pending_keys.append(keys)
+            self._pending_counts.append(np.ones(len(keys), dtype=np.int64) if counts is None else counts)
+            self._num_pending += len(keys)
+            if self._num_pending >= self.PENDING_SIZE:
+                self._merge_pending()
+
+    def _merge_pending(self):
+        if self._pending_keys:
+            self._edge_keys, self._edge_counts = _sum_by_key(
+                np.concatenate([self._edge_keys] + self._pending_keys),
+                np.concatenate([self._edge_counts] + self._pending_counts),
+            )
+            self._pending_keys = []
+            self._pending_counts = []
+            self._num_pending = 0
+            self._invalidate()
+
+    def _invalidate(self):
+        self._edge_ids = None
+        self._degrees = None
+        self._adjacency = None
+        self._edge_scores = {}
+
+    def _set_arrays(
+            self,
+            vocab: List[str],
+            vertex_counts: np.ndarray,
+            sources: np.ndarray,
+            targets: np.ndarray,
+            counts: np.ndarray,
+    ):
+        self.vocab = list(vocab)
+        self.vocab_index = {token: i for i, token in enumerate(self.vocab)}
+        self._vertex_counts = np.asarray(vertex_counts, dtype=np.int64)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if not self.directed:
+            sources, targets = np.minimum(sources, targets), np.maximum(sources, targets)
+        self._edge_keys, self._edge_counts = _sum_by_key(
+            (sources << 32) | targets, np.asarray(counts, dtype=np.int64),
+        )
+        self._pending_keys = []
+        self._pending_counts = []
+        self._num_pending = 0
+        self._invalidate()
+
+    def _set_dicts(self, vertices: Dict[str, dict], edges: Dict[Tuple[str, str], dict]):
+        vocab = list(vertices)
+        vocab_index = {token: i for i, token in enumerate(vocab)}
+        # edges to unknown vertices are dropped
+        edges = [
+            (vocab_index[a], vocab_index[b], e["count"])
+            for (a, b), e in edges.items()
+            if a in vocab_index and b in vocab_index
+        ]
+        edges = np.array(edges, dtype=np.int64).reshape(-1, 3)
+        self._set_arrays(
+            vocab, np.array([v["count"] for v in vertices.values()], dtype=np.int64),
+            edges[:, 0], edges[:, 1], edges[:, 2],
+        )
+
+    def _subgraph(self, vertex_mask: np.ndarray, edge_mask: np.ndarray, instance: "TokenGraph") -> "TokenGraph":
+        """
+        Stores the selected vertices and the selected edges between them in `instance`
+        """
+        self._merge_pending()
+        indices = np.flatnonzero(edge_mask)
+        sources, targets = self._edge_ids_at(indices)
+        keep = vertex_mask[sources] & vertex_mask[targets]
+        indices, sources, targets = indices[keep], sources[keep], targets[keep]
+
+        # the new ids keep the order, so the packed keys stay sorted
+        new_ids = np.cumsum(vertex_mask) - 1
+        vocab = [token for token, keep in zip(self.vocab, vertex_mask.tolist()) if keep]
+        vertex_counts = self.vertex_count_array[vertex_mask]
+        edge_keys = (new_ids[sources] << 32) | new_ids[targets]
+        edge_counts = self._edge_counts[indices]
+
+        instance.vocab = vocab
+        instance.vocab_index = {token: i for i, token in enumerate(vocab)}
+        instance._vertex_counts = vertex_counts
+        instance._edge_keys = edge_keys
+        instance._edge_counts = edge_counts
+        instance._invalidate()
+        instance._update_num_all()
+        return instance
 
     def dump(
             self,
@@ -377,56 +1051,89 @@ class TokenGraph(StateDictMixin):
         self.edge_frequencies().dump(limit=limit, sort_key=sort_key, reverse=reverse, file=file)
 
     def to_igraph(self, edge_weight: bool = True):
+        """
+        Returns an `igraph.Graph` with vertex attributes `name`, `label` and `count`
+        and edge attributes `count` and, if `edge_weight`, `weight` (count / max count).
+        """
         import igraph
 
-        def _check_edge_key(key: Tuple[str, str]):
-            ok = True
-            if key[0] not in self.vertices:
-                ok = False
-                print(f"edge key {key[0]} not in vertices!")
-            if key[1] not in self.vertices:
-                ok = False
-                print(f"edge key {key[1]} not in vertices!")
-            return ok
-
-        graph = igraph.Graph(directed=self.directed)
-
-        if self.vertices:
-            graph.add_vertices(
-                len(self.vertices),
-                {
-                    "name": list(self.vertices.keys()),
-                    **{
-                        key: [
-                            "None" if n[key] is None else n[key]
-                            for n in self.vertices.values()
-                        ]
-                        for key in self.DEFAULT_VERTEX.keys()
-                    }
-                }
+        sources, targets, counts = self.edge_arrays()
+        edge_attrs = {"count": counts.tolist()}
+        if edge_weight and len(counts):
+            edge_attrs["weight"] = self._edge_weights().tolist()
+
+        return igraph.Graph(
+            n=len(self.vocab),
+            edges=np.stack([sources, targets], axis=1),
+            directed=self.directed,
+            vertex_attrs={
+                "name": list(self.vocab),
+                "label": list(self.vocab),
+                "count": self.vertex_count_array.tolist(),
+            },
+            edge_attrs=edge_attrs,
+        )
+
+    def to_networkx(self, edge_weight: bool = True):
+        """
+        Returns a `networkx.Graph` (or `DiGraph`) with the tokens as nodes
+        and the same attributes as `to_igraph`.
+        """
+        import networkx
+
+        graph = networkx.DiGraph() if self.directed else networkx.Graph()
+        graph.add_nodes_from(
+            (token, {"count": count})
+            for token, count in zip(self.vocab, self.vertex_count_array.tolist())
+        )
+
+        sources, targets, counts = self.edge_arrays()
+        vocab = self.vocab
+        if edge_weight:
+            graph.add_edges_from(
+                (vocab[a], vocab[b], {"count": count, "weight": weight})
+                for a, b, count, weight in zip(
+                    sources.tolist(), targets.tolist(), counts.tolist(), self._edge_weights().tolist(),
+                )
             )
-            graph.vs["label"] = list(self.vertices.keys())
-
-        if self.edges:
-            graph.add_edges(
-                [(e[0], e[1]) for e in self.edges.keys() if _check_edge_key(e)],
-                {
-                    key: [
-                        "None" if n[key] is None else n[key]
-                        for edge_key, n in self.edges.items()
-                        if _check_edge_key(edge_key)
-                    ]
-                    for key in self.DEFAULT_EDGE.keys()
-                }
+        else:
+            graph.add_edges_from(
+                (vocab[a], vocab[b], {"count": count})
+                for a, b, count in zip(sources.tolist(), targets.tolist(), counts.tolist())
             )
+        return graph
 
-            if edge_weight:
-                _, max_count = self.edges_count_min_max()
-                max_count = max(1, max_count)  # should always be, just for safety
-
-                graph.es["weight"] = [e["count"] / max_count for e in self.edges.values()]
+    def to_sparse_matrix(self):
+        """
+        Returns the edge counts as (num_vertices, num_vertices) `scipy.sparse.csr_matrix`,
+        indexed by the vertex ids of `vocab`.
+
+        The matrix of undirected graphs is symmetric.
+        """
+        import scipy.sparse
+
+        rows, columns, data = self._symmetric_edge_arrays()
+        return scipy.sparse.csr_matrix((data, (rows, columns)), shape=(len(self.vocab), len(self.vocab)))
+
+    def _symmetric_edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the edge arrays with the mirrored edges added for undirected graphs
+        """
+        sources, targets, counts = self.edge_arrays()
+        if self.directed:
+            return sources, targets, counts
+        mirror = sources != targets
+        return (
+            np.concatenate([sources, targets[mirror]]),
+            np.concatenate([targets, sources[mirror]]),
+            np.concatenate([counts, counts[mirror]]),
+        )
 
-        return graph
+    def _edge_weights(self) -> np.ndarray:
+        counts = self.edge_count_array
+        if not len(counts):
+            return np.zeros(0)
+        return counts / max(1, int(counts.max()))
 
     def to_graphviz(self):
         import graphviz
@@ -434,3 +1141,161 @@ class TokenGraph(StateDictMixin):
         for edge in self.edges.keys():
             g.edge(edge[0], edge[1])
         return g
+
+
+class TokenGraphVertices(Mapping):
+    """
+    Read-only `token -> {"count": n}` view of the vertices of a `TokenGraph`
+    """
+
+    def __init__(self, graph: TokenGraph):
+        self._graph = graph
+
+    def __len__(self) -> int:
+        return len(self._graph.vocab)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._graph.vocab)
+
+    def __contains__(self, token) -> bool:
+        return token in self._graph.vocab_index
+
+    def __getitem__(self, token: str) -> dict:
+        return {"count": int(self._graph.vertex_count_array[self._graph.vocab_index[token]])}
+
+    def items(self):
+        return [
+            (token, {"count": count})
+            for token, count in zip(self._graph.vocab, self._graph.vertex_count_array.tolist())
+        ]
+
+    def values(self):
+        return [{"count": count} for count in self._graph.vertex_count_array.tolist()]
+
+
+class TokenGraphEdges(Mapping):
+    """
+    Read-only `(token1, token2) -> {"count": n}` view of the edges of a `TokenGraph`
+    """
+
+    def __init__(self, graph: TokenGraph):
+        self._graph = graph
+
+    def __len__(self) -> int:
+        return len(self._graph.edge_count_array)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        sources, targets, _ = self._graph.edge_arrays()
+        return self._graph._edge_tuples(sources, targets)
+
+    def __contains__(self, key) -> bool:
+        return self._graph._edge_position(key) is not None
+
+    def __getitem__(self, key: Tuple[str, str]) -> dict:
+        pos = self._graph._edge_position(key)
+        if pos is None:
+            raise KeyError(key)
+        return {"count": int(self._graph._edge_counts[pos])}
+
+    def items(self):
+        return [
+            (key, {"count": count})
+            for key, count in zip(self, self._graph.edge_count_array.tolist())
+        ]
+
+    def values(self):
+        return [{"count": count} for count in self._graph.edge_count_array.tolist()]
+
+
+def _build_compact(documents: List[List[str]], directed: bool, allow_self_reference: bool) -> tuple:
+    graph = TokenGraph(directed=directed, allow_self_reference=allow_self_reference)
+    graph.add_documents(documents)
+    return graph.to_compact()
+
+
+def _pair_hashes(sources: np.ndarray, targets: np.ndarray, directed: bool) -> np.ndarray:
+    if not directed:
+        sources, targets = np.minimum(sources, targets), np.maximum(sources, targets)
+    return sources * _PAIR_HASH_MULTIPLIER + targets
+
+
+def _sum_by_key(keys: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the sorted unique keys and the sum of the counts of each key
+    """
+    if not len(keys):
+        return keys, counts
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    return keys[starts], np.add.reduceat(counts[order], starts)
+
+
+def _adjacency(num_vertices: int, sources: np.ndarray, targets: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    edge_indices = np.arange(len(sources))
+    # self-references are listed once
+    loops = sources == targets
+    rows = np.concatenate([sources, targets[~loops]])
+    columns = np.concatenate([targets, sources[~loops]])
+    edge_indices = np.concatenate([edge_indices, edge_indices[~loops]])
+
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(num_vertices + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_vertices), out=indptr[1:])
+    return indptr, columns[order], edge_indices[order]
+
+
+def _peel_vertices(
+        vertex_mask: np.ndarray,
+        edge_mask: np.ndarray,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        adjacency: Tuple[np.ndarray, np.ndarray, np.ndarray],
+        degree_gte: int,
+) -> np.ndarray:
+    """
+    Removes the vertices with a degree (counted over the masked edges) below
+    `degree_gte` from the mask until all remaining vertices have at least that degree.
+
+    All vertices below the degree are removed at once in each round
+    and only their neighbors are checked again.
+    """
+    num_vertices = len(vertex_mask)
+    alive = vertex_mask.copy()
+    degree = (
+        np.bincount(sources[edge_mask], minlength=num_vertices)
+        + np.bincount(targets[edge_mask], minlength=num_vertices)
+    )
+    indptr, neighbors, edge_indices = adjacency
+
+    removed = np.flatnonzero(alive & (degree < degree_gte))
+    while len(removed):
+        alive[removed] = False
+        starts, lengths = indptr[removed], indptr[removed + 1] - indptr[removed]
+        # concatenated ranges of the neighbor lists
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        affected = neighbors[positions[edge_mask[edge_indices[positions]]]]
+        np.subtract.at(degree, affected, 1)
+
+        affected = np.unique(affected)
+        removed = affected[alive[affected] & (degree[affected] < degree_gte)]
+
+    return alive
+
+
+@functools.lru_cache(maxsize=1024)
+def _triu_indices(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    rows, cols = np.triu_indices(n)
+    rows.flags.writeable = False
+    cols.flags.writeable = False
+    return rows, cols
+
+
+def _xlogx(x: np.ndarray) -> np.ndarray:
+    return x * np.log(np.where(x > 0, x, 1.))
+
+
+def _min_max(values: np.ndarray) -> Tuple[Optional[int], Optional[int]]:
+    if not len(values):
+        return None, None
+    return int(values.min()), int(values.max())